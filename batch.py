@@ -0,0 +1,628 @@
+"""
+Headless batch runner: loads each export once and runs every report for every club.
+
+    python -m batch EXPORT [EXPORT ...] -o OUTPUT_DIR [--date YYYY-MM-DD] [--club NAME ...]
+                    [--series-start YYYY-MM-DD --series-end YYYY-MM-DD [--series-freq D]]
+                    [--trend-months N] [--snapshot PATH] [--stream [--chunk-rows N]]
+                    [--warehouse DB] [--table-format {csv,xlsx,json}] [--ending-days N]
+                    [--engine {pandas,polars}]
+    python -m batch --from-warehouse DB -o OUTPUT_DIR [--date YYYY-MM-DD] [--club NAME ...]
+
+Reports whose columns are not in an export are skipped, so one command can be
+pointed at member, Technogym, Group Fitness and booking exports alike. HTML
+reports for an export are combined into <OUTPUT_DIR>/<export name>/summary.html;
+DataFrame reports are written alongside it as CSV (or XLSX or JSON with
+--table-format). With --series-start/--series-end,
+member exports also get an active-members time series CSV, and with --trend-months a
+month-by-month New Members trend CSV ending at --date. With --snapshot, member
+exports are diffed against the snapshot saved at PATH by the previous run (see
+delta.py): a Member Changes CSV lists who joined, ended or changed plan, Current
+Members and Ending Members are answered from the updated snapshot, and the
+snapshot is saved for the next run. The Ending Members Report lists members
+ending on --date, and the Ending Members Lookahead those ending from --date
+through the following --ending-days days (default 7), from an export, a
+snapshot or the warehouse alike.
+With --engine polars, the reports that have a Polars version run on it (see
+engines.py); their results are identical. With --stream, exports too
+large to hold in memory are read once in chunks and every count-based report is
+fed from that single pass (reports that need the whole frame are skipped).
+With --warehouse, each export is also stored in the SQLite warehouse at DB as
+taken on --date (see warehouse.py); --from-warehouse reruns the reports from the
+warehouse alone, without the export files, and adds a year-over-year comparison.
+Does not import Qt.
+"""
+
+import argparse
+import datetime as dt
+import html
+import os
+import sys
+import warnings
+
+import pandas as pd
+
+import delta
+import engines
+import functions
+import loaders
+import registry
+import rendering
+import streaming
+import warehouse
+
+warnings.filterwarnings(
+    "ignore",
+    message="Workbook contains no default style, apply openpyxl's default",
+    category=UserWarning,
+)
+
+
+def header_location(file_path: str) -> loaders.HeaderLocation:
+    """
+    Sheet and header row of the first batch report whose columns the export has,
+    so title rows (as in Group Fitness exports) and leading sheets are skipped.
+    """
+    return loaders.header_location(
+        file_path, [spec.required_columns for spec in registry.batch_reports()]
+    )
+
+
+def load_export(file_path: str) -> pd.DataFrame:
+    """Loads an export once, from the sheet and header row found by header_location."""
+    location = header_location(file_path)
+    return loaders.load_export(file_path, location.skiprows, sheet=location.sheet)
+
+
+def _slug(name: str) -> str:
+    return name.replace(" ", "_").replace("/", "_").replace("(", "").replace(")", "")
+
+
+def _write_dataframe_report(
+    output_dir: str,
+    report_name: str,
+    returned_df: pd.DataFrame,
+    table_format: str = "csv",
+) -> str:
+    """Writes a DataFrame report as table_format and returns its status line."""
+    extension = rendering.FORMATS[table_format][1]
+    path = os.path.join(
+        output_dir,
+        f"{_slug(report_name)}_{dt.date.today().strftime('%Y%m%d')}{extension}",
+    )
+    rendering.write(returned_df, path, table_format)
+    status = f"{len(returned_df)} rows -> {path}"
+    unparsed_rows = returned_df.attrs.get("unparsed_rows", 0)
+    if unparsed_rows:
+        status += f" ({unparsed_rows} unreadable booking lengths counted as 0)"
+    return status
+
+
+def _write_summary(
+    output_dir: str, export_name: str, end_date: str, html_sections: list[str]
+) -> None:
+    summary_path = os.path.join(output_dir, "summary.html")
+    with open(summary_path, "w", encoding="utf-8") as f:
+        f.write(
+            "<html><head><meta charset='utf-8'>"
+            f"<title>{html.escape(export_name)}</title></head><body>"
+            f"<h1>{html.escape(export_name)} &mdash; {html.escape(end_date)}</h1>"
+        )
+        f.write("\n".join(html_sections))
+        f.write("</body></html>\n")
+
+
+def run_export(
+    file_path: str,
+    output_dir: str,
+    clubs: list[str],
+    end_date: str,
+    series_range: tuple[str, str, str] | None = None,
+    trend_months: int | None = None,
+    snapshot_path: str | None = None,
+    warehouse_conn=None,
+    table_format: str = "csv",
+    ending_days: int | None = None,
+    engine: str | None = None,
+) -> list[tuple[str, str]]:
+    """
+    Runs every applicable report against one export on engine (see engines.py)
+    and writes the outputs to output_dir, DataFrame reports as table_format.
+    Returns (report name, status) pairs for the run summary.
+    """
+    df = load_export(file_path)
+    os.makedirs(output_dir, exist_ok=True)
+    export_name = os.path.basename(file_path)
+    statuses = []
+    html_sections = []
+
+    if warehouse_conn is not None:
+        try:
+            import_id, kinds = warehouse.ingest_export(
+                warehouse_conn, df, file_path, end_date
+            )
+            statuses.append(
+                (
+                    "Warehouse",
+                    f"import #{import_id} ({', '.join(kinds)}) for {end_date}",
+                )
+            )
+        except ValueError as e:
+            statuses.append(("Warehouse", f"skipped ({e})"))
+
+    snapshot = None
+    if snapshot_path is not None:
+        report_name = "Member Changes"
+        try:
+            snapshot, log = delta.update_snapshot(snapshot_path, df, end_date)
+            if log is None:
+                statuses.append((report_name, f"first snapshot -> {snapshot_path}"))
+            else:
+                csv_path = os.path.join(output_dir, f"{_slug(report_name)}.csv")
+                log.to_csv(csv_path, index=False)
+                counts = log["Change"].value_counts()
+                summary = ", ".join(f"{n} {change}" for change, n in counts.items())
+                statuses.append(
+                    (
+                        report_name,
+                        f"{len(log)} changes ({summary or 'none'}) -> {csv_path}",
+                    )
+                )
+        except (ValueError, RuntimeError) as e:
+            statuses.append((report_name, f"skipped ({e})"))
+    # Reports the snapshot can answer without regrouping the export; they take
+    # the same arguments as the functions they stand in for
+    snapshot_reports = {}
+    if snapshot is not None:
+        snapshot_reports = {
+            functions.current_members: lambda _, *args: snapshot.current_members(*args),
+            functions.generate_ending_members_report: lambda _, *args: snapshot.ending_members(
+                *args
+            ),
+        }
+
+    for spec in registry.batch_reports():
+        report_name = spec.name
+        report_function = snapshot_reports.get(
+            spec.function, engines.implementation(spec.function, engine)
+        )
+        missing = registry.missing_columns(spec, df.columns)
+        if missing:
+            statuses.append((report_name, f"skipped (missing {', '.join(missing)})"))
+            continue
+
+        try:
+            if registry.runs_per_club(spec):
+                html_sections.append(f"<h2>{html.escape(report_name)}</h2>")
+                for club in clubs:
+                    args = registry.report_args(
+                        spec, {registry.CLUB: club, registry.END_DATE: end_date}
+                    )
+                    html_sections.append(f"<h3>{html.escape(club)}</h3>")
+                    html_sections.append(rendering.to_html(report_function(df, *args)))
+                statuses.append((report_name, f"{len(clubs)} clubs"))
+            else:
+                args = registry.report_args(
+                    spec, {registry.END_DATE: end_date, registry.DAYS: ending_days}
+                )
+                result = report_function(df, *args)
+                if spec.output == registry.HTML:
+                    html_sections.append(f"<h2>{html.escape(report_name)}</h2>")
+                    html_sections.append(rendering.to_html(result))
+                    statuses.append((report_name, "ok"))
+                else:
+                    statuses.append(
+                        (
+                            report_name,
+                            _write_dataframe_report(
+                                output_dir, report_name, result, table_format
+                            ),
+                        )
+                    )
+        except Exception as e:
+            statuses.append((report_name, f"error: {type(e).__name__}: {e}"))
+
+    if series_range is not None:
+        report_name = "Active Members Series"
+        try:
+            series_df = functions.active_members_series(df, *series_range)
+            csv_path = os.path.join(output_dir, f"{_slug(report_name)}.csv")
+            series_df.to_csv(csv_path, index=False)
+            statuses.append((report_name, f"{len(series_df)} dates -> {csv_path}"))
+        except ValueError as e:
+            statuses.append((report_name, f"skipped ({e})"))
+
+    if trend_months:
+        report_name = "New Members Trend"
+        try:
+            trend_df = functions.new_members_trend(df, end_date, trend_months)
+            csv_path = os.path.join(output_dir, f"{_slug(report_name)}.csv")
+            trend_df.to_csv(csv_path, index=False)
+            statuses.append((report_name, f"{len(trend_df)} months -> {csv_path}"))
+        except ValueError as e:
+            statuses.append((report_name, f"skipped ({e})"))
+
+    if html_sections:
+        _write_summary(output_dir, export_name, end_date, html_sections)
+    return statuses
+
+
+def stream_export(
+    file_path: str,
+    output_dir: str,
+    clubs: list[str],
+    end_date: str,
+    chunk_rows: int = streaming.DEFAULT_CHUNK_ROWS,
+    table_format: str = "csv",
+) -> list[tuple[str, str]]:
+    """
+    Like run_export, but reads the export once in chunks of chunk_rows rows and
+    feeds every streamable report from that pass, so memory use does not grow
+    with the file. Reports without a streaming aggregator are skipped.
+    """
+    location = header_location(file_path)
+    columns = streaming.read_columns(file_path, location.skiprows, location.sheet)
+    os.makedirs(output_dir, exist_ok=True)
+    statuses = []
+
+    # (spec, club or None, aggregator)
+    jobs = []
+    for spec in registry.batch_reports():
+        if not spec.can_stream:
+            statuses.append((spec.name, "skipped (not available when streaming)"))
+            continue
+        missing = registry.missing_columns(spec, columns)
+        if missing:
+            statuses.append((spec.name, f"skipped (missing {', '.join(missing)})"))
+            continue
+        if registry.runs_per_club(spec):
+            for club in clubs:
+                params = {registry.CLUB: club, registry.END_DATE: end_date}
+                jobs.append((spec, club, registry.aggregator(spec, params)))
+        else:
+            params = {registry.END_DATE: end_date}
+            jobs.append((spec, None, registry.aggregator(spec, params)))
+
+    if jobs:
+        streaming.stream_reports(
+            file_path,
+            [job[2] for job in jobs],
+            location.skiprows,
+            chunk_rows,
+            sheet=location.sheet,
+        )
+
+    html_sections = []
+    for spec, club, aggregator in jobs:
+        report_name = spec.name
+        try:
+            if club is not None:
+                if club == clubs[0]:
+                    html_sections.append(f"<h2>{html.escape(report_name)}</h2>")
+                html_sections.append(f"<h3>{html.escape(club)}</h3>")
+                html_sections.append(rendering.to_html(aggregator.result()))
+                if club == clubs[-1]:
+                    statuses.append((report_name, f"{len(clubs)} clubs"))
+            elif spec.output == registry.HTML:
+                html_sections.append(f"<h2>{html.escape(report_name)}</h2>")
+                html_sections.append(rendering.to_html(aggregator.result()))
+                statuses.append((report_name, "ok"))
+            else:
+                statuses.append(
+                    (
+                        report_name,
+                        _write_dataframe_report(
+                            output_dir, report_name, aggregator.result(), table_format
+                        ),
+                    )
+                )
+        except Exception as e:
+            statuses.append((report_name, f"error: {type(e).__name__}: {e}"))
+
+    if html_sections:
+        _write_summary(output_dir, os.path.basename(file_path), end_date, html_sections)
+    report_order = [spec.name for spec in registry.batch_reports()]
+    return sorted(statuses, key=lambda status: report_order.index(status[0]))
+
+
+def run_warehouse(
+    conn,
+    output_dir: str,
+    clubs: list[str],
+    end_date: str,
+    table_format: str = "csv",
+    ending_days: int | None = None,
+) -> list[tuple[str, str]]:
+    """
+    Reruns the reports from the warehouse, each from the latest import of its kind
+    taken on or before end_date, and writes the outputs like run_export (Ending
+    Members lists members ending on end_date). Adds a year-over-year comparison
+    and the member history when member imports exist.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    statuses = []
+    html_sections = []
+
+    def _latest(kind: str, report_name: str) -> int | None:
+        import_id = warehouse.latest_import(conn, kind, end_date)
+        if import_id is None:
+            statuses.append((report_name, f"skipped (no {kind} import by {end_date})"))
+        return import_id
+
+    for report_name, sql_report in (
+        ("Current Members", warehouse.current_members),
+        ("New Members", warehouse.new_members),
+    ):
+        import_id = _latest("members", report_name)
+        if import_id is None:
+            continue
+        html_sections.append(f"<h2>{html.escape(report_name)}</h2>")
+        for club in clubs:
+            html_sections.append(f"<h3>{html.escape(club)}</h3>")
+            html_sections.append(
+                rendering.to_html(sql_report(conn, import_id, club, end_date))
+            )
+        statuses.append((report_name, f"{len(clubs)} clubs (import #{import_id})"))
+
+    for report_name, kind, sql_report in (
+        (
+            "Technogym Reporting (Consults/PT)",
+            "technogym",
+            warehouse.technogym_reporting,
+        ),
+        ("Group Fitness Summary", "group_fitness", warehouse.group_fitness),
+    ):
+        import_id = _latest(kind, report_name)
+        if import_id is not None:
+            html_sections.append(f"<h2>{html.escape(report_name)}</h2>")
+            html_sections.append(rendering.to_html(sql_report(conn, import_id)))
+            statuses.append((report_name, f"ok (import #{import_id})"))
+
+    import_id = _latest("bookings", "Booking Zones Analysis")
+    if import_id is not None:
+        status = _write_dataframe_report(
+            output_dir,
+            "Booking Zones Analysis",
+            warehouse.booking_zones(conn, import_id),
+            table_format,
+        )
+        statuses.append(("Booking Zones Analysis", status))
+
+    import_id = _latest("members", "Ending Members Report")
+    if import_id is not None:
+        ending_df = warehouse.ending_members(
+            conn, import_id, dt.date.fromisoformat(end_date)
+        )
+        statuses.append(
+            (
+                "Ending Members Report",
+                _write_dataframe_report(
+                    output_dir, "Ending Members Report", ending_df, table_format
+                ),
+            )
+        )
+        report_name = "Ending Members Lookahead"
+        lookahead_df = warehouse.ending_members(
+            conn,
+            import_id,
+            dt.date.fromisoformat(end_date),
+            (functions.ENDING_LOOKAHEAD_DAYS if ending_days is None else ending_days),
+        )
+        statuses.append(
+            (
+                report_name,
+                _write_dataframe_report(
+                    output_dir, report_name, lookahead_df, table_format
+                ),
+            )
+        )
+        for report_name, compute in (
+            ("Year Over Year", lambda: warehouse.year_over_year(conn, end_date)),
+            ("Member History", lambda: warehouse.member_history(conn)),
+        ):
+            try:
+                result_df = compute()
+            except ValueError as e:
+                statuses.append((report_name, f"skipped ({e})"))
+                continue
+            csv_path = os.path.join(output_dir, f"{_slug(report_name)}.csv")
+            result_df.to_csv(csv_path, index=False)
+            statuses.append((report_name, f"{len(result_df)} rows -> {csv_path}"))
+
+    if html_sections:
+        _write_summary(output_dir, "Warehouse", end_date, html_sections)
+    return statuses
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m batch",
+        description="Run every DeakinACTIVE report for every club without the GUI.",
+    )
+    parser.add_argument("exports", nargs="*", help="Excel export(s) to process")
+    parser.add_argument(
+        "-o", "--output-dir", required=True, help="Directory to write reports to"
+    )
+    parser.add_argument(
+        "--date",
+        default=str(dt.date.today()),
+        help="End date for the member reports, including the day Ending Members "
+        "lists (YYYY-MM-DD, default: today)",
+    )
+    parser.add_argument(
+        "--club",
+        action="append",
+        dest="clubs",
+        help="Club to report on (repeatable, default: all clubs)",
+    )
+    parser.add_argument(
+        "--series-start",
+        help="First date of the active-members time series (YYYY-MM-DD)",
+    )
+    parser.add_argument(
+        "--series-end",
+        help="Last date of the active-members time series (YYYY-MM-DD)",
+    )
+    parser.add_argument(
+        "--series-freq",
+        default="D",
+        help="pandas frequency for the time series, e.g. D, W, MS (default: D)",
+    )
+    parser.add_argument(
+        "--trend-months",
+        type=int,
+        help="Also write a New Members trend for this many months up to --date",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Read each export in chunks instead of loading it whole (for very "
+        "large CSV/XLSX exports; only count-based reports are run)",
+    )
+    parser.add_argument(
+        "--chunk-rows",
+        type=int,
+        default=streaming.DEFAULT_CHUNK_ROWS,
+        help=f"Rows per chunk with --stream (default: {streaming.DEFAULT_CHUNK_ROWS})",
+    )
+    parser.add_argument(
+        "--snapshot",
+        help="Member snapshot file to diff member exports against and update "
+        "(created on the first run)",
+    )
+    parser.add_argument(
+        "--warehouse",
+        metavar="DB",
+        help="Also store each export in this SQLite warehouse, dated --date",
+    )
+    parser.add_argument(
+        "--from-warehouse",
+        metavar="DB",
+        help="Rerun the reports from this SQLite warehouse instead of exports",
+    )
+    parser.add_argument(
+        "--ending-days",
+        type=int,
+        help="Days after --date covered by the Ending Members Lookahead (default: 7)",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=engines.ENGINES,
+        help="Run the reports on pandas or Polars (default: REPORTING_ENGINE, "
+        "else pandas)",
+    )
+    parser.add_argument(
+        "--table-format",
+        choices=[fmt for fmt in rendering.FORMATS if fmt != "html"],
+        default="csv",
+        help="File format for table reports such as Booking Zones (default: csv)",
+    )
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        dt.date.fromisoformat(args.date)
+    except ValueError:
+        print(f"Error: --date must be YYYY-MM-DD, got '{args.date}'", file=sys.stderr)
+        return 2
+    clubs = args.clubs or list(functions.CLUB_LIST)
+    series_range = None
+    if args.series_start or args.series_end:
+        if not (args.series_start and args.series_end):
+            print(
+                "Error: --series-start and --series-end must be given together",
+                file=sys.stderr,
+            )
+            return 2
+        series_range = (args.series_start, args.series_end, args.series_freq)
+    if args.stream and (series_range or args.trend_months or args.snapshot):
+        print(
+            "Error: --series-start/--series-end, --trend-months and --snapshot need "
+            "the whole export and cannot be combined with --stream",
+            file=sys.stderr,
+        )
+        return 2
+    if args.ending_days is not None and args.ending_days < 0:
+        print("Error: --ending-days cannot be negative", file=sys.stderr)
+        return 2
+    if args.engine is not None and not engines.available(args.engine):
+        print(f"Error: --engine {args.engine} requires {args.engine}", file=sys.stderr)
+        return 2
+    if args.chunk_rows < 1:
+        print("Error: --chunk-rows must be at least 1", file=sys.stderr)
+        return 2
+    if not args.exports and not args.from_warehouse:
+        print("Error: give at least one export or --from-warehouse", file=sys.stderr)
+        return 2
+    if args.stream and args.warehouse:
+        print(
+            "Error: --warehouse needs the whole export and cannot be combined with "
+            "--stream",
+            file=sys.stderr,
+        )
+        return 2
+
+    exit_code = 0
+    if args.from_warehouse:
+        print(f"{args.from_warehouse}:")
+        try:
+            conn = warehouse.connect(args.from_warehouse)
+            try:
+                statuses = run_warehouse(
+                    conn,
+                    os.path.join(args.output_dir, "warehouse"),
+                    clubs,
+                    args.date,
+                    args.table_format,
+                    args.ending_days,
+                )
+            finally:
+                conn.close()
+        except Exception as e:
+            print(f"  could not read: {type(e).__name__}: {e}", file=sys.stderr)
+            return 1
+        for report_name, status in statuses:
+            print(f"  {report_name}: {status}")
+
+    warehouse_conn = warehouse.connect(args.warehouse) if args.warehouse else None
+    for file_path in args.exports:
+        stem = os.path.splitext(os.path.basename(file_path))[0]
+        print(f"{file_path}:")
+        try:
+            if args.stream:
+                statuses = stream_export(
+                    file_path,
+                    os.path.join(args.output_dir, stem),
+                    clubs,
+                    args.date,
+                    args.chunk_rows,
+                    args.table_format,
+                )
+            else:
+                statuses = run_export(
+                    file_path,
+                    os.path.join(args.output_dir, stem),
+                    clubs,
+                    args.date,
+                    series_range,
+                    args.trend_months,
+                    args.snapshot,
+                    warehouse_conn,
+                    args.table_format,
+                    args.ending_days,
+                    args.engine,
+                )
+        except Exception as e:
+            print(f"  could not load: {type(e).__name__}: {e}", file=sys.stderr)
+            exit_code = 1
+            continue
+        for report_name, status in statuses:
+            print(f"  {report_name}: {status}")
+    if warehouse_conn is not None:
+        warehouse_conn.close()
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
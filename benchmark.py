@@ -0,0 +1,749 @@
+"""
+Benchmark suite for the report functions: generates synthetic exports, times
+loading and each report separately, records peak memory and compares the run
+against a saved baseline so regressions show up before a release.
+
+    python -m benchmark [--rows 10k 100k 1M 5M] [--dataset NAME ...] [--format csv|xlsx]
+                        [--data-dir DIR] [--repeat N] [--output PATH]
+                        [--save-baseline PATH] [--baseline PATH [--time-tolerance F]
+                        [--memory-tolerance F]] [--engine pandas|polars ...]
+                        [--check-engines] [--check-copies]
+
+Synthetic exports use the exact column names the report functions check and are
+written once per (dataset, rows, seed, format) to --data-dir, so later runs only
+pay for loading. Load times are for parsing the file (no in-memory cache, no
+sidecar); report times start from the loaded frame, with per-frame memos cleared.
+Timings are the best of --repeat runs; peak memory is measured in a separate
+run under tracemalloc (NumPy and Python allocations). Each report's output is
+hashed, so a baseline comparison also catches changed results.
+
+Reports are timed on pandas unless --engine is given (see engines.py).
+--check-engines repeats the engine conformance check of tests/test_engines.py on
+the benchmark's exports: every report is run on pandas, the reference, and on
+each other engine, and any difference in the rendered output (values, types or
+row order) is a failure. --check-copies fails any
+report that copies the whole input frame rather than reading views of the
+columns it needs: its peak memory must not grow when unused columns are added.
+
+Exits with 1 when a comparison finds a regression. Does not import Qt.
+"""
+
+import argparse
+import datetime as dt
+import functools
+import hashlib
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import bookings
+import engines
+import functions
+import loaders
+import rendering
+
+BASELINE_FORMAT_VERSION = 1
+DEFAULT_ROWS = ("10k", "100k", "1M", "5M")
+DEFAULT_SEED = 20240601
+# Fixed report date, so outputs (and their hashes) do not change from day to day
+BENCHMARK_DATE = "2024-06-30"
+EXCEL_MAX_ROWS = 1_048_575  # One sheet, less the header row
+# Timings this short are mostly noise and never count as regressions
+MIN_COMPARED_SECONDS = 0.05
+# --check-copies: unused float columns added to each frame, and the share of their
+# size a report's peak memory may grow by before it counts as copying the frame
+PADDING_COLUMNS = 8
+COPY_TOLERANCE = 0.25
+
+
+# --- Synthetic Exports ---
+# Each generator returns a DataFrame shaped like the corresponding export as
+# pandas reads it from the file: text columns, and dates/lengths as text.
+
+MEMBER_PLAN_TYPES = ["Fortnightly-Fixed", "Upfront", "Casual", "Complimentary"]
+MEMBER_PLAN_NAMES = [
+    "Student Fortnightly",
+    "Staff Fortnightly",
+    "Community Fortnightly",
+    "Student 12 Month Upfront",
+    "Community 3 Month Upfront",
+    "10 Visit Pass",
+]
+FIRST_NAMES = ["Alex", "Sam", "Jordan", "Taylor", "Chris", "Morgan", "Jamie", "Riley"]
+LAST_NAMES = ["Smith", "Nguyen", "Brown", "Wilson", "Taylor", "Singh", "Chen", "Jones"]
+TECHNOGYM_OTHER_ACTIVITIES = ["Gym Floor Visit", "Cardio Assessment", "Cancelled"]
+GROUP_FITNESS_CLASSES = ["Yoga", "Pilates", "HIIT", "Spin", "Boxing", "Zumba"]
+BOOKING_DEFINITIONS = [
+    "Casual Court Hire",
+    "Member Court Booking",
+    "Club Competition",
+    "Unavailable - Maintenance",
+    "University Class - Sport Science",
+]
+BOOKING_ZONES = list(bookings.BUILTIN_ZONE_WEIGHTS) + [
+    "BUR - Squash Court",
+    "WF - Studio",
+]
+
+
+def _choice(rng: np.random.Generator, values: list, rows: int) -> np.ndarray:
+    return np.asarray(values, dtype=object)[rng.integers(0, len(values), rows)]
+
+
+def _date_text(rng: np.random.Generator, start: str, end: str, rows: int) -> pd.Series:
+    """Random days between start and end as YYYY-MM-DD text."""
+    first = np.datetime64(start, "D")
+    span = (np.datetime64(end, "D") - first).astype(int)
+    days = first + rng.integers(0, span + 1, rows).astype("timedelta64[D]")
+    return pd.Series(np.datetime_as_string(days, unit="D"), dtype=object)
+
+
+def make_member_export(rows: int, seed: int = DEFAULT_SEED) -> pd.DataFrame:
+    """
+    Member export: roughly 40% open-ended memberships, the rest ending in the
+    three years around BENCHMARK_DATE; joins over the five years before it.
+    """
+    rng = np.random.default_rng(seed)
+    member_ids = pd.Series(np.arange(rows)).astype(str)
+    end_dates = _date_text(rng, "2022-07-01", "2026-06-30", rows)
+    end_dates[rng.random(rows) < 0.4] = None
+    return pd.DataFrame(
+        {
+            "Name": _choice(rng, FIRST_NAMES, rows),
+            "Last name": _choice(rng, LAST_NAMES, rows),
+            "Email": ("member" + member_ids + "@example.com").to_numpy(),
+            "Mobile number": ("04" + member_ids.str.zfill(8)).to_numpy(),
+            "Club": _choice(rng, functions.CLUB_LIST, rows),
+            "Payment plan type": _choice(rng, MEMBER_PLAN_TYPES, rows),
+            "Payment Plan Name": _choice(rng, MEMBER_PLAN_NAMES, rows),
+            "Join date": _date_text(rng, "2019-07-01", BENCHMARK_DATE, rows),
+            "End date": end_dates,
+        }
+    )
+
+
+def make_technogym_export(rows: int, seed: int = DEFAULT_SEED) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    activities = (
+        functions.TECHNOGYM_CONSULTS
+        + functions.TECHNOGYM_PT_SESSIONS
+        + TECHNOGYM_OTHER_ACTIVITIES
+    )
+    return pd.DataFrame(
+        {
+            "Club": _choice(rng, functions.CLUB_LIST, rows),
+            "Activity": _choice(rng, activities, rows),
+            "Date": _date_text(rng, "2024-06-01", BENCHMARK_DATE, rows),
+        }
+    )
+
+
+def make_group_fitness_export(rows: int, seed: int = DEFAULT_SEED) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "Club": _choice(rng, functions.GROUP_FITNESS_CLUBS, rows),
+            "Class": _choice(rng, GROUP_FITNESS_CLASSES, rows),
+            "UserActive": rng.integers(0, 31, rows),
+        }
+    )
+
+
+def make_booking_export(rows: int, seed: int = DEFAULT_SEED) -> pd.DataFrame:
+    """Bookings with H:MM:SS lengths; about 1 in 500 lengths is unreadable."""
+    rng = np.random.default_rng(seed)
+    minutes = rng.integers(2, 13, rows) * 15
+    lengths = pd.Series(
+        [f"{m // 60}:{m % 60:02d}:00" for m in minutes.tolist()], dtype=object
+    )
+    lengths[rng.random(rows) < 0.002] = "TBC"
+    return pd.DataFrame(
+        {
+            "Facility Booking Definition": _choice(rng, BOOKING_DEFINITIONS, rows),
+            "Club": _choice(rng, functions.CLUB_LIST, rows),
+            "Club Zone Type Name": _choice(rng, BOOKING_ZONES, rows),
+            "Length of Booking": lengths,
+        }
+    )
+
+
+# Dataset name -> (generator, skiprows the export is read with)
+DATASETS = {
+    "members": (make_member_export, None),
+    "technogym": (make_technogym_export, None),
+    "group_fitness": (make_group_fitness_export, 1),  # Title row above the header
+    "bookings": (make_booking_export, None),
+}
+
+
+def write_export(df: pd.DataFrame, path: str, skiprows: int | None = None) -> None:
+    """Writes df as a CSV or XLSX export, with skiprows title rows above the header."""
+    if loaders.is_csv(path):
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            for _ in range(skiprows or 0):
+                f.write("Synthetic benchmark export\n")
+            df.to_csv(f, index=False)
+        return
+    if len(df) > EXCEL_MAX_ROWS:
+        raise ValueError(
+            f"{len(df):,} rows do not fit in one Excel sheet; use --format csv"
+        )
+    with pd.ExcelWriter(path) as writer:
+        df.to_excel(writer, index=False, startrow=skiprows or 0)
+
+
+def synthetic_export(
+    dataset: str,
+    rows: int,
+    data_dir: str,
+    file_format: str = "csv",
+    seed: int = DEFAULT_SEED,
+) -> str:
+    """Path of the synthetic export, generating it on first use."""
+    generator, skiprows = DATASETS[dataset]
+    path = os.path.join(data_dir, f"{dataset}_{rows}_{seed}.{file_format}")
+    if not os.path.exists(path):
+        os.makedirs(data_dir, exist_ok=True)
+        partial_path = f"{path}.partial.{file_format}"
+        write_export(generator(rows, seed), partial_path, skiprows)
+        os.replace(partial_path, path)
+    return path
+
+
+# --- Benchmarked Reports ---
+# Dataset -> [(report name, callable taking the loaded frame and a runner, output
+# is stable)]. The runner calls a report function on the engine being measured
+# (see engines.run). Ending Members compares against today's date, so its
+# output is not hashed.
+
+BENCHMARK_WEIGHTS = bookings.weights_table(bookings.BUILTIN_ZONE_WEIGHTS)
+
+REPORTS = {
+    "members": [
+        (
+            "Current Members",
+            lambda df, run: [
+                run(functions.current_members, df, club, BENCHMARK_DATE)
+                for club in functions.CLUB_LIST
+            ],
+            True,
+        ),
+        (
+            "New Members",
+            lambda df, run: [
+                run(functions.new_members, df, club, BENCHMARK_DATE)
+                for club in functions.CLUB_LIST
+            ],
+            True,
+        ),
+        (
+            "Ending Members Report",
+            lambda df, run: run(functions.generate_ending_members_report, df),
+            False,
+        ),
+        (
+            "Ending Members Lookahead",
+            lambda df, run: run(
+                functions.ending_members_between, df, BENCHMARK_DATE, "2024-07-31"
+            ),
+            True,
+        ),
+        (
+            "Active Members Series",
+            lambda df, run: run(
+                functions.active_members_series, df, "2023-07-01", BENCHMARK_DATE
+            ),
+            True,
+        ),
+        (
+            "New Members Trend",
+            lambda df, run: run(functions.new_members_trend, df, BENCHMARK_DATE),
+            True,
+        ),
+    ],
+    "technogym": [
+        (
+            "Technogym Reporting (Consults/PT)",
+            lambda df, run: run(functions.technogym_reporting, df),
+            True,
+        )
+    ],
+    "group_fitness": [
+        (
+            "Group Fitness Summary",
+            lambda df, run: run(functions.groupFitness, df),
+            True,
+        )
+    ],
+    "bookings": [
+        (
+            "Booking Zones Analysis",
+            lambda df, run: run(functions.booking_zones, df, BENCHMARK_WEIGHTS),
+            True,
+        )
+    ],
+}
+
+
+def runner(engine: str):
+    """run(function, df, *args) calling report functions on engine."""
+    return functools.partial(engines.run, engine=engine)
+
+
+def parse_rows(text: str) -> int:
+    """Row counts such as "5000", "10k" or "1.5M"."""
+    multipliers = {"k": 1_000, "m": 1_000_000}
+    text = text.strip().replace("_", "").replace(",", "")
+    suffix = text[-1:].lower()
+    try:
+        if suffix in multipliers:
+            rows = round(float(text[:-1]) * multipliers[suffix])
+        else:
+            rows = int(text)
+    except ValueError:
+        raise ValueError(f"not a row count: '{text}'") from None
+    if rows < 1:
+        raise ValueError(f"row count must be at least 1, got '{text}'")
+    return rows
+
+
+def output_digest(output) -> str:
+    """Stable hash of a report's output (ReportResults, DataFrames, or lists of them)."""
+    digest = hashlib.sha256()
+
+    def _add(value) -> None:
+        if isinstance(value, (list, tuple)):
+            for item in value:
+                _add(item)
+        elif isinstance(value, pd.DataFrame):
+            digest.update(value.to_csv(index=False).encode("utf-8"))
+        elif isinstance(value, rendering.ReportResult):
+            digest.update(rendering.to_html(value).encode("utf-8"))
+        else:
+            digest.update(str(value).encode("utf-8"))
+
+    _add(output)
+    return digest.hexdigest()[:16]
+
+
+def _fresh(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Shallow copy of df: shares its data but is a new object, so nothing memoized
+    for df (membership.frame_memo) is reused and each run computes from scratch.
+    """
+    bookings._text_to_ns.cache_clear()
+    return df.copy(deep=False)
+
+
+def best_time(function, repeat: int) -> tuple[float, object]:
+    """Best wall time of `repeat` calls, and the last call's result."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def peak_memory_mb(function) -> float:
+    """Peak traced allocation while function runs, in MB."""
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1_000_000
+
+
+def benchmark_dataset(
+    dataset: str,
+    file_path: str,
+    rows: int,
+    repeat: int = 3,
+    measure_memory=True,
+    engine_names: tuple[str, ...] = (engines.PANDAS,),
+) -> list[dict]:
+    """Load and report cases (one per engine) for one synthetic export."""
+    seconds, df = best_time(lambda: load_dataset(dataset, file_path), repeat)
+    cases = [
+        {
+            "phase": "load",
+            "dataset": dataset,
+            "rows": rows,
+            "report": "",
+            "engine": "",
+            "seconds": seconds,
+            "peak_mb": (
+                peak_memory_mb(lambda: load_dataset(dataset, file_path))
+                if measure_memory
+                else None
+            ),
+            "digest": None,
+        }
+    ]
+    for engine in engine_names:
+        run = runner(engine)
+        for report_name, report, stable in REPORTS[dataset]:
+            seconds, output = best_time(lambda: report(_fresh(df), run), repeat)
+            cases.append(
+                {
+                    "phase": "compute",
+                    "dataset": dataset,
+                    "rows": rows,
+                    "report": report_name,
+                    "engine": engine,
+                    "seconds": seconds,
+                    "peak_mb": (
+                        peak_memory_mb(lambda: report(_fresh(df), run))
+                        if measure_memory
+                        else None
+                    ),
+                    "digest": output_digest(output) if stable else None,
+                }
+            )
+    return cases
+
+
+def load_dataset(dataset: str, file_path: str) -> pd.DataFrame:
+    """Parses a synthetic export (no in-memory cache, no sidecar)."""
+    return loaders.load_export(
+        file_path, DATASETS[dataset][1], cache=None, use_sidecar=False
+    )
+
+
+def _conformance_text(output) -> str:
+    """Every item of a report's output as CSV/HTML and as JSON (types included)."""
+    items = output if isinstance(output, list) else [output]
+    return "\n".join(
+        output_digest(item) + rendering.to_json(item) for item in items
+    )
+
+
+def check_engines(dataset: str, df: pd.DataFrame, engine: str) -> list[str]:
+    """
+    Reports in REPORTS[dataset] whose output on engine differs from the pandas
+    reference (compared as rendered, so values, types and row order all count).
+    """
+    mismatches = []
+    for report_name, report, _ in REPORTS[dataset]:
+        outputs = []
+        for name in (engines.PANDAS, engine):
+            try:
+                outputs.append(_conformance_text(report(_fresh(df), runner(name))))
+            except Exception as e:
+                outputs.append(f"error: {type(e).__name__}: {e}")
+        if outputs[0] != outputs[1]:
+            mismatches.append(f"{dataset} {len(df):,} rows, {report_name} ({engine})")
+    return mismatches
+
+
+def _padded(df: pd.DataFrame) -> tuple[pd.DataFrame, float]:
+    """df plus PADDING_COLUMNS float columns no report reads, and their size in MB."""
+    padding = pd.DataFrame(
+        np.zeros((len(df), PADDING_COLUMNS)),
+        index=df.index,
+        columns=[f"Padding {i + 1}" for i in range(PADDING_COLUMNS)],
+    )
+    return pd.concat([df, padding], axis=1), padding.memory_usage(index=False).sum() / 1e6
+
+
+def check_copies(dataset: str, df: pd.DataFrame, engine: str) -> list[str]:
+    """
+    Reports in REPORTS[dataset] that copy the whole frame on engine. Each report's
+    peak memory is measured on df and on df with columns no report reads: a report
+    working on views of the columns it needs costs the same on both, one that
+    copies or filters the whole frame also pays for the unused columns.
+    """
+    padded, padding_mb = _padded(df)
+    run = runner(engine)
+    copies = []
+    for report_name, report, _ in REPORTS[dataset]:
+        narrow_mb = peak_memory_mb(lambda: report(_fresh(df), run))
+        wide_mb = peak_memory_mb(lambda: report(_fresh(padded), run))
+        if wide_mb - narrow_mb > padding_mb * COPY_TOLERANCE:
+            copies.append(
+                f"{dataset} {len(df):,} rows, {report_name} ({engine}): "
+                f"{wide_mb - narrow_mb:.1f} MB more with {padding_mb:.1f} MB of "
+                "unused columns"
+            )
+    return copies
+
+
+def environment() -> dict:
+    return {
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def _case_key(case: dict) -> tuple:
+    # Baselines from before engines were measured hold pandas cases only
+    engine = case.get("engine", engines.PANDAS if case["report"] else "")
+    return case["phase"], case["dataset"], case["rows"], case["report"], engine
+
+
+def compare(
+    results: dict,
+    baseline: dict,
+    time_tolerance: float = 0.25,
+    memory_tolerance: float = 0.25,
+) -> list[str]:
+    """
+    Regressions of results against baseline: cases more than time_tolerance
+    (a fraction) slower, or memory_tolerance heavier, and reports whose output
+    changed. Cases missing from either side are ignored.
+    """
+    baseline_cases = {_case_key(case): case for case in baseline.get("cases", [])}
+    regressions = []
+    for case in results["cases"]:
+        before = baseline_cases.get(_case_key(case))
+        if before is None:
+            continue
+        label = _case_label(case)
+        if case["seconds"] >= MIN_COMPARED_SECONDS and case["seconds"] > before[
+            "seconds"
+        ] * (1 + time_tolerance):
+            regressions.append(
+                f"{label}: {before['seconds']:.3f}s -> {case['seconds']:.3f}s"
+            )
+        if (
+            case["peak_mb"] is not None
+            and before["peak_mb"] is not None
+            and case["peak_mb"] > before["peak_mb"] * (1 + memory_tolerance)
+        ):
+            regressions.append(
+                f"{label}: peak {before['peak_mb']:.1f} MB -> {case['peak_mb']:.1f} MB"
+            )
+        if (
+            case["digest"] is not None
+            and before["digest"] is not None
+            and case["digest"] != before["digest"]
+        ):
+            regressions.append(f"{label}: output changed")
+    return regressions
+
+
+def _case_label(case: dict) -> str:
+    name = case["report"] or "load"
+    if case.get("engine") not in (None, "", engines.PANDAS):
+        name += f" [{case['engine']}]"
+    return f"{case['dataset']} {case['rows']:,} rows, {name}"
+
+
+def _print_cases(cases: list[dict]) -> None:
+    for case in cases:
+        peak = "" if case["peak_mb"] is None else f"  peak {case['peak_mb']:9.1f} MB"
+        print(f"  {_case_label(case):<60} {case['seconds']:9.3f}s{peak}")
+
+
+def _write_json(data: dict, path: str) -> None:
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmark",
+        description="Time loading and every report on synthetic exports.",
+    )
+    parser.add_argument(
+        "--rows",
+        nargs="+",
+        default=list(DEFAULT_ROWS),
+        help="Export sizes, e.g. 10k 1M (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--dataset",
+        dest="datasets",
+        action="append",
+        choices=list(DATASETS),
+        help="Dataset to benchmark (repeatable, default: all)",
+    )
+    parser.add_argument(
+        "--format",
+        dest="file_format",
+        choices=["csv", "xlsx"],
+        default="csv",
+        help="Synthetic export format (xlsx holds at most 1,048,575 rows)",
+    )
+    parser.add_argument(
+        "--data-dir",
+        default=os.path.join(tempfile.gettempdir(), "reporting-benchmark"),
+        help="Where synthetic exports are generated and reused (default: %(default)s)",
+    )
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Runs per case; the best time is kept (default: 3)",
+    )
+    parser.add_argument(
+        "--no-memory",
+        action="store_true",
+        help="Skip the tracemalloc peak memory runs",
+    )
+    parser.add_argument(
+        "--engine",
+        dest="engines",
+        action="append",
+        choices=engines.ENGINES,
+        help="Engine to time the reports on (repeatable, default: pandas)",
+    )
+    parser.add_argument(
+        "--check-engines",
+        action="store_true",
+        help="Also check every report gives identical results on each --engine "
+        "as on pandas (default with --check-engines: polars)",
+    )
+    parser.add_argument(
+        "--check-copies",
+        action="store_true",
+        help="Also check no report copies the whole frame, on each --engine",
+    )
+    parser.add_argument("--output", metavar="PATH", help="Write results as JSON")
+    parser.add_argument(
+        "--save-baseline", metavar="PATH", help="Save results as the new baseline"
+    )
+    parser.add_argument(
+        "--baseline", metavar="PATH", help="Compare results with this baseline"
+    )
+    parser.add_argument(
+        "--time-tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed slowdown as a fraction before a case regresses (default: 0.25)",
+    )
+    parser.add_argument(
+        "--memory-tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed peak memory growth as a fraction (default: 0.25)",
+    )
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        sizes = sorted({parse_rows(text) for text in args.rows})
+    except ValueError as e:
+        print(f"Error: --rows {e}", file=sys.stderr)
+        return 2
+    if args.repeat < 1:
+        print("Error: --repeat must be at least 1", file=sys.stderr)
+        return 2
+    if args.file_format == "xlsx" and sizes[-1] > EXCEL_MAX_ROWS:
+        print(
+            f"Error: xlsx exports hold at most {EXCEL_MAX_ROWS:,} rows; "
+            "use --format csv for larger sizes",
+            file=sys.stderr,
+        )
+        return 2
+
+    engine_names = tuple(dict.fromkeys(args.engines or [engines.PANDAS]))
+    checked_engines = [
+        engine for engine in (args.engines or [engines.POLARS]) if engine != engines.PANDAS
+    ]
+    unavailable = [
+        engine
+        for engine in (*engine_names, *(checked_engines if args.check_engines else ()))
+        if not engines.available(engine)
+    ]
+    if unavailable:
+        print(f"Error: {unavailable[0]} is not installed", file=sys.stderr)
+        return 2
+
+    baseline = None
+    if args.baseline:
+        try:
+            with open(args.baseline, encoding="utf-8") as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error: could not read baseline: {e}", file=sys.stderr)
+            return 2
+
+    mismatches = []
+    copies = []
+    results = {
+        "format_version": BASELINE_FORMAT_VERSION,
+        "created": dt.datetime.now().isoformat(timespec="seconds"),
+        "environment": environment(),
+        "file_format": args.file_format,
+        "seed": args.seed,
+        "cases": [],
+    }
+    for dataset in args.datasets or list(DATASETS):
+        for rows in sizes:
+            print(f"{dataset}, {rows:,} rows:", flush=True)
+            file_path = synthetic_export(
+                dataset, rows, args.data_dir, args.file_format, args.seed
+            )
+            cases = benchmark_dataset(
+                dataset, file_path, rows, args.repeat, not args.no_memory, engine_names
+            )
+            _print_cases(cases)
+            results["cases"].extend(cases)
+            if args.check_engines or args.check_copies:
+                df = load_dataset(dataset, file_path)
+            if args.check_engines:
+                for engine in checked_engines:
+                    mismatches.extend(check_engines(dataset, df, engine))
+            if args.check_copies:
+                for engine in engine_names:
+                    copies.extend(check_copies(dataset, df, engine))
+
+    if args.output:
+        _write_json(results, args.output)
+    if args.save_baseline:
+        _write_json(results, args.save_baseline)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    exit_code = 0
+    if args.check_engines:
+        if mismatches:
+            print(f"{len(mismatches)} report(s) differ from the pandas reference:")
+            for mismatch in mismatches:
+                print(f"  {mismatch}")
+            exit_code = 1
+        else:
+            print(f"Every report matches the pandas reference on {', '.join(checked_engines)}")
+    if args.check_copies:
+        if copies:
+            print(f"{len(copies)} report(s) copy the whole frame:")
+            for copy in copies:
+                print(f"  {copy}")
+            exit_code = 1
+        else:
+            print("No report copies the whole frame")
+
+    if baseline is None:
+        return exit_code
+    if baseline.get("environment") != results["environment"]:
+        print("Note: baseline was recorded in a different environment")
+    regressions = compare(results, baseline, args.time_tolerance, args.memory_tolerance)
+    if not regressions:
+        print("No regressions against the baseline")
+        return exit_code
+    print(f"{len(regressions)} regression(s) against the baseline:")
+    for regression in regressions:
+        print(f"  {regression}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,244 @@
+import datetime as dt
+import functools
+import json
+import math
+import os
+import re
+import sys
+import threading
+from fractions import Fraction
+
+import numpy as np
+import pandas as pd
+
+# --- Booking Zone Weights ---
+# Booking Zones Analysis multiplies each zone's total booked time by a weight
+# (e.g. a badminton court is one sixth of a hall). Weights are read from
+# zone_weights.json, optionally overridden per club, and applied as a vectorized
+# lookup over the grouped totals.
+
+ZONE_WEIGHTS_FILENAME = "zone_weights.json"
+DEFAULT_ZONE_WEIGHT = 1.0
+
+# Used when no weights file can be found
+BUILTIN_ZONE_WEIGHTS = {
+    "BUR - Badminton Court": 1 / 6,
+    "WP - Badminton Court": 1 / 6,
+    "BUR - Court": 1 / 2,
+    "WP - Court": 1 / 2,
+    "WP - Athletic Track Lane": 1 / 4,
+}
+
+WEIGHT_COLUMNS = ["Club", "Club Zone Type Name", "Weight"]
+
+_weights_cache: dict[tuple, pd.DataFrame] = {}
+_weights_cache_lock = threading.Lock()
+
+
+def default_weights_path() -> str:
+    """
+    Weights file location: REPORTING_ZONE_WEIGHTS if set, otherwise
+    zone_weights.json next to this module (or inside the PyInstaller bundle).
+    """
+    override = os.environ.get("REPORTING_ZONE_WEIGHTS")
+    if override:
+        return override
+    base_path = getattr(sys, "_MEIPASS", os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(base_path, ZONE_WEIGHTS_FILENAME)
+
+
+def _parse_weight(value) -> float:
+    """Accepts numbers and fraction strings such as "1/6"."""
+    if isinstance(value, str):
+        return float(Fraction(value.strip()))
+    return float(value)
+
+
+def weights_table(
+    default: dict[str, float], clubs: dict[str, dict[str, float]] | None = None
+) -> pd.DataFrame:
+    """
+    Builds the weights table used by apply_zone_weights. Default weights have a
+    null Club; per-club overrides name the club they apply to.
+    """
+    rows = [(None, zone, _parse_weight(w)) for zone, w in default.items()]
+    for club, zone_weights in (clubs or {}).items():
+        rows.extend((club, zone, _parse_weight(w)) for zone, w in zone_weights.items())
+    return pd.DataFrame(rows, columns=WEIGHT_COLUMNS)
+
+
+def load_zone_weights(path: str | None = None) -> pd.DataFrame:
+    """
+    Loads the zone weights table from a JSON file of the form
+    {"default": {zone: weight}, "clubs": {club: {zone: weight}}}.
+    Falls back to BUILTIN_ZONE_WEIGHTS when the default file does not exist.
+    Results are cached until the file changes.
+    """
+    explicit_path = path is not None
+    path = path or default_weights_path()
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        if explicit_path:
+            raise
+        return weights_table(BUILTIN_ZONE_WEIGHTS)
+
+    cache_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    with _weights_cache_lock:
+        cached = _weights_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+    try:
+        table = weights_table(config.get("default", {}), config.get("clubs", {}))
+    except (ValueError, ZeroDivisionError, TypeError) as e:
+        raise ValueError(f"Invalid weight in {path}: {e}")
+
+    with _weights_cache_lock:
+        _weights_cache[cache_key] = table
+    return table
+
+
+def zone_weights_for(
+    clubs: pd.Series, zones: pd.Series, weights: pd.DataFrame
+) -> np.ndarray:
+    """
+    Weight for each (club, zone) pair: the club's override if there is one,
+    else the default weight for the zone, else DEFAULT_ZONE_WEIGHT.
+    """
+    is_default = weights["Club"].isna()
+    default_weights = (
+        weights.loc[is_default]
+        .drop_duplicates("Club Zone Type Name", keep="last")
+        .set_index("Club Zone Type Name")["Weight"]
+    )
+    result = zones.map(default_weights).to_numpy(dtype="float64", na_value=np.nan)
+
+    club_weights = weights.loc[~is_default].drop_duplicates(
+        ["Club", "Club Zone Type Name"], keep="last"
+    )
+    if not club_weights.empty:
+        overrides = (
+            club_weights.set_index(["Club", "Club Zone Type Name"])["Weight"]
+            .reindex(pd.MultiIndex.from_arrays([clubs, zones]))
+            .to_numpy(dtype="float64", na_value=np.nan)
+        )
+        result = np.where(np.isnan(overrides), result, overrides)
+
+    return np.where(np.isnan(result), DEFAULT_ZONE_WEIGHT, result)
+
+
+# --- Booking Duration Parsing ---
+# "Length of Booking" arrives in whatever shape the booking system or Excel gives
+# it: "HH:MM:SS" / "HH:MM" text, minutes as numbers, Excel fractional days, or
+# time/timedelta cells. Values are parsed per element (one bad cell no longer
+# wipes out the column), but only once per distinct value: booking lengths repeat
+# heavily, so the column is factorized and each unique value is parsed once, with
+# text conversions also cached across calls.
+
+_HMS_PATTERN = re.compile(r"^(\d+):([0-5]?\d)(?::([0-5]?\d(?:\.\d+)?))?$")
+_NS_PER_MINUTE = 60 * 1_000_000_000
+_NS_PER_SECOND = 1_000_000_000
+# Excel stores durations as days since its epoch; openpyxl turns values of one
+# day or more into datetimes counted from this date.
+_EXCEL_DURATION_EPOCH = dt.datetime(1899, 12, 31)
+
+
+def _number_to_ns(value: float) -> int | None:
+    """
+    Numbers are minutes, except non-whole values between 0 and 1, which are
+    Excel fractional days (e.g. 0.0416667 for one hour), rounded to the second.
+    """
+    if not math.isfinite(value) or value < 0:
+        return None
+    if 0 < value < 1:
+        return round(value * 86400) * _NS_PER_SECOND
+    return round(value * _NS_PER_MINUTE)
+
+
+@functools.lru_cache(maxsize=4096)
+def _text_to_ns(text: str) -> int | None:
+    text = text.strip()
+    match = _HMS_PATTERN.match(text)
+    if match:
+        hours, minutes, seconds = match.groups()
+        return round(
+            (int(hours) * 3600 + int(minutes) * 60 + float(seconds or 0)) * 1e9
+        )
+    try:
+        return _number_to_ns(float(text))
+    except ValueError:
+        pass
+    try:
+        parsed = pd.Timedelta(text)  # e.g. "1 days 02:00:00", "90min"
+    except ValueError:
+        return None
+    return None if pd.isna(parsed) else parsed.value
+
+
+def _duration_to_ns(value) -> int | None:
+    """Nanoseconds for one "Length of Booking" value, or None if unreadable."""
+    if isinstance(value, str):
+        return _text_to_ns(value)
+    if isinstance(value, (pd.Timedelta, dt.timedelta, np.timedelta64)):
+        return pd.Timedelta(value).value
+    if isinstance(value, dt.datetime):
+        if value.year in (1899, 1900):
+            return pd.Timedelta(value - _EXCEL_DURATION_EPOCH).value
+        return None
+    if isinstance(value, dt.time):
+        return pd.Timedelta(
+            hours=value.hour,
+            minutes=value.minute,
+            seconds=value.second,
+            microseconds=value.microsecond,
+        ).value
+    if isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(
+        value, bool
+    ):
+        return _number_to_ns(float(value))
+    return None
+
+
+def parse_durations(values: pd.Series) -> tuple[pd.Series, int]:
+    """
+    Parses booking lengths to timedelta64[ns].
+
+    Returns the parsed Series (same index, NaT where a value is missing or could
+    not be read) and the number of non-empty values that could not be parsed.
+    """
+    if pd.api.types.is_timedelta64_dtype(values):
+        return values.astype("timedelta64[ns]"), 0
+
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        numbers = values.astype("float64").to_numpy()
+        fractional_day = (numbers > 0) & (numbers < 1)
+        ns = np.where(
+            fractional_day,
+            np.round(numbers * 86400) * _NS_PER_SECOND,
+            numbers * _NS_PER_MINUTE,
+        )
+        invalid = ~np.isfinite(ns) | (numbers < 0)
+        unparsed = int((invalid & ~np.isnan(numbers)).sum())
+        parsed = (
+            np.where(invalid, 0, np.round(ns)).astype("int64").view("timedelta64[ns]")
+        )
+        parsed[invalid] = np.timedelta64("NaT")
+        return pd.Series(parsed, index=values.index, name=values.name), unparsed
+
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    unique_ns = [_duration_to_ns(value) for value in uniques]
+    unique_parsed = np.array(
+        [np.timedelta64("NaT") if ns is None else ns for ns in unique_ns],
+        dtype="timedelta64[ns]",
+    )
+    parsed = np.append(unique_parsed, np.timedelta64("NaT"))[codes]  # -1 -> NaT
+
+    is_blank = np.array(
+        [isinstance(v, str) and not v.strip() for v in uniques], dtype=bool
+    )
+    failed_uniques = np.array([ns is None for ns in unique_ns], dtype=bool) & ~is_blank
+    unparsed = int(failed_uniques[codes[codes >= 0]].sum())
+    return pd.Series(parsed, index=values.index, name=values.name), unparsed
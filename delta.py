@@ -0,0 +1,381 @@
+import json
+import os
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+import functions
+import membership
+import rendering
+import sidecar
+
+# --- Incremental Snapshot Processing ---
+# The member export is a full snapshot every day, but only a few hundred rows
+# change between days. A MemberSnapshot keeps the previous export's rows indexed
+# by member identity, a hash of each row, and the active-member counts as of one
+# date. apply_export() diffs a new export against it and updates the counts from
+# the changed rows only, instead of regrouping the whole export.
+
+IDENTITY_COLUMNS = ("Name", "Last name", "Email")
+TRACKED_COLUMNS = (
+    "Club",
+    "Payment plan type",
+    "Payment Plan Name",
+    "Join date",
+    "End date",
+    "Mobile number",
+)
+OCCURRENCE_LEVEL = "Occurrence"
+CHANGE_LOG_COLUMNS = ["Change", "Name", "Last name", "Email", "Club", "Detail"]
+SNAPSHOT_FORMAT_VERSION = 1
+_ROW_HASH_COLUMN = "_row_hash"
+
+
+@dataclass
+class MemberSnapshot:
+    """
+    One export's member rows (indexed by identity, see member_rows), their row
+    hashes, and the active-member counts per club and plan as of `as_of`.
+    """
+
+    rows: pd.DataFrame
+    row_hashes: pd.Series
+    counts: pd.DataFrame
+    as_of: pd.Timestamp
+
+    def active_counts(self, end_date: str) -> pd.DataFrame:
+        """
+        Counts as membership.active_member_counts(export, end_date) would give them.
+        Moving to another date only regroups members whose "End date" falls
+        between the two dates.
+        """
+        end_date_dt = pd.to_datetime(end_date, format="%Y-%m-%d")
+        if end_date_dt == self.as_of:
+            return self.counts
+        end_dates = membership.parsed_dates(self.rows, "End date")
+        low, high = sorted((self.as_of, end_date_dt))
+        window = self.rows[(end_dates > low) & (end_dates <= high)]
+        # Everyone in the window is active at the earlier date and not the later one
+        window_counts = membership.active_member_counts(window, str(low.date()))
+        sign = -1 if end_date_dt > self.as_of else 1
+        return _combine_counts(self.counts, window_counts, sign)
+
+    def advance_to(self, end_date: str) -> None:
+        """Makes end_date the date the stored counts are kept for."""
+        self.counts = self.active_counts(end_date)
+        self.as_of = pd.to_datetime(end_date, format="%Y-%m-%d")
+
+    def current_members(
+        self, target_club: str, end_date: str
+    ) -> rendering.ReportResult:
+        """Same output as functions.current_members on the snapshot's export."""
+        counts = self.active_counts(end_date)
+        return functions.current_members_result(
+            membership.club_count(
+                counts, target_club, membership.TARGET_PAYMENT_PLANS[0]
+            ),
+            membership.club_count(counts, target_club, membership.TOTAL_COLUMN),
+        )
+
+    def ending_members(self, end_date: str | None = None) -> pd.DataFrame:
+        """
+        Same rows as functions.generate_ending_members_report(export, end_date).
+        member_rows keys missing identities as ""; they are missing values again
+        here (nullable "string" columns), whether the snapshot was just built or
+        loaded from disk.
+        """
+        rows = self.rows.reset_index()
+        for col in IDENTITY_COLUMNS:
+            rows[col] = rows[col].astype("string").mask(rows[col] == "")
+        return functions.generate_ending_members_report(rows, end_date)
+
+
+def _combine_counts(
+    counts: pd.DataFrame, delta: pd.DataFrame, sign: int
+) -> pd.DataFrame:
+    combined = counts.add(sign * delta, fill_value=0).fillna(0).astype("int64")
+    combined.index.name = "Club"
+    return combined
+
+
+def _check_columns(df: pd.DataFrame) -> None:
+    required = list(IDENTITY_COLUMNS) + functions.CURRENT_MEMBERS_COLUMNS
+    missing = [col for col in required if col not in df.columns]
+    if missing:
+        raise ValueError(
+            f"Member snapshot: Missing required columns: {', '.join(missing)}"
+        )
+
+
+def member_rows(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    The export's identity and tracked columns, indexed by (Name, Last name, Email,
+    Occurrence). Occurrence numbers repeated identities (e.g. two memberships for
+    one person) in export order, so every row has a unique key.
+    """
+    _check_columns(df)
+    identity = pd.DataFrame(
+        {col: df[col].astype("string").fillna("") for col in IDENTITY_COLUMNS}
+    )
+    occurrence = identity.groupby(list(IDENTITY_COLUMNS), sort=False).cumcount()
+    index = pd.MultiIndex.from_arrays(
+        [identity[col] for col in IDENTITY_COLUMNS] + [occurrence],
+        names=list(IDENTITY_COLUMNS) + [OCCURRENCE_LEVEL],
+    )
+    tracked = [col for col in TRACKED_COLUMNS if col in df.columns]
+    rows = df[tracked].set_axis(index, axis=0)
+    return rows
+
+
+def row_hashes(rows: pd.DataFrame) -> pd.Series:
+    """
+    Hash of each row's tracked values. Dates are hashed as parsed datetimes and
+    categories by value, so the hash does not depend on how a column was typed.
+    """
+    canonical = rows.assign(
+        **{
+            col: membership.parsed_dates(rows, col)
+            for col in ("Join date", "End date")
+            if col in rows.columns
+        }
+    )
+    return pd.util.hash_pandas_object(canonical, index=False).set_axis(rows.index)
+
+
+def build_snapshot(df: pd.DataFrame, end_date: str) -> MemberSnapshot:
+    """Snapshot of a full export, with counts as of end_date (a full groupby)."""
+    rows = member_rows(df)
+    return MemberSnapshot(
+        rows=rows,
+        row_hashes=row_hashes(rows),
+        counts=membership.active_member_counts(rows, end_date),
+        as_of=pd.to_datetime(end_date, format="%Y-%m-%d"),
+    )
+
+
+def _as_text(series: pd.Series) -> pd.Series:
+    """Values as display strings for the change log, "(none)" when empty."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        text = series.dt.strftime("%Y-%m-%d")
+    else:
+        text = series.astype("string")
+    return text.fillna("(none)")
+
+
+def _describe(columns: list[str], old: pd.DataFrame, new: pd.DataFrame) -> pd.Series:
+    """
+    "col: old -> new" for each of columns whose text differs, joined with "; ".
+    Empty where none differ.
+    """
+    detail = pd.Series("", index=new.index, dtype="string")
+    for col in columns:
+        differs = old[col] != new[col]
+        part = col + ": " + old[col] + " -> " + new[col]
+        detail = detail.mask(differs & (detail != ""), detail + "; " + part)
+        detail = detail.mask(differs & (detail == ""), part)
+    return detail
+
+
+def change_log(
+    old_rows: pd.DataFrame,
+    new_rows: pd.DataFrame,
+    added: np.ndarray,
+    removed: np.ndarray,
+    changed_old: np.ndarray,
+    changed_new: np.ndarray,
+) -> pd.DataFrame:
+    """
+    One row per change: "joined" / "removed" for members new to or missing from
+    the export, and "ended", "end date cleared", "plan changed", "club changed" or
+    "updated" (other tracked columns) for members present in both. Rows are
+    given by position: added in new_rows, removed in old_rows, and each changed
+    member at changed_old in old_rows and changed_new in new_rows.
+    """
+    entries = []
+
+    def _log(change: str, rows: pd.DataFrame, detail: pd.Series) -> None:
+        if rows.empty:
+            return
+        entries.append(
+            pd.DataFrame(
+                {
+                    "Change": change,
+                    "Name": rows["Name"].to_numpy(),
+                    "Last name": rows["Last name"].to_numpy(),
+                    "Email": rows["Email"].to_numpy(),
+                    "Club": _as_text(rows["Club"]).to_numpy(),
+                    "Detail": detail.to_numpy(),
+                }
+            )
+        )
+
+    # Flatten the (few) selected rows: slices of a large MultiIndex keep its
+    # levels, which makes every later operation on them slow
+    joined = new_rows.iloc[added].reset_index()
+    _log("joined", joined, "Plan: " + _as_text(joined["Payment plan type"]))
+    gone = old_rows.iloc[removed].reset_index()
+    _log("removed", gone, pd.Series("No longer in the export", index=gone.index))
+
+    columns = [col for col in new_rows.columns if col in old_rows.columns]
+    old_changed = old_rows.iloc[changed_old].reset_index()
+    new_changed = new_rows.iloc[changed_new].reset_index()
+    changed = new_changed.index
+    old_text, new_text = {}, {}
+    for col in columns:
+        if col in ("Join date", "End date"):
+            old_text[col] = _as_text(
+                membership.parsed_dates(old_changed, col)
+            )
+            new_text[col] = _as_text(
+                membership.parsed_dates(new_changed, col)
+            )
+        else:
+            old_text[col] = _as_text(old_changed[col])
+            new_text[col] = _as_text(new_changed[col])
+    old_text = pd.DataFrame(old_text, index=changed)
+    new_text = pd.DataFrame(new_text, index=changed)
+
+    end_detail = _describe(["End date"], old_text, new_text)
+    ended = (new_text["End date"] != "(none)") & (end_detail != "")
+    _log("ended", new_changed[ended.to_numpy()], end_detail[ended])
+    cleared = (new_text["End date"] == "(none)") & (end_detail != "")
+    _log("end date cleared", new_changed[cleared.to_numpy()], end_detail[cleared])
+
+    plan_columns = [
+        col for col in ("Payment plan type", "Payment Plan Name") if col in columns
+    ]
+    plan_detail = _describe(plan_columns, old_text, new_text)
+    planned = plan_detail != ""
+    _log("plan changed", new_changed[planned.to_numpy()], plan_detail[planned])
+
+    club_detail = _describe(["Club"], old_text, new_text)
+    moved = club_detail != ""
+    _log("club changed", new_changed[moved.to_numpy()], club_detail[moved])
+
+    handled = {"End date", "Club", *plan_columns}
+    other_detail = _describe(
+        [col for col in columns if col not in handled], old_text, new_text
+    )
+    updated = other_detail != ""
+    _log("updated", new_changed[updated.to_numpy()], other_detail[updated])
+
+    if not entries:
+        return pd.DataFrame(columns=CHANGE_LOG_COLUMNS)
+    return pd.concat(entries, ignore_index=True)
+
+
+def apply_export(
+    snapshot: MemberSnapshot, df: pd.DataFrame, end_date: str | None = None
+) -> tuple[MemberSnapshot, pd.DataFrame]:
+    """
+    Diffs a new full export against snapshot and returns (new snapshot, change
+    log). The new snapshot's counts are the old counts minus the contribution of
+    removed and changed rows plus that of added and changed rows, then moved to
+    end_date (default: the snapshot's date). The old snapshot is not modified.
+    """
+    new_rows = member_rows(df)
+    new_hashes = row_hashes(new_rows)
+    old_hashes = snapshot.row_hashes
+
+    # Work with positions: one hash-table lookup of the new keys in the old index
+    old_positions = old_hashes.index.get_indexer(new_hashes.index)
+    matched = old_positions >= 0
+    added = np.flatnonzero(~matched)
+    in_both = np.flatnonzero(matched)
+    differs = (
+        old_hashes.to_numpy()[old_positions[in_both]] != new_hashes.to_numpy()[in_both]
+    )
+    changed_new = in_both[differs]
+    changed_old = old_positions[changed_new]
+    still_present = np.zeros(len(old_hashes), dtype=bool)
+    still_present[old_positions[matched]] = True
+    removed = np.flatnonzero(~still_present)
+
+    as_of = str(snapshot.as_of.date())
+    outgoing = snapshot.rows.iloc[np.concatenate([removed, changed_old])]
+    incoming = new_rows.iloc[np.concatenate([added, changed_new])]
+    counts = _combine_counts(
+        snapshot.counts, membership.active_member_counts(outgoing, as_of), -1
+    )
+    counts = _combine_counts(
+        counts, membership.active_member_counts(incoming, as_of), 1
+    )
+
+    updated = MemberSnapshot(new_rows, new_hashes, counts, snapshot.as_of)
+    if end_date is not None:
+        updated.advance_to(end_date)
+    log = change_log(snapshot.rows, new_rows, added, removed, changed_old, changed_new)
+    return updated, log
+
+
+# --- Persistence ---
+# Snapshots are stored as Feather files (rows, row hashes, and the counts in the
+# schema metadata), like the load sidecars; without pyarrow they cannot be saved.
+
+
+def save_snapshot(snapshot: MemberSnapshot, path: str) -> None:
+    if not sidecar.sidecars_available():
+        raise RuntimeError("Saving member snapshots requires pyarrow")
+    rows = snapshot.rows.reset_index()
+    rows[_ROW_HASH_COLUMN] = snapshot.row_hashes.to_numpy()
+    table = sidecar.pa.Table.from_pandas(
+        sidecar.normalize_for_storage(rows), preserve_index=False
+    )
+    counts = snapshot.counts.reset_index()
+    metadata = {
+        "version": SNAPSHOT_FORMAT_VERSION,
+        "as_of": str(snapshot.as_of.date()),
+        "counts": counts.to_dict(orient="split"),
+    }
+    table = table.replace_schema_metadata(
+        {**(table.schema.metadata or {}), b"member_snapshot": json.dumps(metadata)}
+    )
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    sidecar.feather.write_feather(table, tmp_path, compression="uncompressed")
+    os.replace(tmp_path, path)
+
+
+def load_snapshot(path: str) -> MemberSnapshot | None:
+    """The snapshot saved at path, or None if there is none (or it is unusable)."""
+    if not sidecar.sidecars_available() or not os.path.exists(path):
+        return None
+    try:
+        table = sidecar.feather.read_table(path)
+        metadata = json.loads(table.schema.metadata[b"member_snapshot"])
+    except (OSError, KeyError, ValueError, sidecar.pa.ArrowException):
+        return None
+    if metadata.get("version") != SNAPSHOT_FORMAT_VERSION:
+        return None
+
+    rows = table.to_pandas()
+    hashes = rows.pop(_ROW_HASH_COLUMN).astype("uint64")
+    rows = rows.set_index(list(IDENTITY_COLUMNS) + [OCCURRENCE_LEVEL])
+    split = metadata["counts"]
+    counts = pd.DataFrame(split["data"], columns=split["columns"]).set_index("Club")
+    counts.columns.name = None
+    return MemberSnapshot(
+        rows=rows,
+        row_hashes=hashes.set_axis(rows.index),
+        counts=counts.astype("int64"),
+        as_of=pd.to_datetime(metadata["as_of"], format="%Y-%m-%d"),
+    )
+
+
+def update_snapshot(
+    path: str, df: pd.DataFrame, end_date: str
+) -> tuple[MemberSnapshot, pd.DataFrame | None]:
+    """
+    Applies a new export to the snapshot saved at path (building one from scratch
+    if there is none) and saves the result. Returns (snapshot, change log), with
+    no change log on the first run.
+    """
+    previous = load_snapshot(path)
+    if previous is None:
+        snapshot, log = build_snapshot(df, end_date), None
+    else:
+        snapshot, log = apply_export(previous, df, end_date)
+    save_snapshot(snapshot, path)
+    return snapshot, log
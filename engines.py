@@ -0,0 +1,529 @@
+import datetime as dt
+import os
+
+import numpy as np
+import pandas as pd
+
+try:
+    import polars as pl
+except ImportError:  # polars is optional; without it every report runs on pandas
+    pl = None
+
+import bookings
+import functions
+import membership
+import profiling
+
+# --- Report Engines ---
+# Every report is written once in pandas (functions.py), and that version is the
+# reference. Reports can also run on Polars. The export is loaded as for pandas
+# (cache, sidecars, multi-file ingest), and the columns a report reads are
+# converted to Polars once per frame; no file is scanned by Polars, so nothing is
+# pushed down to the read. The filters and group-bys then run as one query over
+# those columns, multi-threaded. Queries end in small aggregated tables, which
+# are shaped into the pandas report's exact output (same dtypes, category order
+# and row order), so both engines give identical results;
+# tests/test_engines.py checks this on every report.
+#
+# Reports without a Polars version (and every report when polars is not
+# installed) run on pandas whatever the engine.
+
+PANDAS = "pandas"
+POLARS = "polars"
+ENGINES = (PANDAS, POLARS)
+
+
+def available(engine: str) -> bool:
+    return engine == PANDAS or (engine == POLARS and pl is not None)
+
+
+def default_engine() -> str:
+    """Engine the reports run on. Override with REPORTING_ENGINE (pandas or polars)."""
+    engine = os.environ.get("REPORTING_ENGINE", PANDAS).strip().lower()
+    return engine if engine in ENGINES and available(engine) else PANDAS
+
+
+def implementation(function, engine: str | None = None):
+    """The version of report function to run on engine (default: default_engine())."""
+    engine = engine or default_engine()
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine: '{engine}'")
+    if not available(engine):
+        raise RuntimeError(f"The {engine} engine requires {engine} to be installed")
+    if engine == POLARS:
+        return POLARS_REPORTS.get(function, function)
+    return function
+
+
+def run(function, df: pd.DataFrame, *args, engine: str | None = None):
+    """Runs report function on df with args, on engine."""
+    return implementation(function, engine)(df, *args)
+
+
+# --- Frames ---
+
+_NOT_DATE = False  # Column converted as it is
+_DATES = True  # Column parsed as dates, as membership.parsed_dates parses it
+
+
+def _polars_series(series: pd.Series) -> "pl.Series":
+    try:
+        return pl.from_pandas(series)
+    except (TypeError, ValueError, pl.exceptions.PolarsError):
+        # Object columns mixing types (e.g. numbers and text) are compared as text
+        text = [None if pd.isna(value) else str(value) for value in series.tolist()]
+        return pl.Series(str(series.name), text, dtype=pl.String)
+
+
+def _column(df: pd.DataFrame, column: str, dates: bool = _NOT_DATE):
+    """
+    df[column] as a Polars Series, converted once per frame. With dates, the
+    dates membership.parsed_dates gives pandas are converted instead, so both
+    engines read the same dates.
+    """
+
+    def compute() -> "pl.Series":
+        with profiling.stage("convert", len(df)):
+            return _polars_series(df[column])
+
+    def compute_dates() -> "pl.Series":
+        parsed = membership.parsed_dates(df, column)
+        with profiling.stage("convert", len(df)):
+            return pl.from_pandas(parsed.rename(column))
+
+    if not dates:
+        return membership.memoized(df, ("polars", column), compute)
+    return membership.memoized(df, ("polars dates", column), compute_dates)
+
+
+def _codes(df: pd.DataFrame, column: str) -> tuple["pl.Series", pd.Index]:
+    """
+    df[column] as factorized codes (null where missing) and the distinct values,
+    so values of any type can be grouped in the plan and interpreted in pandas.
+    """
+
+    def compute():
+        with profiling.stage("convert", len(df)):
+            codes, uniques = pd.factorize(df[column], use_na_sentinel=True)
+            series = pl.Series(column, codes, dtype=pl.Int64)
+            return series.set(series == -1, None), uniques
+
+    return membership.memoized(df, ("polars codes", column), compute)
+
+
+def _matching(uniques, values) -> list[int]:
+    """Codes (see _codes) of the distinct values that are in values."""
+    return np.flatnonzero(pd.Index(uniques).isin(values)).tolist()
+
+
+def _decode(codes: pd.Series, uniques, dtype=object) -> pd.Series:
+    """Codes from a plan result (NaN where missing) back as values of dtype."""
+    # Plain values first: astype() to an unordered categorical dtype is a no-op
+    # for a categorical with the same categories in another order
+    values = np.append(np.asarray(uniques, dtype=object), None)
+    positions = codes.fillna(-1).to_numpy(dtype="int64")
+    return pd.Series(values[positions], index=codes.index).astype(dtype)
+
+
+def lazy_frame(df: pd.DataFrame, columns: dict) -> "pl.LazyFrame":
+    """
+    A LazyFrame over the given columns of the loaded frame (converted, not
+    scanned): column -> _NOT_DATE for the values as they are, or _DATES for
+    parsed dates.
+    """
+    return pl.DataFrame(
+        [_column(df, column, dates) for column, dates in columns.items()]
+    ).lazy()
+
+
+def _to_pandas(aggregated: "pl.DataFrame", df: pd.DataFrame) -> pd.DataFrame:
+    """An aggregated plan result with df's category columns given df's categories."""
+    result = aggregated.to_pandas()
+    for column in result.columns:
+        if column in df.columns and isinstance(df[column].dtype, pd.CategoricalDtype):
+            result[column] = result[column].astype(object).astype(df[column].dtype)
+    return result
+
+
+# --- Member Reports ---
+
+
+def _counts_table(df: pd.DataFrame, counts: pd.DataFrame) -> pd.DataFrame:
+    """
+    (Club, Payment plan type, n) rows as membership._counts_by_club_and_plan
+    lays them out: clubs as rows, plan types as columns, plus the Total column.
+    """
+    table = (
+        counts.set_index(["Club", "Payment plan type"])["n"]
+        .unstack(fill_value=0)
+        .astype("int64")
+    )
+    table.columns.name = None
+    table.index.name = "Club"
+    present_plans = [plan for plan in membership.TARGET_PAYMENT_PLANS if plan in table]
+    table[membership.TOTAL_COLUMN] = table[present_plans].sum(axis=1)
+    return table
+
+
+def _member_counts(df: pd.DataFrame, mask, date_columns: dict) -> pd.DataFrame:
+    lf = lazy_frame(df, {"Club": _NOT_DATE, "Payment plan type": _NOT_DATE, **date_columns})
+    with profiling.stage("aggregate", len(df)):
+        counts = (
+            lf.filter(
+                mask
+                & pl.col("Club").is_not_null()
+                & pl.col("Payment plan type").is_not_null()
+            )
+            .group_by("Club", "Payment plan type")
+            .agg(pl.len().alias("n"))
+            .collect()
+        )
+    return _counts_table(df, _to_pandas(counts, df))
+
+
+def active_member_counts(df: pd.DataFrame, end_date: str) -> pd.DataFrame:
+    """membership.active_member_counts as a Polars plan."""
+    end_date_dt = pd.to_datetime(end_date, format="%Y-%m-%d")
+    end_dates = pl.col("End date")
+
+    def compute() -> pd.DataFrame:
+        return _member_counts(
+            df,
+            end_dates.is_null() | (end_dates > end_date_dt.to_pydatetime()),
+            {"End date": _DATES},
+        )
+
+    return membership.memoized_recent(
+        df, ("polars active_member_counts", end_date_dt), compute
+    )
+
+
+def new_member_counts(df: pd.DataFrame, end_date: str) -> pd.DataFrame:
+    """membership.new_member_counts as a Polars plan."""
+    start_date_month, end_date_dt = membership.month_window(end_date)
+    end_dates, join_dates = pl.col("End date"), pl.col("Join date")
+    end_dt = end_date_dt.to_pydatetime()
+
+    def compute() -> pd.DataFrame:
+        return _member_counts(
+            df,
+            (end_dates.is_null() | (end_dates > end_dt))
+            & join_dates.is_between(start_date_month.to_pydatetime(), end_dt),
+            {"End date": _DATES, "Join date": _DATES},
+        )
+
+    return membership.memoized_recent(
+        df, ("polars new_member_counts", end_date_dt), compute
+    )
+
+
+def polars_current_members(df: pd.DataFrame, target_club: str, end_date: str):
+    """functions.current_members on Polars."""
+    missing = [col for col in functions.CURRENT_MEMBERS_COLUMNS if col not in df.columns]
+    if missing:
+        raise ValueError(
+            f"Current Members: Missing required columns: {', '.join(missing)}"
+        )
+    counts = active_member_counts(df, end_date)
+    return functions.current_members_result(
+        membership.club_count(counts, target_club, membership.TARGET_PAYMENT_PLANS[0]),
+        membership.club_count(counts, target_club, membership.TOTAL_COLUMN),
+    )
+
+
+def polars_new_members(df: pd.DataFrame, target_club: str, end_date: str):
+    """functions.new_members on Polars."""
+    missing = [col for col in functions.NEW_MEMBERS_COLUMNS if col not in df.columns]
+    if missing:
+        raise ValueError(f"New Members: Missing required columns: {', '.join(missing)}")
+    start_date_month, end_date_dt = membership.month_window(end_date)
+    counts = new_member_counts(df, end_date)
+    return functions.new_members_result(
+        membership.club_count(counts, target_club, membership.TARGET_PAYMENT_PLANS[0]),
+        membership.club_count(counts, target_club, membership.TOTAL_COLUMN),
+        start_date_month,
+        end_date_dt,
+    )
+
+
+def polars_new_members_trend(df: pd.DataFrame, end_date: str, months: int = 12):
+    """functions.new_members_trend on Polars (see membership.new_member_trend)."""
+    missing = [col for col in functions.NEW_MEMBERS_COLUMNS if col not in df.columns]
+    if missing:
+        raise ValueError(
+            f"New Members Trend: Missing required columns: {', '.join(missing)}"
+        )
+    if months < 1:
+        raise ValueError("months must be at least 1")
+    end_date_dt = pd.to_datetime(end_date, format="%Y-%m-%d")
+    periods = pd.period_range(
+        end=end_date_dt.to_period("M"), periods=months, freq="M", name="Month"
+    )
+    end_dt = end_date_dt.to_pydatetime()
+    join_dates, end_dates = pl.col("Join date"), pl.col("End date")
+    lf = lazy_frame(
+        df,
+        {
+            "Club": _NOT_DATE,
+            "Payment plan type": _NOT_DATE,
+            "End date": _DATES,
+            "Join date": _DATES,
+        },
+    )
+    with profiling.stage("aggregate", len(df)):
+        # Cutoff: the last day of the join month, or end_date in its month
+        month = join_dates.dt.truncate("1mo")
+        cutoff = pl.min_horizontal(month.dt.month_end(), pl.lit(end_dt))
+        counts = (
+            lf.filter(
+                join_dates.is_between(periods[0].start_time.to_pydatetime(), end_dt)
+                & pl.col("Club").is_not_null()
+                & pl.col("Payment plan type").is_not_null()
+            )
+            .group_by(month.alias("Month"), "Club", "Payment plan type")
+            .agg(
+                ((join_dates <= cutoff) & (end_dates.is_null() | (end_dates > cutoff)))
+                .sum()
+                .alias("n")
+            )
+            .collect()
+        )
+    counts = _to_pandas(counts, df)
+    counts["Month"] = counts["Month"].dt.to_period("M")
+    trend = membership.month_counts_table(
+        counts.set_index(["Month", "Club", "Payment plan type"])["n"], periods
+    )
+    trend.columns = [f"{club} - {plan}" for club, plan in trend.columns]
+    trend.index = trend.index.strftime("%Y-%m")
+    return trend.reset_index()
+
+
+def _ending_positions(
+    df: pd.DataFrame, start_date: pd.Timestamp, end_date: pd.Timestamp, clubs
+) -> np.ndarray:
+    columns = {"End date": _DATES}
+    if clubs is not None:
+        columns["Club"] = _NOT_DATE
+    lf = lazy_frame(df, columns).with_row_index("row")
+    day = pl.col("End date").dt.truncate("1d")
+    with profiling.stage("filter", len(df)):
+        selected = lf.filter(
+            day.is_between(start_date.to_pydatetime(), end_date.to_pydatetime())
+        )
+        if clubs is not None:
+            selected = selected.filter(pl.col("Club").cast(pl.String).is_in(list(clubs)))
+        rows = selected.sort(day, "row").select("row").collect()
+    return rows["row"].to_numpy().astype("intp")
+
+
+def polars_ending_members_between(
+    df_input: pd.DataFrame,
+    start_date: str,
+    end_date: str,
+    clubs: list[str] | None = None,
+) -> pd.DataFrame:
+    """functions.ending_members_between on Polars."""
+    required_columns = functions.ENDING_MEMBERS_COLUMNS
+    missing_cols = [col for col in required_columns if col not in df_input.columns]
+    if missing_cols:
+        raise ValueError(
+            f"Ending Members Report: Missing required columns: {', '.join(missing_cols)}"
+        )
+    start_date_dt = pd.to_datetime(start_date, format="%Y-%m-%d")
+    end_date_dt = pd.to_datetime(end_date, format="%Y-%m-%d")
+    try:
+        end_dates = membership.parsed_dates(df_input, "End date")
+    except Exception as e:
+        raise ValueError(
+            f"Ending Members Report: Error converting 'End date' column to datetime: {str(e)}"
+        )
+    positions = _ending_positions(df_input, start_date_dt, end_date_dt, clubs)
+    column_positions = [df_input.columns.get_loc(col) for col in required_columns]
+    return df_input.iloc[positions, column_positions].assign(
+        **{"End date": end_dates.iloc[positions]}
+    )
+
+
+def polars_generate_ending_members_report(
+    df_input: pd.DataFrame, end_date: str | None = None
+) -> pd.DataFrame:
+    """functions.generate_ending_members_report on Polars."""
+    if end_date is None:
+        end_date = dt.date.today().isoformat()
+    return polars_ending_members_between(df_input, end_date, end_date)
+
+
+def polars_ending_members_lookahead(
+    df_input: pd.DataFrame,
+    target_club: str | None,
+    start_date: str,
+    days: int = functions.ENDING_LOOKAHEAD_DAYS,
+) -> pd.DataFrame:
+    """functions.ending_members_lookahead on Polars."""
+    if days < 0:
+        raise ValueError("Ending Members: days ahead cannot be negative")
+    end_date = pd.to_datetime(start_date, format="%Y-%m-%d") + pd.Timedelta(days=days)
+    return polars_ending_members_between(
+        df_input,
+        start_date,
+        end_date.strftime("%Y-%m-%d"),
+        None if target_club is None else [target_club],
+    )
+
+
+# --- Activity Reports ---
+
+
+def polars_technogym_reporting(df: pd.DataFrame):
+    """functions.technogym_reporting on Polars."""
+    if not all(col in df.columns for col in functions.TECHNOGYM_COLUMNS):
+        raise ValueError("Technogym: DataFrame missing 'Activity' column.")
+    activity_codes, activities = _codes(df, "Activity")
+    activity = pl.col("Activity")
+    with profiling.stage("filter", len(df)):
+        counts = (
+            pl.DataFrame([activity_codes])
+            .lazy()
+            .select(
+                activity.is_in(_matching(activities, functions.TECHNOGYM_CONSULTS))
+                .sum()
+                .alias("consults"),
+                activity.is_in(_matching(activities, functions.TECHNOGYM_PT_SESSIONS))
+                .sum()
+                .alias("pts"),
+            )
+            .collect()
+        )
+    return functions.technogym_result(int(counts["consults"][0]), int(counts["pts"][0]))
+
+
+def polars_group_fitness(df: pd.DataFrame):
+    """functions.groupFitness on Polars."""
+    missing = [col for col in functions.GROUP_FITNESS_COLUMNS if col not in df.columns]
+    if missing:
+        raise ValueError(
+            f"Group Fitness: Missing required columns: {', '.join(missing)}"
+        )
+    # pd.to_numeric(errors="coerce") is applied before the plan: its rules for
+    # text (whitespace, thousands, ...) are the reference
+    attendees = membership.memoized(
+        df,
+        ("polars numeric", "UserActive"),
+        lambda: pl.from_pandas(
+            pd.to_numeric(df["UserActive"], errors="coerce")
+            .astype("float64")
+            .rename("UserActive")
+        ),
+    )
+    club_codes, clubs = _codes(df, "Club")
+    with profiling.stage("aggregate", len(df)):
+        totals = (
+            pl.DataFrame([club_codes, attendees])
+            .lazy()
+            .filter(pl.col("Club").is_in(_matching(clubs, functions.GROUP_FITNESS_CLUBS)))
+            .group_by("Club")
+            .agg(
+                pl.len().alias("rows"),
+                pl.col("UserActive").fill_nan(0).fill_null(0).sum().alias("attendees"),
+            )
+            .collect()
+            .to_pandas()
+        )
+    totals["Club"] = _decode(totals["Club"], clubs)
+    totals = totals.set_index("Club").reindex(functions.GROUP_FITNESS_CLUBS, fill_value=0)
+    return functions.group_fitness_result(totals)
+
+
+def polars_booking_zones(df: pd.DataFrame, weights: pd.DataFrame | None = None):
+    """
+    functions.booking_zones on Polars. Bookings are counted per club, zone and
+    distinct length in the plan, so each distinct length is parsed once in pandas
+    (bookings.parse_durations) and multiplied by its count.
+    """
+    try:
+        if weights is None:
+            weights = bookings.load_zone_weights()
+        required_cols = functions.BOOKING_ZONES_COLUMNS
+        if not all(col in df.columns for col in required_cols):
+            missing_cols = [col for col in required_cols if col not in df.columns]
+            raise ValueError(
+                f"Booking Zones: Missing required columns: {', '.join(missing_cols)}"
+            )
+
+        definition_codes, definitions = _codes(df, "Facility Booking Definition")
+        club_codes, clubs = _codes(df, "Club")
+        zone_codes, zones = _codes(df, "Club Zone Type Name")
+        length_codes, lengths = _codes(df, "Length of Booking")
+        # The exclusions are decided once per distinct definition, as pandas would
+        definition_text = pd.Series(definitions, dtype=object).astype(str)
+        excluded = definition_text.str.contains(
+            "Unavailable", case=False
+        ) | definition_text.str.contains("University Class", case=False)
+        definition = pl.col("Facility Booking Definition")
+        with profiling.stage("aggregate", len(df)):
+            counts = (
+                pl.DataFrame([definition_codes, club_codes, zone_codes, length_codes])
+                .lazy()
+                .filter(
+                    definition.is_null()
+                    | definition.is_in(np.flatnonzero(~excluded.to_numpy()).tolist())
+                )
+                .group_by("Club", "Club Zone Type Name", "Length of Booking")
+                .agg(pl.len().alias("n"))
+                .collect()
+                .to_pandas()
+            )
+
+        with profiling.stage("parse", len(lengths)):
+            parsed, _ = bookings.parse_durations(pd.Series(lengths, dtype=lengths.dtype))
+            is_blank = np.array(
+                [isinstance(v, str) and not v.strip() for v in lengths], dtype=bool
+            )
+            # Code -1 (missing length) is the extra last element: NaT, not unparsed
+            length_ns = np.append(
+                parsed.to_numpy(dtype="timedelta64[ns]"), np.timedelta64("NaT")
+            )
+            unparsed = np.append(parsed.isna().to_numpy() & ~is_blank, False)
+            codes = counts["Length of Booking"].fillna(-1).to_numpy(dtype="int64")
+            n = counts["n"].to_numpy(dtype="int64")
+            unparsed_rows = int(n[unparsed[codes]].sum())
+
+        with profiling.stage("aggregate", len(counts)):
+            df_sum = (
+                pd.DataFrame(
+                    {
+                        "Club": _decode(counts["Club"], clubs, df["Club"].dtype),
+                        "Club Zone Type Name": _decode(
+                            counts["Club Zone Type Name"],
+                            zones,
+                            df["Club Zone Type Name"].dtype,
+                        ),
+                        "Length of Booking": length_ns[codes] * n,
+                    }
+                )
+                .groupby(["Club", "Club Zone Type Name"], as_index=False, observed=True)[
+                    "Length of Booking"
+                ]
+                .sum()
+            )
+            return functions.weighted_booking_summary(df_sum, weights, unparsed_rows)
+    except KeyError as e:
+        raise KeyError(f"Booking Zones: Missing column: {e}")
+    except ValueError as ve:
+        raise ValueError(f"Booking Zones: Data error: {ve}")
+    except Exception as e:
+        raise Exception(f"Booking Zones: An unexpected error occurred: {e}")
+
+
+# pandas report function -> its Polars version (same arguments and output)
+POLARS_REPORTS = {
+    functions.current_members: polars_current_members,
+    functions.new_members: polars_new_members,
+    functions.new_members_trend: polars_new_members_trend,
+    functions.technogym_reporting: polars_technogym_reporting,
+    functions.groupFitness: polars_group_fitness,
+    functions.booking_zones: polars_booking_zones,
+    functions.generate_ending_members_report: polars_generate_ending_members_report,
+    functions.ending_members_between: polars_ending_members_between,
+    functions.ending_members_lookahead: polars_ending_members_lookahead,
+}
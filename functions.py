@@ -1,333 +1,297 @@
 import pandas as pd
 import datetime as dt
 
+import bookings
+import membership
+import profiling
+import rendering
+
+# --- Shared Report Configuration ---
+
+CLUB_LIST = [
+    "DeakinACTIVE Waurn Ponds",
+    "DeakinACTIVE Burwood",
+    "DeakinACTIVE Waterfront",
+    "DeakinACTIVE Warrnambool",
+]
+
+# Columns each report needs in the loaded export
+CURRENT_MEMBERS_COLUMNS = ["Club", "Payment plan type", "End date"]
+NEW_MEMBERS_COLUMNS = ["Club", "Payment plan type", "End date", "Join date"]
+TECHNOGYM_COLUMNS = ["Activity"]
+GROUP_FITNESS_COLUMNS = ["Club", "UserActive"]
+BOOKING_ZONES_COLUMNS = [
+    "Facility Booking Definition",
+    "Club",
+    "Club Zone Type Name",
+    "Length of Booking",
+]
+ENDING_MEMBERS_COLUMNS = [
+    "Name",
+    "Last name",
+    "Club",
+    "Payment Plan Name",
+    "End date",
+    "Email",
+    "Mobile number",
+]
+
+# Days after the start date covered by the Ending Members Lookahead by default
+ENDING_LOOKAHEAD_DAYS = 7
+
+TECHNOGYM_CONSULTS = [
+    "Body Scan",
+    "Exercise Program Check-in",
+    "Follow-Up Health Consultation",
+    "Follow-Up Health Consultation and Program Update",
+    "Initial Health Consultation",
+    "Initial Program Introduction",
+]
+TECHNOGYM_PT_SESSIONS = [
+    "Group Training",
+    "Personal Training 30 Minutes",
+    "Personal Training 45 Minutes",
+    "Personal Training 60 Minutes",
+]
+GROUP_FITNESS_CLUBS = [
+    "DeakinACTIVE Burwood",
+    "DeakinACTIVE Waterfront",
+    "DeakinACTIVE Waurn Ponds",
+    "DeakinACTIVE Warrnambool",
+]
+
 # --- Report Generation Functions ---
 
 
-def current_members(df: pd.DataFrame, target_club: str, end_date: str) -> str:
+def current_members_result(
+    fortnightly_fixed_members: int, total_members: int
+) -> rendering.ReportResult:
+    return rendering.ReportResult(
+        metrics=(
+            ("FORTNIGHTLY-FIXED MEMBERS", fortnightly_fixed_members),
+            ("TOTAL MEMBERS", total_members),
+        )
+    )
+
+
+def current_members(
+    df: pd.DataFrame, target_club: str, end_date: str
+) -> rendering.ReportResult:
     """
     Counts current members for a target club and end date.
-    Returns an HTML formatted table string.
+    Raises ValueError if required columns are missing.
     """
-    try:
-        required_cols = ["Club", "Payment plan type", "End date"]
-        if not all(col in df.columns for col in required_cols):
-            missing = [col for col in required_cols if col not in df.columns]
-            raise ValueError(
-                f"Current Members: Missing required columns: {', '.join(missing)}"
-            )
-
-        df_copy = df.copy()  # Work on a copy to avoid SettingWithCopyWarning
-        target_payment_plan = ["Fortnightly-Fixed", "Upfront"]
-        end_date_dt = pd.to_datetime(end_date, format="%Y-%m-%d")
-        df_copy["End date"] = pd.to_datetime(
-            df_copy["End date"],
-            format="%Y-%m-%d",
-            errors="coerce",  # Adapt format if needed
+    required_cols = CURRENT_MEMBERS_COLUMNS
+    if not all(col in df.columns for col in required_cols):
+        missing = [col for col in required_cols if col not in df.columns]
+        raise ValueError(
+            f"Current Members: Missing required columns: {', '.join(missing)}"
         )
 
-        df_ff_filtered = df_copy.loc[
-            (df_copy["Club"] == target_club)
-            & (df_copy["Payment plan type"] == target_payment_plan[0])
-            & ((df_copy["End date"].isnull()) | (df_copy["End date"] > end_date_dt))
-        ]
-        fortnightly_fixed_members = len(df_ff_filtered)
-
-        df_total_filtered = df_copy.loc[
-            (df_copy["Club"] == target_club)
-            & (df_copy["Payment plan type"].isin(target_payment_plan))
-            & ((df_copy["End date"].isnull()) | (df_copy["End date"] > end_date_dt))
-        ]
-        total_members = len(df_total_filtered)
-
-        html_output = f"""
-        <table width='95%' style='font-family: Monospace; border-collapse: collapse; margin-top: 10px;'>
-            <tr>
-                <td style='padding: 5px 10px 5px 0;'><b>FORTNIGHTLY-FIXED MEMBERS:</b></td>
-                <td align='right' style='padding: 5px 0;'>{fortnightly_fixed_members}</td>
-            </tr>
-            <tr>
-                <td style='padding: 5px 10px 5px 0;'><b>TOTAL MEMBERS:</b></td>
-                <td align='right' style='padding: 5px 0;'>{total_members}</td>
-            </tr>
-        </table>
-        """
-        return html_output
-    except KeyError as e:
-        return f"<p><b><font color='red'>Error (Current Members):</font></b><br>Missing expected column: {e}</p>"
-    except ValueError as ve:
-        return f"<p><b><font color='red'>Error (Current Members):</font></b><br>Data error: {str(ve)}</p>"
-    except Exception as e:
-        return f"<p><b><font color='red'>An error occurred in Current Members report:</font></b><br>{str(e)}</p>"
-
-
-def new_members(df: pd.DataFrame, target_club: str, end_date: str) -> str:
+    # Counts for every club are computed once per frame and end date
+    counts = membership.active_member_counts(df, end_date)
+    return current_members_result(
+        membership.club_count(counts, target_club, membership.TARGET_PAYMENT_PLANS[0]),
+        membership.club_count(counts, target_club, membership.TOTAL_COLUMN),
+    )
+
+
+def new_members_result(
+    new_fortnightly_fixed_members: int,
+    new_total_members: int,
+    start_date_month: pd.Timestamp,
+    end_date_dt: pd.Timestamp,
+) -> rendering.ReportResult:
+    return rendering.ReportResult(
+        metrics=(
+            ("NEW FORTNIGHTLY-FIXED MEMBERS", new_fortnightly_fixed_members),
+            ("TOTAL NEW MEMBERS", new_total_members),
+        ),
+        note=(
+            f"For month of {end_date_dt.strftime('%B %Y')}, from "
+            f"{start_date_month.strftime('%d-%m-%Y')} to {end_date_dt.strftime('%d-%m-%Y')}"
+        ),
+    )
+
+
+def new_members(
+    df: pd.DataFrame, target_club: str, end_date: str
+) -> rendering.ReportResult:
     """
     Counts new members for a target club within the month of the given end_date.
-    Returns an HTML formatted table string.
+    Raises ValueError if required columns are missing.
     """
-    try:
-        required_cols = ["Club", "Payment plan type", "End date", "Join date"]
-        if not all(col in df.columns for col in required_cols):
-            missing = [col for col in required_cols if col not in df.columns]
-            raise ValueError(
-                f"New Members: Missing required columns: {', '.join(missing)}"
-            )
-
-        df_copy = df.copy()
-        target_payment_plan = ["Fortnightly-Fixed", "Upfront"]
-        end_date_dt = pd.to_datetime(end_date, format="%Y-%m-%d")
-        month = end_date_dt.month
-        year = end_date_dt.year
-        start_date_month = pd.to_datetime(f"{year}-{month:02d}-01", format="%Y-%m-%d")
-
-        df_copy["End date"] = pd.to_datetime(
-            df_copy["End date"], format="%Y-%m-%d", errors="coerce"
+    required_cols = NEW_MEMBERS_COLUMNS
+    if not all(col in df.columns for col in required_cols):
+        missing = [col for col in required_cols if col not in df.columns]
+        raise ValueError(f"New Members: Missing required columns: {', '.join(missing)}")
+
+    start_date_month, end_date_dt = membership.month_window(end_date)
+    # Counts for every club are computed once per frame and end date
+    counts = membership.new_member_counts(df, end_date)
+    return new_members_result(
+        membership.club_count(counts, target_club, membership.TARGET_PAYMENT_PLANS[0]),
+        membership.club_count(counts, target_club, membership.TOTAL_COLUMN),
+        start_date_month,
+        end_date_dt,
+    )
+
+
+def technogym_counts(df: pd.DataFrame) -> tuple[int, int]:
+    """Number of health consult and personal training sessions in df."""
+    consults_no = int(df["Activity"].isin(TECHNOGYM_CONSULTS).sum())
+    pts_no = int(df["Activity"].isin(TECHNOGYM_PT_SESSIONS).sum())
+    return consults_no, pts_no
+
+
+def technogym_result(consults_no: int, pts_no: int) -> rendering.ReportResult:
+    return rendering.ReportResult(
+        metrics=(
+            ("NUMBER OF HEALTH CONSULTS", consults_no),
+            ("NUMBER OF PERSONAL TRAINING SESSIONS", pts_no),
         )
-        df_copy["Join date"] = pd.to_datetime(
-            df_copy["Join date"], errors="coerce"
-        )  # Flexible parsing
-
-        df_ff_new = df_copy.loc[
-            (df_copy["Club"] == target_club)
-            & (df_copy["Payment plan type"] == target_payment_plan[0])
-            & ((df_copy["End date"].isnull()) | (df_copy["End date"] > end_date_dt))
-            & (df_copy["Join date"].notnull())
-            & (df_copy["Join date"] >= start_date_month)
-            & (df_copy["Join date"] <= end_date_dt)
-        ]
-        new_fortnightly_fixed_members = len(df_ff_new)
-
-        df_total_new = df_copy.loc[
-            (df_copy["Club"] == target_club)
-            & (df_copy["Payment plan type"].isin(target_payment_plan))
-            & ((df_copy["End date"].isnull()) | (df_copy["End date"] > end_date_dt))
-            & (df_copy["Join date"].notnull())
-            & (df_copy["Join date"] >= start_date_month)
-            & (df_copy["Join date"] <= end_date_dt)
-        ]
-        new_total_members = len(df_total_new)
-
-        html_output = f"""
-        <table width='95%' style='font-family: Monospace; border-collapse: collapse; margin-top: 10px;'>
-            <tr>
-                <td style='padding: 5px 10px 5px 0;'><b>NEW FORTNIGHTLY-FIXED MEMBERS:</b></td>
-                <td align='right' style='padding: 5px 0;'>{new_fortnightly_fixed_members}</td>
-            </tr>
-            <tr>
-                <td style='padding: 5px 10px 5px 0;'><b>TOTAL NEW MEMBERS:</b></td>
-                <td align='right' style='padding: 5px 0;'>{new_total_members}</td>
-            </tr>
-            <tr>
-                <td colspan='2' style='padding-top: 8px; font-size: smaller;'><i>(For month of {end_date_dt.strftime("%B %Y")}, from {start_date_month.strftime("%d-%m-%Y")} to {end_date_dt.strftime("%d-%m-%Y")})</i></td>
-            </tr>
-        </table>
-        """
-        return html_output
-    except KeyError as e:
-        return f"<p><b><font color='red'>Error (New Members):</font></b><br>Missing expected column: {e}</p>"
-    except ValueError as ve:
-        return f"<p><b><font color='red'>Error (New Members):</font></b><br>Data error: {str(ve)}</p>"
-    except Exception as e:
-        return f"<p><b><font color='red'>An error occurred in New Members report:</font></b><br>{str(e)}</p>"
+    )
 
 
-def technogym_reporting(df: pd.DataFrame) -> str:
+def technogym_reporting(df: pd.DataFrame) -> rendering.ReportResult:
     """
     Calculates number of PT and health consult sessions using pandas.
-    Returns an HTML formatted table string.
+    Raises ValueError if the 'Activity' column is missing.
     """
-    try:
-        if "Activity" not in df.columns:
-            raise ValueError(
-                "DataFrame missing 'Activity' column for Technogym report."
-            )
+    if not all(col in df.columns for col in TECHNOGYM_COLUMNS):
+        raise ValueError("Technogym: DataFrame missing 'Activity' column.")
 
-        consults_list = [
-            "Body Scan",
-            "Exercise Program Check-in",
-            "Follow-Up Health Consultation",
-            "Follow-Up Health Consultation and Program Update",
-            "Initial Health Consultation",
-            "Initial Program Introduction",
-        ]
-        pt_list = [
-            "Group Training",
-            "Personal Training 30 Minutes",
-            "Personal Training 45 Minutes",
-            "Personal Training 60 Minutes",
-        ]
-
-        df_consults = df.loc[df["Activity"].isin(consults_list)]
-        df_pts = df.loc[df["Activity"].isin(pt_list)]
-
-        consults_no = len(df_consults)
-        pts_no = len(df_pts)
-
-        html_output = f"""
-        <table width='95%' style='font-family: Monospace; border-collapse: collapse; margin-top: 10px;'>
-            <tr>
-                <td style='padding: 5px 10px 5px 0;'><b>NUMBER OF HEALTH CONSULTS:</b></td>
-                <td align='right' style='padding: 5px 0;'>{consults_no}</td>
-            </tr>
-            <tr>
-                <td style='padding: 5px 10px 5px 0;'><b>NUMBER OF PERSONAL TRAINING SESSIONS:</b></td>
-                <td align='right' style='padding: 5px 0;'>{pts_no}</td>
-            </tr>
-        </table>
-        """
-        return html_output
-    except KeyError as e:
-        return f"<p><b><font color='red'>Error (Technogym):</font></b><br>Missing expected column 'Activity': {e}</p>"
-    except ValueError as ve:
-        return f"<p><b><font color='red'>Error (Technogym):</font></b><br>Data error: {str(ve)}</p>"
-    except Exception as e:
-        return f"<p><b><font color='red'>An error occurred in Technogym report:</font></b><br>{str(e)}</p>"
+    with profiling.stage("filter", len(df)):
+        consults_no, pts_no = technogym_counts(df)
+    return technogym_result(consults_no, pts_no)
 
 
-def groupFitness(df_pandas_input: pd.DataFrame) -> str:
+def group_fitness_totals(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Generates an HTML table string for Group Fitness Summary using pandas.
+    Raw row count and UserActive sum per club in GROUP_FITNESS_CLUBS (before the
+    duplicate-row halving applied by group_fitness_result). Both are additive, so
+    totals from separate chunks of an export can simply be summed.
+    """
+    attendees = pd.to_numeric(df["UserActive"], errors="coerce").fillna(0)
+    by_club = attendees.groupby(df["Club"], observed=True)
+    totals = pd.DataFrame({"rows": by_club.size(), "attendees": by_club.sum()})
+    return totals.reindex(GROUP_FITNESS_CLUBS, fill_value=0)
+
+
+def group_fitness_result(totals: pd.DataFrame) -> rendering.ReportResult:
+    # User's logic for duplicate rows: every class appears twice in the export
+    halved = (totals.loc[GROUP_FITNESS_CLUBS] / 2).astype("int64")
+    return rendering.ReportResult(
+        table=pd.DataFrame(
+            {
+                "Club Name": GROUP_FITNESS_CLUBS,
+                "Classes Run": halved["rows"].to_numpy(),
+                "Total Attendees": halved["attendees"].to_numpy(),
+            }
+        )
+    )
+
+
+def groupFitness(df_pandas_input: pd.DataFrame) -> rendering.ReportResult:
+    """
+    Classes run and attendees per club for the Group Fitness Summary.
     Input DataFrame should have headers from the second row of the Excel.
+    Raises ValueError if required columns are missing.
     """
-    try:
-        required_cols = ["Club", "UserActive"]
-        if not all(col in df_pandas_input.columns for col in required_cols):
-            missing = [
-                col for col in required_cols if col not in df_pandas_input.columns
-            ]
-            raise ValueError(
-                f"Group Fitness: Missing required columns: {', '.join(missing)}"
-            )
+    required_cols = GROUP_FITNESS_COLUMNS
+    if not all(col in df_pandas_input.columns for col in required_cols):
+        missing = [col for col in required_cols if col not in df_pandas_input.columns]
+        raise ValueError(
+            f"Group Fitness: Missing required columns: {', '.join(missing)}"
+        )
 
-        df_filtered = df_pandas_input[required_cols].copy()
-
-        clubs_to_report = [
-            "DeakinACTIVE Burwood",
-            "DeakinACTIVE Waterfront",
-            "DeakinACTIVE Waurn Ponds",
-            "DeakinACTIVE Warrnambool",
-        ]
-
-        html_output_lines = [
-            "<table width='95%' style='font-family: Monospace; border-collapse: collapse; margin-top: 10px;'>",
-            "<tr>",
-            "<td style='padding: 5px 10px 5px 0;'><b>Club Name</b></td>",
-            "<td align='right' style='padding-right: 20px; padding: 5px 0;'><b>Classes Run</b></td>",
-            "<td align='right' style='padding: 5px 0;'><b>Total Attendees</b></td>",
-            "</tr>",
-            "<tr><td colspan='3' style='line-height: 0.5em;'><hr></td></tr>",
-        ]
-
-        for club_name in clubs_to_report:
-            club_df = df_filtered[df_filtered["Club"] == club_name]
-            # User's logic for duplicate rows
-            num_classes = len(club_df) / 2
-            total_attendees = (
-                pd.to_numeric(club_df["UserActive"], errors="coerce").fillna(0).sum()
-                / 2
-            )
+    with profiling.stage("aggregate", len(df_pandas_input)):
+        totals = group_fitness_totals(df_pandas_input)
+    return group_fitness_result(totals)
 
-            html_output_lines.append("<tr>")
-            html_output_lines.append(
-                f"<td style='padding: 5px 10px 5px 0;'>{club_name}</td>"
-            )
-            html_output_lines.append(
-                f"<td align='right' style='padding-right: 20px; padding-top: 5px; padding-bottom: 5px;'>{int(num_classes)}</td>"
-            )
-            html_output_lines.append(
-                f"<td align='right' style='padding-top: 5px; padding-bottom: 5px;'>{int(total_attendees)}</td>"
-            )
-            html_output_lines.append("</tr>")
 
-        html_output_lines.append("</table>")
-        return "".join(html_output_lines)
-    except KeyError as e:
-        return f"<p><b><font color='red'>Error (Group Fitness):</font></b><br>Missing column: {e}</p>"
-    except ValueError as ve:
-        return f"<p><b><font color='red'>Error (Group Fitness):</font></b><br>Data error: {str(ve)}</p>"
-    except Exception as e:
-        return f"<p><b><font color='red'>An error occurred in Group Fitness report:</font></b><br>{str(e)}</p>"
+def booking_zone_totals(df: pd.DataFrame) -> tuple[pd.DataFrame, int]:
+    """
+    Total "Length of Booking" per (Club, Club Zone Type Name), excluding unavailable
+    and university class bookings, plus the number of unreadable lengths. Totals
+    are additive across chunks of an export.
+    """
+    with profiling.stage("filter", len(df)):
+        definitions = df["Facility Booking Definition"]
+        keep = ~(
+            definitions.str.contains("Unavailable", case=False, na=False)
+            | definitions.str.contains("University Class", case=False, na=False)
+        ).to_numpy(dtype=bool)
+
+        lengths = df["Length of Booking"][keep]
+
+    # Unreadable lengths become NaT (counted as zero) instead of failing the column
+    with profiling.stage("parse", len(lengths)):
+        lengths, unparsed_rows = bookings.parse_durations(lengths)
+
+    with profiling.stage("aggregate", len(lengths)):
+        # A new frame of the kept rows and parsed lengths, so df is left as it is
+        # without a defensive copy
+        zone_columns = ["Club", "Club Zone Type Name"]
+        filtered_df = pd.DataFrame(
+            {
+                **{col: df[col][keep] for col in zone_columns},
+                "Length of Booking": lengths,
+            },
+            copy=False,
+        )
+        df_sum = filtered_df.groupby(zone_columns, as_index=False, observed=True)[
+            "Length of Booking"
+        ].sum()
+    return df_sum, unparsed_rows
 
 
-def booking_zones(df: pd.DataFrame) -> pd.DataFrame:
+def weighted_booking_summary(
+    df_sum: pd.DataFrame, weights: pd.DataFrame, unparsed_rows: int = 0
+) -> pd.DataFrame:
+    """
+    Applies zone weights to booking totals and converts them to hours. df_sum is
+    not modified.
+    """
+    lengths = df_sum["Length of Booking"]
+    adjusted = lengths * bookings.zone_weights_for(
+        df_sum["Club"], df_sum["Club Zone Type Name"], weights
+    )
+
+    df_final = pd.DataFrame(
+        {
+            "Club": df_sum["Club"],
+            "Club Zone Type Name": df_sum["Club Zone Type Name"],
+            "Length of Booking (Hours)": lengths.dt.total_seconds().fillna(0) / 3600,
+            "Adjusted Time (Hours)": adjusted.dt.total_seconds().fillna(0) / 3600,
+        }
+    )
+    df_final.attrs["unparsed_rows"] = unparsed_rows
+    return df_final
+
+
+def booking_zones(
+    df: pd.DataFrame, weights: pd.DataFrame | None = None
+) -> pd.DataFrame:
     """
     Processes booking data using pandas, applies weights, and returns a summary DataFrame.
+    Zone weights come from zone_weights.json (see bookings.load_zone_weights) unless
+    a weights table is passed in. The number of bookings whose "Length of Booking"
+    could not be read is stored in the result's attrs["unparsed_rows"].
     """
     try:
-        weights_dict = {
-            "BUR - Badminton Court": 1 / 6,
-            "WP - Badminton Court": 1 / 6,
-            "BUR - Court": 1 / 2,
-            "WP - Court": 1 / 2,
-            "WP - Athletic Track Lane": 1 / 4,
-        }
-        required_cols = [
-            "Facility Booking Definition",
-            "Club",
-            "Club Zone Type Name",
-            "Length of Booking",
-        ]
+        if weights is None:
+            weights = bookings.load_zone_weights()
+        required_cols = BOOKING_ZONES_COLUMNS
         if not all(col in df.columns for col in required_cols):
             missing_cols = [col for col in required_cols if col not in df.columns]
             raise ValueError(
                 f"Booking Zones: Missing required columns: {', '.join(missing_cols)}"
             )
 
-        filtered_df = df.loc[
-            (
-                df["Facility Booking Definition"].str.contains(
-                    "Unavailable", case=False, na=False
-                )
-                == False
-            )
-            & (
-                df["Facility Booking Definition"].str.contains(
-                    "University Class", case=False, na=False
-                )
-                == False
-            ),
-            required_cols,
-        ].copy()
-
-        try:
-            filtered_df["Length of Booking"] = pd.to_timedelta(
-                filtered_df["Length of Booking"]
-            )
-        except (ValueError, TypeError):
-            if pd.api.types.is_numeric_dtype(filtered_df["Length of Booking"]):
-                filtered_df["Length of Booking"] = pd.to_timedelta(
-                    filtered_df["Length of Booking"], unit="m"
-                )
-            else:
-                filtered_df["Length of Booking"] = pd.NaT
-
-        df_sum = filtered_df.groupby(["Club", "Club Zone Type Name"], as_index=False)[
-            "Length of Booking"
-        ].sum()
-
-        df_sum["Adjusted Time"] = df_sum.apply(
-            lambda row: row["Length of Booking"]
-            * weights_dict.get(row["Club Zone Type Name"], 1.0),
-            axis=1,
-        )
-
-        df_sum["Length of Booking (Hours)"] = (
-            df_sum["Length of Booking"].dt.total_seconds().fillna(0) / 3600
-        )
-        df_sum["Adjusted Time (Hours)"] = (
-            df_sum["Adjusted Time"].dt.total_seconds().fillna(0) / 3600
-        )
-
-        df_final = df_sum[
-            [
-                "Club",
-                "Club Zone Type Name",
-                "Length of Booking (Hours)",
-                "Adjusted Time (Hours)",
-            ]
-        ].copy()
-        return df_final
+        df_sum, unparsed_rows = booking_zone_totals(df)
+        with profiling.stage("aggregate", len(df_sum)):
+            return weighted_booking_summary(df_sum, weights, unparsed_rows)
     except KeyError as e:
         raise KeyError(f"Booking Zones: Missing column: {e}")
     except ValueError as ve:
@@ -337,60 +301,149 @@ def booking_zones(df: pd.DataFrame) -> pd.DataFrame:
 
 
 # --- NEW PANDAS-BASED FUNCTION ---
-def generate_ending_members_report(df_input: pd.DataFrame) -> pd.DataFrame:
+def generate_ending_members_report(
+    df_input: pd.DataFrame, end_date: str | None = None
+) -> pd.DataFrame:
     """
-    Filters members whose contract 'End date' is today using pandas and returns
-    a pandas DataFrame containing their details.
+    Filters members whose contract 'End date' is end_date (YYYY-MM-DD, default
+    today) using pandas and returns a pandas DataFrame containing their details.
 
     Args:
         df_input: A pandas DataFrame containing member data. Expected columns include:
                   "Name", "Last name", "Club", "Payment Plan Name", "End date",
                   "Email", "Mobile number".
+        end_date: The day to list members ending on; None for today.
 
     Returns:
-        pd.DataFrame: A pandas DataFrame of members whose contracts end today.
+        pd.DataFrame: A pandas DataFrame of members whose contracts end on end_date.
                       May be empty if no such members are found.
 
     Raises:
-        ValueError: If required columns are missing or 'End date' conversion fails.
-        KeyError: If essential columns are not found during pandas operations.
+        ValueError: If required columns are missing, 'End date' conversion fails
+                    or end_date is not a YYYY-MM-DD date.
     """
-    today_date_obj = dt.date.today()  # Get today as a date object
-
-    required_columns = [
-        "Name",
-        "Last name",
-        "Club",
-        "Payment Plan Name",
-        "End date",
-        "Email",
-        "Mobile number",
-    ]
+    if end_date is None:
+        end_date = dt.date.today().isoformat()
+    return ending_members_between(df_input, end_date, end_date)
+
 
+def ending_members_between(
+    df_input: pd.DataFrame,
+    start_date: str,
+    end_date: str,
+    clubs: list[str] | None = None,
+) -> pd.DataFrame:
+    """
+    Members whose contract "End date" falls on a day from start_date to end_date
+    (YYYY-MM-DD, both included), optionally only those of the given clubs, in
+    order of end date.
+
+    Raises:
+        ValueError: If required columns are missing or the dates are invalid.
+    """
+    required_columns = ENDING_MEMBERS_COLUMNS
     missing_cols = [col for col in required_columns if col not in df_input.columns]
     if missing_cols:
         raise ValueError(
             f"Ending Members Report: Missing required columns: {', '.join(missing_cols)}"
         )
-
-    df_processed = df_input[required_columns].copy()
+    start_date_dt = pd.to_datetime(start_date, format="%Y-%m-%d")
+    end_date_dt = pd.to_datetime(end_date, format="%Y-%m-%d")
 
     try:
-        # Convert 'End date' to datetime objects, coercing errors to NaT
-        df_processed["End date"] = pd.to_datetime(
-            df_processed["End date"], errors="coerce"
-        )
+        # Parsed once per frame and shared with the other member reports (see membership.py)
+        end_dates = membership.parsed_dates(df_input, "End date")
     except Exception as e:
         raise ValueError(
             f"Ending Members Report: Error converting 'End date' column to datetime: {str(e)}"
         )
 
-    # Drop rows where 'End date' could not be parsed (is NaT)
-    df_processed_valid_dates = df_processed.dropna(subset=["End date"])
+    # A binary search over the frame's sorted end dates; only matching rows are copied
+    positions = membership.rows_ending_between(df_input, start_date_dt, end_date_dt)
+    with profiling.stage("filter", len(positions)):
+        if clubs is not None:
+            in_clubs = df_input["Club"].iloc[positions].isin(clubs).to_numpy()
+            positions = positions[in_clubs]
+        column_positions = [df_input.columns.get_loc(col) for col in required_columns]
+        return df_input.iloc[positions, column_positions].assign(
+            **{"End date": end_dates.iloc[positions]}
+        )
+
 
-    # Filter: Compare the date part of 'End date' (which is datetime64[ns]) with today's date object
-    df_filtered = df_processed_valid_dates[
-        df_processed_valid_dates["End date"].dt.date == today_date_obj
+def ending_members_lookahead(
+    df_input: pd.DataFrame,
+    target_club: str | None,
+    start_date: str,
+    days: int = ENDING_LOOKAHEAD_DAYS,
+) -> pd.DataFrame:
+    """
+    Members ending from start_date through the following `days` days, for one
+    club or (target_club None) every club. See ending_members_between.
+    """
+    if days < 0:
+        raise ValueError("Ending Members: days ahead cannot be negative")
+    end_date = pd.to_datetime(start_date, format="%Y-%m-%d") + pd.Timedelta(days=days)
+    return ending_members_between(
+        df_input,
+        start_date,
+        end_date.strftime("%Y-%m-%d"),
+        None if target_club is None else [target_club],
+    )
+
+
+def active_members_series(
+    df_input: pd.DataFrame, start_date: str, end_date: str, freq: str = "D"
+) -> pd.DataFrame:
+    """
+    Counts active members per club and payment plan type for every date from
+    start_date to end_date (YYYY-MM-DD) at the given pandas frequency
+    ("D" daily, "W" weekly, "MS" month starts, ...).
+
+    Returns:
+        pd.DataFrame: One row per date with a "Date" column followed by one
+                      "<Club> - <Payment plan type>" column per combination,
+                      including a "<Club> - Total" column per club.
+
+    Raises:
+        ValueError: If required columns are missing or the dates are invalid.
+    """
+    missing_cols = [
+        col for col in CURRENT_MEMBERS_COLUMNS if col not in df_input.columns
     ]
+    if missing_cols:
+        raise ValueError(
+            f"Active Members Series: Missing required columns: {', '.join(missing_cols)}"
+        )
+
+    series = membership.active_member_series(df_input, start_date, end_date, freq)
+    series.columns = [f"{club} - {plan}" for club, plan in series.columns]
+    return series.reset_index()
+
+
+def new_members_trend(
+    df_input: pd.DataFrame, end_date: str, months: int = 12
+) -> pd.DataFrame:
+    """
+    Month-by-month new member counts per club and payment plan type for the
+    `months` months up to and including the month of end_date (YYYY-MM-DD).
+    Each month uses the same rule as new_members, with the month's last day
+    (or end_date, for the final month) as the cutoff.
+
+    Returns:
+        pd.DataFrame: One row per month with a "Month" column (YYYY-MM) followed
+                      by one "<Club> - <Payment plan type>" column per
+                      combination, including a "<Club> - Total" column per club.
+
+    Raises:
+        ValueError: If required columns are missing or the date is invalid.
+    """
+    missing_cols = [col for col in NEW_MEMBERS_COLUMNS if col not in df_input.columns]
+    if missing_cols:
+        raise ValueError(
+            f"New Members Trend: Missing required columns: {', '.join(missing_cols)}"
+        )
 
-    return df_filtered
+    trend = membership.new_member_trend(df_input, end_date, months)
+    trend.columns = [f"{club} - {plan}" for club, plan in trend.columns]
+    trend.index = trend.index.strftime("%Y-%m")
+    return trend.reset_index()
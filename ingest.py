@@ -0,0 +1,220 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+
+import pandas as pd
+
+import loaders
+import sidecar
+
+# --- Parallel Multi-file Ingestion ---
+# Monthly exports come one file per club, so a quarter is a dozen workbooks. Parsing
+# Excel is CPU-bound and holds the GIL, so each file is parsed in its own process
+# and the frames are concatenated in the parent. Workers hand their frame back as
+# an Arrow IPC buffer (columnar, categories dictionary-encoded) rather than a
+# pickled DataFrame full of Python string objects; without pyarrow the DataFrame
+# itself is pickled.
+
+SOURCE_FILE_COLUMN = "Source file"
+
+_executor: ProcessPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def max_workers() -> int:
+    """Worker processes for parallel loads. Override with REPORTING_LOAD_WORKERS."""
+    override = os.environ.get("REPORTING_LOAD_WORKERS")
+    if override:
+        return max(1, int(override))
+    return os.cpu_count() or 1
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    """
+    Shared process pool, created on first use so the worker start-up cost (importing
+    pandas) is paid once per session. "spawn" is used on every platform: forking a
+    process that is running Qt threads is not safe. The pool is sized once at
+    max_workers() and never replaced, so loads queued by one caller are never
+    cancelled by another; workers are only started as loads need them.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=max_workers(),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor
+
+
+def shutdown() -> None:
+    """Stops the worker processes (call on application exit)."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def frame_to_ipc(df: pd.DataFrame, category_columns: tuple[str, ...] = ()) -> bytes:
+    """Serializes df as an Arrow IPC stream."""
+    table = sidecar.pa.Table.from_pandas(
+        sidecar.normalize_for_storage(df, category_columns), preserve_index=False
+    )
+    sink = sidecar.pa.BufferOutputStream()
+    with sidecar.pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def frame_from_ipc(payload: bytes) -> pd.DataFrame:
+    table = sidecar.pa.ipc.open_stream(payload).read_all()
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def _load_in_worker(
+    file_path: str,
+    skiprows: int | None,
+    profile: loaders.LoadProfile,
+    sheet: int = 0,
+) -> bytes | pd.DataFrame:
+    """Runs in a worker process: parses one export and returns it for transfer."""
+    df = loaders.load_export(file_path, skiprows, profile, cache=None, sheet=sheet)
+    if not sidecar.sidecars_available():
+        return df
+    return frame_to_ipc(df, profile.category_columns)
+
+
+def decode(payload: bytes | pd.DataFrame) -> pd.DataFrame:
+    """The DataFrame a worker load returned (see submit_load)."""
+    return payload if isinstance(payload, pd.DataFrame) else frame_from_ipc(payload)
+
+
+def submit_load(
+    file_path: str,
+    skiprows: int | None = None,
+    profile: loaders.LoadProfile = loaders.FULL_PROFILE,
+    sheet: int = 0,
+) -> Future:
+    """
+    Parses one export in the shared worker pool, keeping the calling process free.
+    The future's result is passed to decode() for the DataFrame.
+    """
+    return _get_executor().submit(
+        _load_in_worker, file_path, skiprows, profile, sheet
+    )
+
+
+def combine_frames(
+    frames: list[pd.DataFrame],
+    file_paths: list[str],
+    profile: loaders.LoadProfile = loaders.FULL_PROFILE,
+) -> pd.DataFrame:
+    """
+    Concatenates per-file frames in file order, adding a SOURCE_FILE_COLUMN with
+    each row's file name. Category columns whose categories differ between files
+    come out of pd.concat as plain text, so the profile is re-applied.
+    """
+    labelled = [
+        df.assign(**{SOURCE_FILE_COLUMN: os.path.basename(path)})
+        for df, path in zip(frames, file_paths)
+    ]
+    combined = pd.concat(labelled, ignore_index=True)
+    combined[SOURCE_FILE_COLUMN] = combined[SOURCE_FILE_COLUMN].astype("category")
+    return loaders.apply_profile(
+        combined,
+        loaders.LoadProfile(
+            category_columns=profile.category_columns,
+            date_columns=profile.date_columns,
+        ),
+    )
+
+
+def load_exports(
+    file_paths: list[str],
+    skiprows: int | None = None,
+    profile: loaders.LoadProfile = loaders.FULL_PROFILE,
+    parallel: bool = True,
+    cache: loaders.WorkbookCache | None = loaders.workbook_cache,
+    on_file_loaded=None,
+    header_columns=None,
+) -> pd.DataFrame:
+    """
+    Loads several exports of the same kind and concatenates them (see
+    combine_frames). Files already in the in-memory cache are taken from it; the
+    rest are parsed in parallel worker processes when parallel is True (and there
+    is more than one), otherwise one after another. Each parsed file is added to
+    the cache, so single-file reports on it afterwards are instant.
+
+    With header_columns, each file's sheet and header row are located separately
+    (see loaders.header_location) and skiprows is ignored.
+
+    on_file_loaded, if given, is called as on_file_loaded(done, total, file_path)
+    after each file and may raise to stop early (pending files are cancelled).
+    """
+    if not file_paths:
+        raise ValueError("No export files given")
+    total = len(file_paths)
+    frames: dict[int, pd.DataFrame] = {}
+    if header_columns is not None:
+        locations = [
+            loaders.header_location(path, [header_columns]) for path in file_paths
+        ]
+    else:
+        locations = [loaders.HeaderLocation(0, skiprows)] * total
+    keys = [
+        loaders.file_cache_key(path, location.skiprows, profile, location.sheet)
+        for path, location in zip(file_paths, locations)
+    ]
+
+    def _loaded(index: int, df: pd.DataFrame, parsed: bool = True) -> None:
+        frames[index] = df
+        if parsed and cache is not None:
+            cache.put(keys[index], df)
+        if on_file_loaded is not None:
+            on_file_loaded(len(frames), total, file_paths[index])
+
+    pending = []
+    for index, key in enumerate(keys):
+        df = cache.get(key) if cache is not None else None
+        if df is not None:
+            _loaded(index, df, parsed=False)
+        else:
+            pending.append(index)
+
+    if parallel and len(pending) > 1:
+        executor = _get_executor()
+        futures = {
+            executor.submit(
+                _load_in_worker,
+                file_paths[index],
+                locations[index].skiprows,
+                profile,
+                locations[index].sheet,
+            ): index
+            for index in pending
+        }
+        try:
+            not_done = set(futures)
+            while not_done:
+                done, not_done = wait(not_done, return_when=FIRST_COMPLETED)
+                for future in done:
+                    _loaded(futures[future], decode(future.result()))
+        finally:
+            for future in futures:
+                future.cancel()
+    else:
+        for index in pending:
+            _loaded(
+                index,
+                loaders.load_export(
+                    file_paths[index],
+                    locations[index].skiprows,
+                    profile,
+                    None,
+                    sheet=locations[index].sheet,
+                ),
+            )
+
+    return combine_frames([frames[i] for i in range(total)], file_paths, profile)
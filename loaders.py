@@ -0,0 +1,361 @@
+import csv
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import pandas as pd
+
+import profiling
+import sidecar
+
+# --- Parsed Workbook Cache ---
+
+DEFAULT_CACHE_MAX_BYTES = 1_500_000_000  # ~1.5 GB of parsed DataFrames
+
+
+# --- Load Profiles ---
+# Low-cardinality text columns are loaded as category (compact integer codes, and
+# ==/isin compare codes instead of strings), date columns are parsed once at load
+# time, and a report can ask for only the columns it needs.
+
+CATEGORY_COLUMNS = (
+    "Club",
+    "Payment plan type",
+    "Payment Plan Name",
+    "Activity",
+    "Club Zone Type Name",
+    "Facility Booking Definition",
+)
+DATE_COLUMNS = ("Join date", "End date")
+
+
+@dataclass(frozen=True)
+class LoadProfile:
+    """Which columns to load (None = all) and how to type them."""
+
+    columns: tuple[str, ...] | None = None
+    category_columns: tuple[str, ...] = CATEGORY_COLUMNS
+    date_columns: tuple[str, ...] = DATE_COLUMNS
+
+
+FULL_PROFILE = LoadProfile()
+
+
+def profile_for_columns(columns) -> LoadProfile:
+    """Load profile reading only the given columns (e.g. a report's required columns)."""
+    return LoadProfile(columns=tuple(columns))
+
+
+def apply_profile(df: pd.DataFrame, profile: LoadProfile) -> pd.DataFrame:
+    """
+    Restricts df to the profile's columns and casts category and date columns.
+    Date columns are only converted when every value parses as a date, so the
+    report functions still see (and report on) anything unusual.
+    """
+    if profile.columns is not None:
+        df = df[[col for col in df.columns if col in profile.columns]]
+    updates = {}
+    for col in profile.category_columns:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            updates[col] = df[col].astype("category")
+    for col in profile.date_columns:
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            parsed = sidecar.parse_clean_dates(df[col])
+            if parsed is not None:
+                updates[col] = parsed
+    return df.assign(**updates) if updates else df
+
+
+def file_cache_key(
+    file_path: str,
+    skiprows: int | None = None,
+    profile: LoadProfile = FULL_PROFILE,
+    sheet: int = 0,
+) -> tuple:
+    """
+    Builds the cache key for a workbook load: (absolute path, size, mtime, skiprows,
+    sheet, profile). Any change to the file on disk produces a different key, so
+    stale entries are never returned; they simply age out of the LRU.
+    """
+    abs_path = os.path.abspath(file_path)
+    stat = os.stat(abs_path)
+    return (abs_path, stat.st_size, stat.st_mtime_ns, skiprows, sheet, profile)
+
+
+def frame_nbytes(df: pd.DataFrame) -> int:
+    """Memory footprint of a DataFrame, including the Python objects in object columns."""
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+class WorkbookCache:
+    """
+    In-process LRU cache of parsed DataFrames, bounded by total memory footprint.
+
+    Cached frames are shared between callers and must be treated as read-only.
+    Safe to use from the report worker threads.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[tuple, tuple[pd.DataFrame, int]] = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._key_locks: dict[tuple, threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: tuple) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def get(self, key: tuple) -> pd.DataFrame | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: tuple, df: pd.DataFrame) -> None:
+        nbytes = frame_nbytes(df)
+        with self._lock:
+            if key in self._entries:
+                self._total_bytes -= self._entries.pop(key)[1]
+            if nbytes > self.max_bytes:
+                return  # Larger than the whole budget; don't flush everything for it
+            self._entries[key] = (df, nbytes)
+            self._total_bytes += nbytes
+            while self._total_bytes > self.max_bytes:
+                _, (_, evicted_bytes) = self._entries.popitem(last=False)
+                self._total_bytes -= evicted_bytes
+
+    def invalidate(self, file_path: str | None = None) -> int:
+        """
+        Drops every cached load of file_path (all sheet and skiprows variants), or the whole
+        cache when file_path is None. Returns the number of entries removed.
+        """
+        with self._lock:
+            if file_path is None:
+                keys = list(self._entries)
+            else:
+                abs_path = os.path.abspath(file_path)
+                keys = [key for key in self._entries if key[0] == abs_path]
+            for key in keys:
+                self._total_bytes -= self._entries.pop(key)[1]
+            return len(keys)
+
+    def get_or_load(self, key: tuple, loader) -> pd.DataFrame:
+        """
+        Returns the cached frame for key, calling loader() on a miss. Concurrent
+        requests for the same key wait for a single parse instead of racing.
+        """
+        df = self.get(key)
+        if df is not None:
+            return df
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+            if entry is not None:
+                return entry[0]
+            df = loader()
+            self.put(key, df)
+        with self._lock:
+            self._key_locks.pop(key, None)
+        return df
+
+
+workbook_cache = WorkbookCache()
+
+
+def is_cached(
+    file_path: str,
+    skiprows: int | None = None,
+    profile: LoadProfile = FULL_PROFILE,
+    sheet: int = 0,
+) -> bool:
+    try:
+        return file_cache_key(file_path, skiprows, profile, sheet) in workbook_cache
+    except OSError:
+        return False
+
+
+def is_csv(file_path: str) -> bool:
+    return os.path.splitext(file_path)[1].lower() == ".csv"
+
+
+# --- Header Detection ---
+# Exports don't all start with their header on the first row of the first sheet
+# (Group Fitness has a title row above it; some workbooks carry notes or pivot
+# sheets first). Only the first few rows of each sheet are scanned, with
+# openpyxl's read_only mode, to find the sheet and row holding a report's
+# columns; the load then parses just that sheet.
+
+HEADER_SCAN_ROWS = 10
+OPENPYXL_EXTENSIONS = (".xlsx", ".xlsm")
+
+_header_scans: dict[tuple, list[tuple[int, int, frozenset]]] = {}
+_header_scans_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class HeaderLocation:
+    """Where an export's header row is: sheet index and rows above the header."""
+
+    sheet: int = 0
+    skiprows: int | None = None
+
+
+def header_names(header_row) -> list[str]:
+    """Column names as pandas would give them: "Unnamed: n" for blanks, ".1" for repeats."""
+    names = []
+    seen: dict[str, int] = {}
+    for i, value in enumerate(header_row):
+        name = f"Unnamed: {i}" if value is None or value == "" else str(value)
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def _scan_rows(file_path: str, scan_rows: int):
+    """Yields (sheet index, rows) with the first scan_rows rows of each sheet."""
+    extension = os.path.splitext(file_path)[1].lower()
+    if is_csv(file_path):
+        with open(file_path, newline="", encoding="utf-8-sig") as f:
+            reader = csv.reader(f)
+            yield 0, [row for _, row in zip(range(scan_rows), reader)]
+    elif extension in OPENPYXL_EXTENSIONS:
+        import openpyxl
+
+        workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            for index, worksheet in enumerate(workbook.worksheets):
+                yield index, list(
+                    worksheet.iter_rows(max_row=scan_rows, values_only=True)
+                )
+        finally:
+            workbook.close()
+    else:  # e.g. .xls, which openpyxl can't read
+        sheets = pd.read_excel(file_path, sheet_name=None, header=None, nrows=scan_rows)
+        for index, sheet_df in enumerate(sheets.values()):
+            rows = sheet_df.astype(object).where(sheet_df.notna(), None)
+            yield index, [tuple(row) for row in rows.itertuples(index=False)]
+
+
+def _header_candidates(
+    file_path: str, scan_rows: int
+) -> list[tuple[int, int, frozenset]]:
+    """(sheet, row, column names) for every scanned row, memoized per file version."""
+    abs_path = os.path.abspath(file_path)
+    stat = os.stat(abs_path)
+    memo_key = (abs_path, stat.st_size, stat.st_mtime_ns, scan_rows)
+    with _header_scans_lock:
+        candidates = _header_scans.get(memo_key)
+    if candidates is None:
+        candidates = [
+            (sheet, row_index, frozenset(header_names(row)))
+            for sheet, rows in _scan_rows(abs_path, scan_rows)
+            for row_index, row in enumerate(rows)
+        ]
+        with _header_scans_lock:
+            _header_scans[memo_key] = candidates
+    return candidates
+
+
+def locate_header(
+    file_path: str, required_columns, scan_rows: int = HEADER_SCAN_ROWS
+) -> HeaderLocation | None:
+    """
+    The first sheet and row (within the first scan_rows rows) whose values
+    include every one of required_columns, or None if no scanned row does.
+    """
+    required = set(required_columns)
+    for sheet, row_index, names in _header_candidates(file_path, scan_rows):
+        if required <= names:
+            return HeaderLocation(sheet, row_index or None)
+    return None
+
+
+def header_location(
+    file_path: str, column_sets, scan_rows: int = HEADER_SCAN_ROWS
+) -> HeaderLocation:
+    """
+    Location of the header for the first of column_sets (lists of column names,
+    e.g. the required columns of the reports to run) found in the file. Falls back
+    to the first row of the first sheet, where the report's own column check
+    then reports what is missing.
+    """
+    for columns in column_sets:
+        location = locate_header(file_path, columns, scan_rows)
+        if location is not None:
+            return location
+    return HeaderLocation()
+
+
+def load_export(
+    file_path: str,
+    skiprows: int | None = None,
+    profile: LoadProfile = FULL_PROFILE,
+    cache: WorkbookCache | None = workbook_cache,
+    use_sidecar: bool = True,
+    sheet: int = 0,
+) -> pd.DataFrame:
+    """
+    Loads an Excel or CSV export with pandas, typed and projected by `profile`, reusing a
+    previous load of the same file (same path, size, mtime, skiprows, sheet and
+    profile) when one is cached in memory, or its on-disk columnar sidecar (see
+    sidecar.py) when one exists for its contents. Only worksheet `sheet` (an
+    index; CSV files have one) is parsed.
+
+    Without a sidecar, only the profile's columns are read from the file.
+    With sidecars enabled the first load parses every column, so that the
+    sidecar can serve any report's columns afterwards.
+    """
+    sidecar_enabled = use_sidecar and sidecar.sidecars_available()
+
+    def _parse(columns: tuple[str, ...] | None) -> pd.DataFrame:
+        kwargs = {}
+        if skiprows is not None:
+            kwargs["skiprows"] = skiprows
+        if columns is not None:
+            kwargs["usecols"] = lambda col: col in columns
+        if is_csv(file_path):
+            return pd.read_csv(file_path, **kwargs)
+        return pd.read_excel(file_path, sheet_name=sheet, **kwargs)
+
+    def _read() -> pd.DataFrame:
+        with profiling.stage("read") as record:
+            if not sidecar_enabled:
+                df = _parse(profile.columns)
+            else:
+                df = sidecar.load_with_sidecar(
+                    file_path,
+                    skiprows,
+                    lambda: _parse(None),
+                    profile.columns,
+                    profile.category_columns,
+                    sheet,
+                )
+            if record is not None:
+                record.rows = len(df)
+        with profiling.stage("parse", len(df)):
+            return apply_profile(df, profile)
+
+    if cache is None:
+        return _read()
+    return cache.get_or_load(file_cache_key(file_path, skiprows, profile, sheet), _read)
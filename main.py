@@ -1,15 +1,12 @@
 import sys
-import pandas as pd  # Changed from polars
-
-# Removed Polars specific exception imports if not used elsewhere
-# from polars.exceptions import NoDataError, ColumnNotFoundError, ComputeError
-from pandas.errors import EmptyDataError  # Pandas equivalent for empty data
+import pandas as pd
+from pandas.errors import EmptyDataError
 import datetime as dt
 import os
 import webbrowser
 import subprocess
 import warnings
-import inspect
+import multiprocessing
 
 warnings.filterwarnings(
     "ignore",
@@ -32,16 +29,35 @@ from PySide6.QtWidgets import (
     QPushButton,
     QLabel,
     QFileDialog,
-    QTextEdit,
+    QTextBrowser,
     QGroupBox,
     QFormLayout,
     QMessageBox,
     QDateEdit,
+    QProgressBar,
+    QCheckBox,
+    QTableView,
+    QSpinBox,
+)
+from PySide6.QtCore import (
+    QAbstractTableModel,
+    QDate,
+    QModelIndex,
+    QObject,
+    QRunnable,
+    QThreadPool,
+    Qt,
+    Signal,
 )
-from PySide6.QtCore import QDate
-from PySide6.QtGui import QIcon
+from PySide6.QtGui import QIcon, QTextCursor
 
-import functions  # Your functions.py file (now all pandas)
+import functions
+import ingest
+import loaders
+import profiling
+import registry
+import rendering
+import streaming
 
 
 def resource_path(relative_path: str) -> str:
@@ -52,18 +68,229 @@ def resource_path(relative_path: str) -> str:
     return os.path.join(base_path, relative_path)
 
 
+class ReportCancelled(Exception):
+    """Raised inside a ReportWorker when the user cancels the running job."""
+
+
+class ReportWorkerSignals(QObject):
+    """
+    Signals emitted by ReportWorker. Every signal carries the job id so the UI
+    can ignore late results from a job that has already been cancelled.
+    """
+
+    progress = Signal(int, int, str)  # job id, percent, message
+    loaded = Signal(int, object)  # job id, loaded pandas DataFrame
+    finished = Signal(int, object)  # job id, rendering.ReportResult or DataFrame
+    failed = Signal(int, str, object)  # job id, stage ("load"/"report"), exception
+    profiled = Signal(
+        int, object
+    )  # job id, profiling.StageProfile (before finished/failed)
+    cancelled = Signal(int)  # job id
+
+
+class ReportWorker(QRunnable):
+    """
+    Loads the Excel file(s) and runs a report (see registry.py) off the GUI thread.
+    Several files are concatenated into one frame (see ingest.py), parsed in
+    worker processes when parallel is True.
+    Cancellation is cooperative: it takes effect at the next stage boundary
+    (pd.read_excel itself cannot be interrupted), and the result is discarded.
+    Large files are streamed in chunks for reports that support it (see
+    streaming.py); those can be cancelled between chunks.
+    The sheet and header row holding the report's columns are located in each
+    file before it is read (see loaders.header_location).
+    Each run is profiled by stage (see profiling.py).
+    """
+
+    def __init__(
+        self,
+        job_id: int,
+        file_paths: list[str],
+        spec: registry.ReportSpec,
+        params: dict | None = None,
+        parallel: bool = True,
+    ):
+        super().__init__()
+        self.job_id = job_id
+        self.file_paths = list(file_paths)
+        self.file_path = self.file_paths[0]
+        self.parallel = parallel
+        self.spec = spec
+        self.params = dict(params or {})
+        self.signals = ReportWorkerSignals()
+        self._cancel_requested = False
+
+    def cancel(self):
+        self._cancel_requested = True
+
+    def _check_cancelled(self):
+        if self._cancel_requested:
+            raise ReportCancelled()
+
+    def _run_streaming(self):
+        """Streams the file through the report's aggregator in fixed-size chunks."""
+        file_name = os.path.basename(self.file_path)
+        self.signals.progress.emit(
+            self.job_id, 10, f"Streaming large file: {file_name}..."
+        )
+
+        with profiling.stage("stream") as record:
+
+            def on_chunk(rows_read: int):
+                self._check_cancelled()
+                record.rows = rows_read
+                self.signals.progress.emit(
+                    self.job_id,
+                    50,
+                    f"Streaming {file_name}: {rows_read:,} rows read...",
+                )
+
+            # Stages inside each chunk would swamp the profile; it is timed as a whole
+            with profiling.activate(None):
+                return registry.stream(
+                    self.spec, self.file_path, self.params, on_chunk=on_chunk
+                )
+
+    def _load_many(self) -> pd.DataFrame:
+        mode = "in parallel" if self.parallel else "one by one"
+        self.signals.progress.emit(
+            self.job_id, 10, f"Loading {len(self.file_paths)} files {mode}..."
+        )
+
+        def on_file_loaded(done: int, total: int, file_path: str):
+            self._check_cancelled()
+            self.signals.progress.emit(
+                self.job_id,
+                10 + 50 * done // total,
+                f"Loaded {os.path.basename(file_path)} ({done}/{total})",
+            )
+
+        return registry.load(self.spec, self.file_paths, self.parallel, on_file_loaded)
+
+    def _load(self) -> pd.DataFrame:
+        if len(self.file_paths) > 1:
+            return self._load_many()
+        location = registry.header_location(self.spec, self.file_path)
+        cached_note = (
+            " (cached)"
+            if registry.is_cached(self.spec, self.file_path, location)
+            else ""
+        )
+        self.signals.progress.emit(
+            self.job_id,
+            10,
+            f"Loading file: {os.path.basename(self.file_path)}{cached_note}...",
+        )
+        return registry.load(self.spec, self.file_paths, location=location)
+
+    def run(self):
+        stage = "load"
+        with profiling.profiled(self.spec.function.__name__) as profile:
+            try:
+                if (
+                    len(self.file_paths) == 1
+                    and self.spec.can_stream
+                    and streaming.should_stream(self.file_path)
+                ):
+                    stage = "stream"
+                    result = self._run_streaming()
+                else:
+                    with profiling.stage("load") as record:
+                        df_loaded = self._load()
+                        record.rows = len(df_loaded)
+                    self._check_cancelled()
+                    self.signals.loaded.emit(self.job_id, df_loaded)
+
+                    stage = "report"
+                    self.signals.progress.emit(
+                        self.job_id, 60, "File loaded.\nProcessing..."
+                    )
+                    with profiling.stage("report", len(df_loaded)):
+                        result = registry.run(self.spec, df_loaded, self.params)
+                self._check_cancelled()
+
+                self.signals.progress.emit(self.job_id, 100, "Done.")
+                self.signals.profiled.emit(self.job_id, profile)
+                self.signals.finished.emit(self.job_id, result)
+            except ReportCancelled:
+                self.signals.cancelled.emit(self.job_id)
+            except Exception as e:
+                if stage == "stream":
+                    # Reading and reporting are one pass when streaming: file problems
+                    # are load errors, anything else (e.g. missing columns) a report error
+                    stage = (
+                        "load" if isinstance(e, (OSError, EmptyDataError)) else "report"
+                    )
+                self.signals.profiled.emit(self.job_id, profile)
+                self.signals.failed.emit(self.job_id, stage, e)
+
+
+class DataFrameModel(QAbstractTableModel):
+    """
+    Read-only table model over a DataFrame. Cells are formatted (see
+    rendering.format_value) only when the view draws them, so large reports
+    such as Ending Members display without building their whole text.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._df = pd.DataFrame()
+        self._right_aligned: list[bool] = []
+
+    def set_frame(self, df: pd.DataFrame):
+        self.beginResetModel()
+        self._df = df
+        self._right_aligned = [
+            pd.api.types.is_numeric_dtype(df[column]) for column in df.columns
+        ]
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._df)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._df.columns)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return rendering.format_value(self._df.iat[index.row(), index.column()])
+        if (
+            role == Qt.ItemDataRole.TextAlignmentRole
+            and self._right_aligned[index.column()]
+        ):
+            return int(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return str(self._df.columns[section])
+        return str(section + 1)
+
+
 class ReportingApp(QWidget):
     def __init__(self):
         super().__init__()
         self.file_path = None
-        self.df_pandas: pd.DataFrame | None = None  # Changed from df_polars
-
-        self.club_list = [
-            "DeakinACTIVE Waurn Ponds",
-            "DeakinACTIVE Burwood",
-            "DeakinACTIVE Waterfront",
-            "DeakinACTIVE Warrnambool",
-        ]
+        self.file_paths: list[str] = []
+        self.df_pandas: pd.DataFrame | None = None
+
+        self.thread_pool = QThreadPool.globalInstance()
+        self._active_worker: ReportWorker | None = None
+        self._active_report_name: str | None = None
+        self._job_counter = 0
+        # Stage timings of the last report, shown as a footer below its output
+        self._timing_profile: profiling.StageProfile | None = None
+        self._timing_footer_start: int | None = None
+        self._timings_expanded = False
+        # Result of the last report, for Export
+        self._result = None
+        self._result_name: str | None = None
+
+        self.club_list = list(functions.CLUB_LIST)
         self.example_target_club = (
             self.club_list[0] if self.club_list else "Select Target Club"
         )
@@ -93,29 +320,37 @@ class ReportingApp(QWidget):
         report_selection_layout = QHBoxLayout()
         report_label = QLabel("Select Report Type:")
         self.report_combo = QComboBox()
-        # Ensure these function names match your all-pandas functions.py
-        self.report_options = {
-            "--Select Report--": None,
-            "Current Members": functions.current_members,
-            "New Members": functions.new_members,  # Matches your provided functions.py
-            "Technogym Reporting (Consults/PT)": functions.technogym_reporting,
-            "Group Fitness Summary": functions.groupFitness,
-            "Booking Zones Analysis": functions.booking_zones,
-            "Ending Members Report": functions.generate_ending_members_report,  # New function
-        }
-        self.report_combo.addItems(self.report_options.keys())
+        # Reports are declared in registry.py, listed here in registry order
+        self.report_combo.addItems(
+            ["--Select Report--"]
+            + [spec.name for spec in registry.REPORTS]
+            + [registry.PACK_NAME]
+        )
         self.report_combo.currentTextChanged.connect(self.on_report_type_change)
         report_selection_layout.addWidget(report_label)
         report_selection_layout.addWidget(self.report_combo)
         main_layout.addLayout(report_selection_layout)
 
         file_upload_layout = QHBoxLayout()
-        self.upload_button = QPushButton("Upload Excel File")
+        self.upload_button = QPushButton("Upload Excel File(s)")
         self.upload_button.clicked.connect(self.upload_file)
         self.file_label = QLabel("No file selected.")
         self.file_label.setWordWrap(True)
         file_upload_layout.addWidget(self.upload_button)
         file_upload_layout.addWidget(self.file_label, 1)
+        self.parallel_load_checkbox = QCheckBox("Load in parallel")
+        self.parallel_load_checkbox.setChecked(True)
+        self.parallel_load_checkbox.setToolTip(
+            "Parse the selected files in separate processes and combine them."
+        )
+        self.parallel_load_checkbox.setVisible(False)
+        file_upload_layout.addWidget(self.parallel_load_checkbox)
+        self.clear_cache_button = QPushButton("Clear Cache")
+        self.clear_cache_button.setToolTip(
+            "Discard parsed workbooks so the next report re-reads the file from disk."
+        )
+        self.clear_cache_button.clicked.connect(self.clear_cache)
+        file_upload_layout.addWidget(self.clear_cache_button)
         main_layout.addLayout(file_upload_layout)
 
         self.params_groupbox = QGroupBox("Report Parameters")
@@ -128,56 +363,161 @@ class ReportingApp(QWidget):
         self.end_date_edit = QDateEdit(QDate.currentDate())
         self.end_date_edit.setCalendarPopup(True)
         self.end_date_edit.setDisplayFormat("yyyy-MM-dd")
-        self.params_form_layout.addRow(QLabel("Target Club:"), self.target_club_combo)
+        self.days_spin = QSpinBox()
+        self.days_spin.setRange(0, 365)
+        self.club_param_label = QLabel("Target Club:")
+        self.days_param_label = QLabel("Days Ahead:")
+        self.params_form_layout.addRow(self.club_param_label, self.target_club_combo)
         self.params_form_layout.addRow(self.date_param_label, self.end_date_edit)
+        self.params_form_layout.addRow(self.days_param_label, self.days_spin)
         main_layout.addWidget(self.params_groupbox)
 
+        # Reports run together from one load of the export (see registry.run_pack)
+        self.pack_groupbox = QGroupBox("Reports in Pack (every club)")
+        pack_layout = QVBoxLayout()
+        self.pack_checkboxes = {}
+        for spec in registry.REPORTS:
+            checkbox = QCheckBox(spec.name)
+            checkbox.setChecked(spec.name in registry.DEFAULT_PACK)
+            checkbox.toggled.connect(
+                lambda _: self._update_params_form(self._selected_spec())
+            )
+            pack_layout.addWidget(checkbox)
+            self.pack_checkboxes[spec.name] = checkbox
+        self.pack_groupbox.setLayout(pack_layout)
+        self.pack_groupbox.setVisible(False)
+        main_layout.addWidget(self.pack_groupbox)
+
+        run_layout = QHBoxLayout()
         self.generate_button = QPushButton("Generate Report")
         self.generate_button.clicked.connect(self.generate_report)
-        main_layout.addWidget(self.generate_button)
-
-        self.output_display = QTextEdit()
-        self.output_display.setReadOnly(True)
-        main_layout.addWidget(self.output_display)
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.setEnabled(False)
+        self.cancel_button.clicked.connect(self.cancel_report)
+        self.export_button = QPushButton("Export...")
+        self.export_button.setToolTip(
+            "Save the last report as CSV, Excel, JSON or HTML."
+        )
+        self.export_button.setEnabled(False)
+        self.export_button.clicked.connect(self.export_result)
+        run_layout.addWidget(self.generate_button, 1)
+        run_layout.addWidget(self.cancel_button)
+        run_layout.addWidget(self.export_button)
+        main_layout.addLayout(run_layout)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setVisible(False)
+        main_layout.addWidget(self.progress_bar)
+
+        # Table reports are shown here; their summary and timings stay below
+        self.table_model = DataFrameModel(self)
+        self.table_view = QTableView()
+        self.table_view.setModel(self.table_model)
+        self.table_view.setVisible(False)
+        main_layout.addWidget(self.table_view, 3)
+
+        self.output_display = QTextBrowser()
+        self.output_display.setOpenLinks(False)  # Links only toggle the timing footer
+        self.output_display.anchorClicked.connect(self._on_output_link_clicked)
+        main_layout.addWidget(self.output_display, 1)
 
         self.setLayout(main_layout)
         self.show()
 
+    def _selected_spec(self) -> registry.ReportSpec | None:
+        """The selected report, or the pack of ticked reports; None if there is none."""
+        report_name = self.report_combo.currentText()
+        if report_name == registry.PACK_NAME:
+            specs = [
+                spec
+                for spec in registry.REPORTS
+                if self.pack_checkboxes[spec.name].isChecked()
+            ]
+            return registry.pack(specs, self.club_list) if specs else None
+        return registry.REPORTS_BY_NAME.get(report_name)
+
     def on_report_type_change(self, report_name: str):
         self.output_display.clear()
-        reports_needing_params = ["Current Members", "New Members"]
-        if report_name in reports_needing_params:
-            if self.example_target_club in self.club_list:
-                self.target_club_combo.setCurrentText(self.example_target_club)
-            else:
-                self.target_club_combo.setCurrentIndex(0)
-            q_end_date = QDate.fromString(self.example_end_date, "yyyy-MM-dd")
-            self.end_date_edit.setDate(
-                q_end_date if q_end_date.isValid() else QDate.currentDate()
-            )
-            if report_name == "New Members":  # Uses end_date to determine month/year
-                self.date_param_label.setText("Target Month (select any day in month):")
-            else:
-                self.date_param_label.setText("End Date:")
-            self.params_groupbox.setVisible(True)
+        self._clear_result()
+        self.pack_groupbox.setVisible(report_name == registry.PACK_NAME)
+        spec = self._selected_spec()
+        club_parameter = spec.parameter(registry.CLUB) if spec is not None else None
+        if (
+            club_parameter is not None
+            and club_parameter.required
+            and self.example_target_club in self.club_list
+        ):
+            self.target_club_combo.setCurrentText(self.example_target_club)
         else:
+            self.target_club_combo.setCurrentIndex(0)  # Optional club: every club
+        q_end_date = QDate.fromString(self.example_end_date, "yyyy-MM-dd")
+        self.end_date_edit.setDate(
+            q_end_date if q_end_date.isValid() else QDate.currentDate()
+        )
+        days_parameter = spec.parameter(registry.DAYS) if spec is not None else None
+        if days_parameter is not None:
+            self.days_spin.setValue(days_parameter.default or 0)
+        self._update_params_form(spec)
+
+    def _update_params_form(self, spec: registry.ReportSpec | None):
+        if spec is None or not spec.parameters:
             self.params_groupbox.setVisible(False)
+            return
+        club_parameter = spec.parameter(registry.CLUB)
+        self.params_form_layout.setRowVisible(
+            self.target_club_combo, club_parameter is not None
+        )
+        if club_parameter is not None:
+            self.club_param_label.setText(club_parameter.label)
+        days_parameter = spec.parameter(registry.DAYS)
+        self.params_form_layout.setRowVisible(
+            self.days_spin, days_parameter is not None
+        )
+        if days_parameter is not None:
+            self.days_param_label.setText(days_parameter.label)
+        date_parameter = spec.parameter(registry.END_DATE)
+        self.params_form_layout.setRowVisible(
+            self.end_date_edit, date_parameter is not None
+        )
+        if date_parameter is not None:
+            self.date_param_label.setText(date_parameter.label)
+        self.params_groupbox.setVisible(True)
 
     def upload_file(self):
-        filePath, _ = QFileDialog.getOpenFileName(
+        filePaths, _ = QFileDialog.getOpenFileNames(
             self,
-            "Upload Excel File",
+            "Upload Excel File(s)",
             "",
             "Excel Files (*.xlsx *.xls);;CSV Files (*.csv);;All Files (*)",
         )
-        if filePath:
-            self.file_path = filePath
-            self.file_label.setText(os.path.basename(filePath))
-            self.output_display.setText(
-                f"Selected file: {self.file_path}\nReady to load data."
-            )
+        if filePaths:
+            # Several files (e.g. one export per club or month) are combined into one
+            self.file_paths = filePaths
+            self.file_path = filePaths[0]
+            self.parallel_load_checkbox.setVisible(len(filePaths) > 1)
+            if len(filePaths) == 1:
+                self.file_label.setText(os.path.basename(self.file_path))
+                self.output_display.setText(
+                    f"Selected file: {self.file_path}\nReady to load data."
+                )
+            else:
+                names = [os.path.basename(path) for path in filePaths]
+                self.file_label.setText(f"{len(filePaths)} files: {', '.join(names)}")
+                self.output_display.setText(
+                    f"Selected {len(filePaths)} files:\n"
+                    + "\n".join(filePaths)
+                    + "\nThey will be combined into one report."
+                )
             self.df_pandas = None  # Reset cached DataFrame
 
+    def clear_cache(self):
+        removed = loaders.workbook_cache.invalidate()
+        self.df_pandas = None
+        self.output_display.setText(
+            f"Cleared {removed} cached workbook load(s). The next report will re-read the file."
+        )
+
     def _open_file_externally(self, filepath: str):
         try:
             abs_filepath = os.path.abspath(filepath)
@@ -214,208 +554,309 @@ class ReportingApp(QWidget):
             )
             self.output_display.append(f"\nError opening file: {str(e)}")
 
+    def _set_running(self, running: bool):
+        self.generate_button.setEnabled(not running)
+        self.upload_button.setEnabled(not running)
+        self.parallel_load_checkbox.setEnabled(not running)
+        self.clear_cache_button.setEnabled(not running)
+        self.report_combo.setEnabled(not running)
+        self.cancel_button.setEnabled(running)
+        self.progress_bar.setVisible(running)
+        if running:
+            self.progress_bar.setValue(0)
+
+    def _is_active_job(self, job_id: int) -> bool:
+        return self._active_worker is not None and self._active_worker.job_id == job_id
+
+    def _finish_job(self):
+        self._active_worker = None
+        self._set_running(False)
+
     def generate_report(self):
+        if self._active_worker is not None:
+            return  # A report is already running
+
         if not self.file_path:
             QMessageBox.warning(self, "Warning", "Please upload an Excel file first.")
             self.output_display.setText("Operation cancelled: No Excel file uploaded.")
             return
 
         selected_report_name = self.report_combo.currentText()
-        if selected_report_name == "--Select Report--":
+        spec = self._selected_spec()
+        if spec is None and selected_report_name == registry.PACK_NAME:
+            QMessageBox.warning(
+                self, "Warning", "Please tick at least one report for the pack."
+            )
+            self.output_display.setText("Operation cancelled: The pack is empty.")
+            return
+        if spec is None:
             QMessageBox.warning(self, "Warning", "Please select a report type.")
             self.output_display.setText("Operation cancelled: No report type selected.")
             return
 
-        report_function = self.report_options.get(selected_report_name)
-        if not callable(report_function):
-            self.output_display.setHtml(
-                f"<b><font color='red'>Configuration Error:</font></b><br>No valid function for report: {selected_report_name}"
+        # --- Report parameters are read on the GUI thread before dispatch ---
+        params = {}
+        club_parameter = spec.parameter(registry.CLUB)
+        if club_parameter is not None:
+            target_club = self.target_club_combo.currentText()
+            if target_club == "--Select Club--":
+                if club_parameter.required:
+                    QMessageBox.warning(
+                        self, "Input Missing", "Please select a Target Club."
+                    )
+                    self.output_display.setText("Cancelled: Target Club not selected.")
+                    return
+                target_club = None  # Optional: every club
+            params[registry.CLUB] = target_club
+        if spec.parameter(registry.END_DATE) is not None:
+            params[registry.END_DATE] = self.end_date_edit.date().toString("yyyy-MM-dd")
+        if spec.parameter(registry.DAYS) is not None:
+            params[registry.DAYS] = self.days_spin.value()
+
+        self._job_counter += 1
+        worker = ReportWorker(
+            self._job_counter,
+            self.file_paths or [self.file_path],
+            spec,
+            params,
+            self.parallel_load_checkbox.isChecked(),
+        )
+        worker.signals.progress.connect(self._on_report_progress)
+        worker.signals.loaded.connect(self._on_report_loaded)
+        worker.signals.finished.connect(self._on_report_finished)
+        worker.signals.failed.connect(self._on_report_failed)
+        worker.signals.cancelled.connect(self._on_report_cancelled)
+        worker.signals.profiled.connect(self._on_report_profiled)
+
+        self._active_worker = worker
+        self._active_report_name = selected_report_name
+        self._timing_profile = None
+        self._timing_footer_start = None
+        self._set_running(True)
+        self.output_display.clear()
+        self._clear_result()
+        self.thread_pool.start(worker)
+
+    def cancel_report(self):
+        if self._active_worker is None:
+            return
+        self._active_worker.cancel()
+        self.output_display.setText(
+            f"'{self._active_report_name}' cancelled. Any result still being computed will be discarded."
+        )
+        self._finish_job()
+
+    def _on_report_progress(self, job_id: int, percent: int, message: str):
+        if not self._is_active_job(job_id):
+            return
+        self.progress_bar.setValue(percent)
+        if percent < 100:
+            self.output_display.append(
+                message.replace(
+                    "Processing...", f"Processing: '{self._active_report_name}'..."
+                )
             )
+
+    def _on_report_loaded(self, job_id: int, df_loaded: pd.DataFrame):
+        if not self._is_active_job(job_id):
             return
+        # Cache the loaded pandas DataFrame
+        self.df_pandas = df_loaded
+
+    def _on_report_cancelled(self, job_id: int):
+        if self._is_active_job(job_id):
+            self._finish_job()
+
+    def _on_report_profiled(self, job_id: int, profile: profiling.StageProfile):
+        if self._is_active_job(job_id):
+            self._timing_profile = profile
 
+    def _finish_timing(self, selected_report_name: str, file_paths: list[str], **extra):
+        """Logs the finished job's stage profile and shows it below the output."""
+        profile = self._timing_profile
+        if profile is None:
+            return
         try:
-            self.output_display.setText(
-                f"Loading file: {os.path.basename(self.file_path)}..."
+            profiling.write_log(
+                profile, report=selected_report_name, files=file_paths, **extra
             )
-            QApplication.processEvents()
-
-            # --- Data Loading: All reports now use pandas DataFrame ---
-            df_loaded_pandas = None
-            if selected_report_name == "Group Fitness Summary":
-                try:
-                    df_loaded_pandas = pd.read_excel(self.file_path, skiprows=1)
-                except Exception as e_load_gf:
-                    msg = (
-                        f"Could not load Group Fitness sheet using pandas: {e_load_gf}. "
-                        "Ensure Excel is valid, 1st row is skippable, 2nd row has headers."
-                    )
-                    QMessageBox.critical(self, "Load Error (Group Fitness)", msg)
-                    self.output_display.setHtml(
-                        f"<b><font color='red'>Load Error:</font></b><br>{msg}"
-                    )
-                    return
-            else:  # Standard pandas load for all other reports
-                try:
-                    df_loaded_pandas = pd.read_excel(self.file_path)
-                except (
-                    EmptyDataError
-                ):  # Catch pandas specific error for empty file/sheet
-                    msg = f"<b><font color='red'>Data Error:</font></b><br>No data in Excel file/sheet: {self.file_path}. File might be empty."
-                    QMessageBox.critical(
-                        self,
-                        "Data Error",
-                        f"No data in Excel file/sheet: {self.file_path}.",
-                    )
-                    self.output_display.setHtml(msg)
-                    return
-                except Exception as e_load:  # General pandas load error
-                    msg = f"<b><font color='red'>File Load Error:</font></b><br>Could not load Excel file with pandas: {e_load}"
-                    QMessageBox.critical(
-                        self, "Load Error", f"Failed to load Excel file: {e_load}"
-                    )
-                    self.output_display.setHtml(msg)
-                    return
-
-            # Cache the loaded pandas DataFrame if needed by multiple calls, or just use df_loaded_pandas
-            self.df_pandas = df_loaded_pandas
+        except OSError as e:
+            print(f"Warning: could not write profile log: {e}")
+        self._timing_footer_start = None
+        self._show_timing_footer()
+
+    def _show_timing_footer(self):
+        cursor = QTextCursor(self.output_display.document())
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        if self._timing_footer_start is None:
+            self._timing_footer_start = cursor.position()
+        else:
+            # Replace the footer drawn last time (it is always at the end)
+            cursor.setPosition(
+                self._timing_footer_start, QTextCursor.MoveMode.KeepAnchor
+            )
+            cursor.removeSelectedText()
+        cursor.insertHtml(
+            profiling.timing_footer_html(
+                self._timing_profile, self._timings_expanded, "#timings"
+            )
+        )
 
-            self.output_display.append(
-                f"File loaded.\nProcessing: '{selected_report_name}'..."
+    def _append_above_timings(self, text: str):
+        """Appends text to the output, keeping the timing footer at the end."""
+        if self._timing_footer_start is None:
+            self.output_display.append(text)
+            return
+        cursor = QTextCursor(self.output_display.document())
+        cursor.setPosition(self._timing_footer_start)
+        cursor.movePosition(
+            QTextCursor.MoveOperation.End, QTextCursor.MoveMode.KeepAnchor
+        )
+        cursor.removeSelectedText()
+        self.output_display.append(text)
+        self._timing_footer_start = None
+        self._show_timing_footer()
+
+    def _on_output_link_clicked(self, url):
+        if url.fragment() == "timings" and self._timing_profile is not None:
+            self._timings_expanded = not self._timings_expanded
+            self._show_timing_footer()
+
+    def _clear_result(self):
+        self._result = None
+        self._result_name = None
+        self.export_button.setEnabled(False)
+        self.table_model.set_frame(pd.DataFrame())
+        self.table_view.setVisible(False)
+
+    def _on_report_finished(self, job_id: int, result):
+        if not self._is_active_job(job_id):
+            return
+        selected_report_name = self._active_report_name
+        spec = self._active_worker.spec
+        file_paths = self._active_worker.file_paths
+        self._finish_job()
+
+        if spec.output == registry.DATAFRAME:
+            self._show_table(selected_report_name, result)
+        elif isinstance(result, rendering.ReportResult):
+            title = f"<h3>--- {selected_report_name} Results ---</h3>"
+            with profiling.activate(self._timing_profile):
+                result_html = rendering.to_html(result)
+                with profiling.stage("display"):
+                    self.output_display.setHtml(title + result_html)
+            self._set_result(selected_report_name, result)
+        else:
+            self.output_display.setHtml(
+                f"<b><font color='red'>Display Error:</font></b><br>Report '{selected_report_name}' did not return a report result. Type: {type(result).__name__}"
             )
-            QApplication.processEvents()
-
-            # --- Report Function Execution ---
-            # All functions now expect a pandas DataFrame
-
-            if (
-                selected_report_name == "Booking Zones Analysis"
-                or selected_report_name == "Ending Members Report"
-            ):
-                # These functions return a pandas DataFrame to be saved as CSV
-                returned_df = report_function(self.df_pandas)
-
-                if isinstance(returned_df, pd.DataFrame):
-                    slug = selected_report_name.replace(
-                        " ", "_"
-                    )  # Generate slug from report name
-                    sugg_fname = f"{slug}_{dt.date.today().strftime('%Y%m%d')}.csv"
-                    filePath, _ = QFileDialog.getSaveFileName(
-                        self,
-                        f"Save {selected_report_name}",
-                        sugg_fname,
-                        "CSV (*.csv);;All (*)",
-                    )
-                    if filePath:
-                        try:
-                            returned_df.to_csv(
-                                filePath, index=False
-                            )  # Pandas save to CSV
-                            self.output_display.setText(
-                                f"{selected_report_name} saved: {filePath}"
-                            )
-                            self._open_file_externally(filePath)
-                        except Exception as e_save:
-                            QMessageBox.critical(
-                                self, "Error", f"Failed to save/open report: {e_save}"
-                            )
-                            self.output_display.setHtml(
-                                f"<b><font color='red'>Save/Open Error:</font></b><br>{e_save}"
-                            )
-                    else:
-                        self.output_display.setText(
-                            f"{selected_report_name} save cancelled."
-                        )
-                else:
-                    self.output_display.setHtml(
-                        f"<b><font color='red'>Report Error:</font></b><br>{selected_report_name} did not return a pandas DataFrame as expected. Got: {type(returned_df).__name__}"
-                    )
-                return  # Specific handling done
+        self._finish_timing(selected_report_name, file_paths)
 
-            # --- For reports that return HTML directly ---
-            result_display_data = None
-            if selected_report_name == "Current Members":
-                target_club = self.target_club_combo.currentText()
-                if target_club == "--Select Club--":
-                    QMessageBox.warning(
-                        self, "Input Missing", "Please select a Target Club."
-                    )
-                    self.output_display.setText("Cancelled: Target Club not selected.")
-                    return
-                end_date_str = self.end_date_edit.date().toString("yyyy-MM-dd")
-                result_display_data = report_function(
-                    self.df_pandas, target_club, end_date_str
-                )
+    def _set_result(self, selected_report_name: str, result):
+        self._result = result
+        self._result_name = selected_report_name
+        self.export_button.setEnabled(True)
 
-            elif selected_report_name == "New Members":
-                target_club = self.target_club_combo.currentText()
-                if target_club == "--Select Club--":
-                    QMessageBox.warning(
-                        self, "Input Missing", "Please select a Target Club."
-                    )
-                    self.output_display.setText("Cancelled: Target Club not selected.")
-                    return
-                end_date_str = self.end_date_edit.date().toString(
-                    "yyyy-MM-dd"
-                )  # function new_members takes this
-                result_display_data = report_function(
-                    self.df_pandas, target_club, end_date_str
-                )
+    def _show_table(self, selected_report_name: str, returned_df):
+        if not isinstance(returned_df, pd.DataFrame):
+            self.output_display.setHtml(
+                f"<b><font color='red'>Report Error:</font></b><br>{selected_report_name} did not return a pandas DataFrame as expected. Got: {type(returned_df).__name__}"
+            )
+            return
 
-            else:  # Generic path for other reports returning HTML (Technogym, Group Fitness)
-                try:
-                    result_display_data = report_function(self.df_pandas)
-                except TypeError as te:
-                    sig = inspect.signature(report_function)
-                    num_expected_args = len(
-                        [
-                            p
-                            for p_name, p in sig.parameters.items()
-                            if p.default == inspect.Parameter.empty
-                            and p_name not in ("df", "df_input", "df_pandas_input")
-                        ]
-                    )
-                    if num_expected_args > 0:
-                        self.output_display.setHtml(
-                            f"<b><font color='red'>Parameter Error:</font></b><br>Report '{selected_report_name}' requires additional parameters.<br>Function signature: {str(sig)}<br>Error: {te}"
-                        )
-                    else:
-                        self.output_display.setHtml(
-                            f"<b><font color='red'>Execution Error:</font></b><br>Report '{selected_report_name}' encountered a TypeError.<br>Details: {te}"
-                        )
-                    return
+        with profiling.activate(self._timing_profile), profiling.stage(
+            "display", len(returned_df)
+        ):
+            self.table_model.set_frame(returned_df)
+            self.table_view.resizeColumnsToContents()
+            self.table_view.setVisible(True)
+        self._set_result(selected_report_name, returned_df)
+        self.output_display.setText(
+            f"{selected_report_name}: {len(returned_df):,} rows. Use Export to save them."
+        )
+        unparsed_rows = returned_df.attrs.get("unparsed_rows", 0)
+        if unparsed_rows:
+            self.output_display.append(
+                f"Warning: {unparsed_rows} booking(s) had an unreadable 'Length of Booking' and were counted as 0 hours."
+            )
 
-            # --- Displaying results (HTML strings) ---
-            if result_display_data is not None and isinstance(result_display_data, str):
-                title = f"<h3>--- {selected_report_name} Results ---</h3>"
-                self.output_display.setHtml(title + result_display_data)
-            elif result_display_data is None:
-                self.output_display.setHtml(
-                    f"<h3>--- {selected_report_name} Results ---</h3><p>Report generated, but no specific data was returned (None).</p>"
-                )
-            elif not isinstance(result_display_data, str):
-                self.output_display.setHtml(
-                    f"<b><font color='red'>Display Error:</font></b><br>Report '{selected_report_name}' did not return an HTML string. Type: {type(result_display_data).__name__}"
-                )
+    def export_result(self):
+        if self._result is None:
+            return
+        selected_report_name = self._result_name
+        slug = selected_report_name.replace(" ", "_")  # Generate slug from report name
+        sugg_fname = f"{slug}_{dt.date.today().strftime('%Y%m%d')}.csv"
+        filePath, _ = QFileDialog.getSaveFileName(
+            self,
+            f"Export {selected_report_name}",
+            sugg_fname,
+            "CSV (*.csv);;Excel (*.xlsx);;JSON (*.json);;HTML (*.html);;All (*)",
+        )
+        if not filePath:
+            self._append_above_timings(f"{selected_report_name} export cancelled.")
+            return
+        try:
+            rendering.write(self._result, filePath)
+            self._append_above_timings(f"{selected_report_name} saved: {filePath}")
+            self._open_file_externally(filePath)
+        except Exception as e_save:
+            QMessageBox.critical(self, "Error", f"Failed to save/open report: {e_save}")
+            self._append_above_timings(f"Save/Open Error: {e_save}")
+
+    def _on_report_failed(self, job_id: int, stage: str, error: Exception):
+        if not self._is_active_job(job_id):
+            return
+        selected_report_name = self._active_report_name
+        spec = self._active_worker.spec
+        file_paths = self._active_worker.file_paths
+        self._finish_job()
 
-        except (
-            FileNotFoundError
-        ):  # Should be caught by pandas read_excel if path is wrong
-            msg = f"<b><font color='red'>File Error:</font></b><br>Input Excel file not found: {self.file_path}"
+        if stage == "load":
+            self._show_load_error(spec, error)
+        else:
+            self._show_report_error(spec, error)
+        self._finish_timing(
+            selected_report_name,
+            file_paths,
+            error=f"{type(error).__name__}: {error}",
+        )
+
+    def _show_load_error(self, spec: registry.ReportSpec, error: Exception):
+        if isinstance(error, FileNotFoundError):
+            missing_path = error.filename or self.file_path  # Which of several files
+            msg = f"<b><font color='red'>File Error:</font></b><br>Input Excel file not found: {missing_path}"
             QMessageBox.critical(
-                self, "Error", f"Input Excel file not found: {self.file_path}"
+                self, "Error", f"Input Excel file not found: {missing_path}"
             )
             self.output_display.setHtml(msg)
-        # Removed Polars specific NoDataError and ComputeError
-        except pd.errors.EmptyDataError:  # Pandas specific for empty data
-            msg = f"<b><font color='red'>Data Error (Pandas):</font></b><br>No data in Excel file/sheet (Pandas): {self.file_path}."
+        elif isinstance(error, EmptyDataError):
+            # Catch pandas specific error for empty file/sheet
+            msg = f"<b><font color='red'>Data Error:</font></b><br>No data in Excel file/sheet: {self.file_path}. File might be empty."
             QMessageBox.critical(
                 self,
                 "Data Error",
-                f"No data in Excel file/sheet (Pandas): {self.file_path}.",
+                f"No data in Excel file/sheet: {self.file_path}.",
             )
             self.output_display.setHtml(msg)
-        except (KeyError, AttributeError) as ke:  # Common pandas errors
-            col_name = ke.args[0] if ke.args else str(ke)
+        else:  # General pandas load error
+            msg = (
+                f"<b><font color='red'>File Load Error:</font></b><br>Could not load Excel file with pandas: {error}<br>"
+                "Ensure the file is valid and one of its sheets has a header row "
+                f"with {', '.join(spec.required_columns)} near the top."
+            )
+            QMessageBox.critical(
+                self, "Load Error", f"Failed to load Excel file: {error}"
+            )
+            self.output_display.setHtml(msg)
+
+    def _show_report_error(self, spec: registry.ReportSpec, error: Exception):
+        selected_report_name = spec.name
+        if isinstance(error, TypeError):
+            self.output_display.setHtml(
+                f"<b><font color='red'>Execution Error:</font></b><br>Report '{selected_report_name}' encountered a TypeError.<br>Details: {error}"
+            )
+        elif isinstance(error, (KeyError, AttributeError)):  # Common pandas errors
+            col_name = error.args[0] if error.args else str(error)
             msg = (
                 f"<b><font color='red'>Error:</font></b><br>"
                 f"File: <b>{os.path.basename(self.file_path) if self.file_path else 'N/A'}</b>, Report: '<b>{selected_report_name}</b>'<br>"
@@ -428,26 +869,33 @@ class ReportingApp(QWidget):
                 f"Error with '{col_name}' for '{selected_report_name}'.",
             )
             self.output_display.setHtml(msg)
-        except (
-            ValueError
-        ) as ve:  # For ValueErrors raised by report functions or data validation
-            msg = f"<b><font color='red'>Input/Value Error:</font></b><br>{ve}"  # ValueError message is usually descriptive
+        elif isinstance(error, ValueError):
+            # For ValueErrors raised by report functions or data validation
+            msg = f"<b><font color='red'>Input/Value Error:</font></b><br>{error}"
             QMessageBox.critical(
-                self, "Data/Parameter Error", f"Error with data or parameters: {ve}"
+                self, "Data/Parameter Error", f"Error with data or parameters: {error}"
             )
             self.output_display.setHtml(msg)
-        except Exception as e:
+        else:
             msg = (
                 f"<b><font color='red'>An Unexpected Error Occurred:</font></b><br>"
                 f"Report: '{selected_report_name}'<br>"
                 f"File: {os.path.basename(self.file_path) if self.file_path else 'N/A'}<br>"
-                f"Type: {type(e).__name__}<br>Details: {str(e)}"
+                f"Type: {type(error).__name__}<br>Details: {str(error)}"
             )
-            QMessageBox.critical(self, "Unexpected Error", f"Unexpected error: {e}")
+            QMessageBox.critical(self, "Unexpected Error", f"Unexpected error: {error}")
             self.output_display.setHtml(msg)
 
+    def closeEvent(self, event):
+        if self._active_worker is not None:
+            self._active_worker.cancel()
+        ingest.shutdown()
+        super().closeEvent(event)
+
 
 if __name__ == "__main__":
+    # Parallel loads start worker processes; needed when frozen with PyInstaller
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     try:
         app_icon_filename = "icon.png"
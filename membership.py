@@ -0,0 +1,379 @@
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+import profiling
+
+# --- Vectorized Membership Engine ---
+# Counts for every club and payment plan type are computed in one groupby pass
+# over the export and memoized per DataFrame, so the per-club report functions
+# in functions.py are cheap lookups into a shared result.
+#
+# Memoized results assume the DataFrame is not modified after it is loaded
+# (frames from loaders.py are shared and already treated as read-only).
+
+TARGET_PAYMENT_PLANS = ["Fortnightly-Fixed", "Upfront"]
+TOTAL_COLUMN = "Total"
+
+# Results for one parameter value (e.g. counts as of a date) kept per frame and
+# kind: a frame that stays loaded (server, watcher, app) may be asked about any
+# number of dates, so only the most recently used are memoized
+RECENT_RESULTS_PER_FRAME = 8
+
+_frame_memos: dict[int, dict] = {}
+_frame_memos_lock = threading.Lock()
+_memo_lock = threading.Lock()  # Guards the contents of every frame_memo dict
+
+
+def frame_memo(df: pd.DataFrame) -> dict:
+    """
+    Scratch dict of derived results for df, dropped when df is garbage collected.
+    """
+    key = id(df)
+    with _frame_memos_lock:
+        memo = _frame_memos.get(key)
+        if memo is None:
+            memo = {}
+            _frame_memos[key] = memo
+            weakref.finalize(df, _drop_frame_memo, key)
+        return memo
+
+
+def _drop_frame_memo(key: int) -> None:
+    with _frame_memos_lock:
+        _frame_memos.pop(key, None)
+
+
+def memoized(df: pd.DataFrame, key: tuple, compute):
+    """
+    Returns frame_memo(df)[key], calling compute() the first time. Safe to call
+    from several threads: compute() runs outside the lock, so two threads may
+    both compute a missing result, but both get the one that is kept.
+    """
+    memo = frame_memo(df)
+    with _memo_lock:
+        if key in memo:
+            return memo[key]
+    value = compute()
+    with _memo_lock:
+        return memo.setdefault(key, value)
+
+
+def memoized_recent(df: pd.DataFrame, key: tuple, compute):
+    """
+    Like memoized, for results that depend on a parameter (key[1:]): at most
+    RECENT_RESULTS_PER_FRAME of kind key[0] are kept, least recently used dropped.
+    """
+    memo = frame_memo(df)
+    with _memo_lock:
+        recent = memo.setdefault((key[0], "recent"), OrderedDict())
+        if key in recent:
+            recent.move_to_end(key)
+            return recent[key]
+    value = compute()
+    with _memo_lock:
+        value = recent.setdefault(key, value)
+        while len(recent) > RECENT_RESULTS_PER_FRAME:
+            recent.popitem(last=False)
+    return value
+
+
+def parse_dates(series: pd.Series) -> pd.Series:
+    """
+    Parses series to datetime64 the same way for every report: ISO dates and
+    date-times in one vectorized pass, then any other value on its own (e.g.
+    "17/10/2026"). Values that are not dates at all become NaT.
+    """
+    parsed = pd.to_datetime(series, format="ISO8601", errors="coerce")
+    failed = parsed.isna() & series.notna()
+    if failed.any():
+        parsed[failed] = pd.to_datetime(series[failed], format="mixed", errors="coerce")
+    return parsed
+
+
+def parsed_dates(df: pd.DataFrame, column: str) -> pd.Series:
+    """
+    Returns df[column] as datetime64 (unparseable values become NaT). Columns that
+    are already datetime64 are returned as-is; others are parsed once per frame
+    with parse_dates.
+    """
+    series = df[column]
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+
+    def compute() -> pd.Series:
+        with profiling.stage("parse", len(series)):
+            return parse_dates(series)
+
+    return memoized(df, ("parsed_dates", column), compute)
+
+
+def _counts_by_club_and_plan(df: pd.DataFrame, mask: pd.Series) -> pd.DataFrame:
+    """
+    Counts rows where mask is True for every (Club, Payment plan type) pair in one
+    groupby pass. Returns clubs as rows, plan types as columns, plus a Total
+    column over TARGET_PAYMENT_PLANS.
+    """
+    counts = (
+        mask.groupby([df["Club"], df["Payment plan type"]], observed=True)
+        .sum()
+        .unstack(fill_value=0)
+        .astype("int64")
+    )
+    counts.columns.name = None
+    counts.index.name = "Club"
+    present_plans = [plan for plan in TARGET_PAYMENT_PLANS if plan in counts.columns]
+    counts[TOTAL_COLUMN] = counts[present_plans].sum(axis=1)
+    return counts
+
+
+def active_member_counts(df: pd.DataFrame, end_date: str) -> pd.DataFrame:
+    """
+    Members per club and plan type whose "End date" is empty or after end_date.
+    """
+    end_date_dt = pd.to_datetime(end_date, format="%Y-%m-%d")
+
+    def compute() -> pd.DataFrame:
+        end_dates = parsed_dates(df, "End date")
+        with profiling.stage("filter", len(df)):
+            active = end_dates.isna() | (end_dates > end_date_dt)
+        with profiling.stage("aggregate", len(df)):
+            return _counts_by_club_and_plan(df, active)
+
+    return memoized_recent(df, ("active_member_counts", end_date_dt), compute)
+
+
+def month_window(end_date: str) -> tuple[pd.Timestamp, pd.Timestamp]:
+    """First day of end_date's month, and end_date itself."""
+    end_date_dt = pd.to_datetime(end_date, format="%Y-%m-%d")
+    start_date_month = pd.to_datetime(
+        f"{end_date_dt.year}-{end_date_dt.month:02d}-01", format="%Y-%m-%d"
+    )
+    return start_date_month, end_date_dt
+
+
+def new_member_counts(df: pd.DataFrame, end_date: str) -> pd.DataFrame:
+    """
+    Members per club and plan type who joined between the first of end_date's month
+    and end_date, and whose "End date" is empty or after end_date.
+    """
+    start_date_month, end_date_dt = month_window(end_date)
+
+    def compute() -> pd.DataFrame:
+        end_dates = parsed_dates(df, "End date")
+        join_dates = parsed_dates(df, "Join date")
+        with profiling.stage("filter", len(df)):
+            joined = (
+                (end_dates.isna() | (end_dates > end_date_dt))
+                & join_dates.notna()
+                & (join_dates >= start_date_month)
+                & (join_dates <= end_date_dt)
+            )
+        with profiling.stage("aggregate", len(df)):
+            return _counts_by_club_and_plan(df, joined)
+
+    return memoized_recent(df, ("new_member_counts", end_date_dt), compute)
+
+
+def new_member_trend(df: pd.DataFrame, end_date: str, months: int = 12) -> pd.DataFrame:
+    """
+    New members per month, club and plan type for the `months` calendar months up
+    to and including end_date's month, in one pass over the export.
+
+    Each month applies the new_members rule with that month's cutoff (its last
+    day, or end_date for the final month): joined between the first of the month
+    and the cutoff, with "End date" empty or after the cutoff. Returns a
+    DataFrame indexed by month (Period) with (Club, plan) columns, plus a Total
+    column per club over TARGET_PAYMENT_PLANS.
+    """
+    if months < 1:
+        raise ValueError("months must be at least 1")
+    end_date_dt = pd.to_datetime(end_date, format="%Y-%m-%d")
+    last_month = end_date_dt.to_period("M")
+    periods = pd.period_range(end=last_month, periods=months, freq="M", name="Month")
+
+    end_dates = parsed_dates(df, "End date")
+    join_dates = parsed_dates(df, "Join date")
+    with profiling.stage("filter", len(df)):
+        in_window = (
+            join_dates.notna()
+            & (join_dates >= periods[0].start_time)
+            & (join_dates <= end_date_dt)
+        )
+        join_in_window = join_dates[in_window]
+
+        join_month = join_in_window.dt.to_period("M")
+        cutoff = join_month.dt.end_time.dt.normalize().clip(upper=end_date_dt)
+        retained = (join_in_window <= cutoff) & (
+            end_dates[in_window].isna() | (end_dates[in_window] > cutoff)
+        )
+
+    with profiling.stage("aggregate", len(join_in_window)):
+        counts = retained.groupby(
+            [
+                join_month.rename("Month"),
+                df["Club"][in_window],
+                df["Payment plan type"][in_window],
+            ],
+            observed=True,
+        ).sum()
+    return month_counts_table(counts, periods)
+
+
+def month_counts_table(counts: pd.Series, periods: pd.PeriodIndex) -> pd.DataFrame:
+    """
+    Counts indexed by (Month, Club, Payment plan type) laid out as one row per
+    month in periods with (Club, plan) columns, plus a Total column per club over
+    TARGET_PAYMENT_PLANS.
+    """
+    counts = (
+        counts.unstack(["Club", "Payment plan type"], fill_value=0)
+        .reindex(periods, fill_value=0)
+        .astype("int64")
+    )
+    counts.index.name = "Month"
+    if counts.columns.empty:
+        return counts
+    for club in counts.columns.get_level_values(0).unique():
+        present_plans = [
+            (club, plan)
+            for plan in TARGET_PAYMENT_PLANS
+            if (club, plan) in counts.columns
+        ]
+        counts[(club, TOTAL_COLUMN)] = counts[present_plans].sum(axis=1)
+    return counts.sort_index(axis=1)
+
+
+def club_count(counts: pd.DataFrame, club: str, column: str) -> int:
+    """Looks up one club/plan cell of a counts table, 0 when absent or missing."""
+    if club not in counts.index or column not in counts.columns:
+        return 0
+    value = counts.at[club, column]
+    return 0 if pd.isna(value) else int(value)
+
+
+# --- End Date Index ---
+# Rows sorted by the day their "End date" falls on, built once per frame, so
+# "who ends between these days" is two binary searches and a slice.
+
+
+def end_date_index(df: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    """
+    (days, positions): every parseable "End date" in df normalized to midnight
+    (datetime64[ns]) in ascending order, and the row position of each. Rows ending
+    on the same day keep their order in df.
+    """
+
+    def compute() -> tuple[np.ndarray, np.ndarray]:
+        end_dates = parsed_dates(df, "End date")
+        with profiling.stage("index", len(df)):
+            days = end_dates.dt.normalize().to_numpy(dtype="datetime64[ns]")
+            positions = np.flatnonzero(~np.isnat(days))
+            order = np.argsort(days[positions], kind="stable")
+            return days[positions][order], positions[order]
+
+    return memoized(df, ("end_date_index",), compute)
+
+
+def rows_ending_between(
+    df: pd.DataFrame, start_date: pd.Timestamp, end_date: pd.Timestamp
+) -> np.ndarray:
+    """Row positions whose "End date" falls on a day from start_date to end_date."""
+    days, positions = end_date_index(df)
+    low = np.searchsorted(days, np.datetime64(start_date.normalize(), "ns"), "left")
+    high = np.searchsorted(days, np.datetime64(end_date.normalize(), "ns"), "right")
+    return positions[low:high]
+
+
+# --- Active Member Time Series ---
+
+_NO_START = np.iinfo("int64").min
+_NO_END = np.iinfo("int64").max
+
+
+def _to_int64_us(series: pd.Series, fill: int) -> np.ndarray:
+    """datetime64 values as int64 microseconds, with NaT replaced by fill."""
+    values = series.to_numpy(dtype="datetime64[us]").view("int64").copy()
+    values[pd.isna(series).to_numpy()] = fill
+    return values
+
+
+def active_member_series(
+    df: pd.DataFrame, start_date: str, end_date: str, freq: str = "D"
+) -> pd.DataFrame:
+    """
+    Active members per club and plan type for every date in
+    pd.date_range(start_date, end_date, freq=freq).
+
+    A member is active on date d when "End date" is empty or after d (the
+    current_members rule) and, if the export has a "Join date", they joined on
+    or before d. Join and end dates are sorted once per (club, plan) group and
+    each date is answered with two binary searches:
+
+        active(d) = #(join <= d) - #(end <= d)
+
+    which holds because rows whose end is not after their join are dropped.
+    Cost is O(n log n + groups x dates x log n) instead of a full-frame scan per
+    date. Returns a DataFrame indexed by date with (Club, plan) columns, plus a
+    Total column per club over TARGET_PAYMENT_PLANS.
+    """
+    dates = pd.date_range(
+        pd.to_datetime(start_date, format="%Y-%m-%d"),
+        pd.to_datetime(end_date, format="%Y-%m-%d"),
+        freq=freq,
+        name="Date",
+    )
+    date_values = dates.to_numpy(dtype="datetime64[us]").view("int64")
+
+    end_values = _to_int64_us(parsed_dates(df, "End date"), _NO_END)
+    if "Join date" in df.columns:
+        join_values = _to_int64_us(parsed_dates(df, "Join date"), _NO_START)
+    else:
+        join_values = np.full(len(df), _NO_START, dtype="int64")
+
+    with profiling.stage("filter", len(df)):
+        group_codes, groups = pd.MultiIndex.from_arrays(
+            [df["Club"], df["Payment plan type"]]
+        ).factorize()
+        has_group = (
+            df["Club"].notna().to_numpy() & df["Payment plan type"].notna().to_numpy()
+        )
+        keep = has_group & (end_values > join_values)
+        group_codes = group_codes[keep]
+        join_values = join_values[keep]
+        end_values = end_values[keep]
+
+    with profiling.stage("aggregate", len(group_codes)):
+        # One sort per column; rows of each group then form a contiguous slice
+        join_order = np.lexsort((join_values, group_codes))
+        end_order = np.lexsort((end_values, group_codes))
+        sorted_joins = join_values[join_order]
+        sorted_ends = end_values[end_order]
+        bounds = np.searchsorted(group_codes[join_order], np.arange(len(groups) + 1))
+
+        series = {}
+        for code, (club, plan) in enumerate(groups):
+            if pd.isna(club) or pd.isna(plan):
+                continue
+            lo, hi = bounds[code], bounds[code + 1]
+            joined = np.searchsorted(sorted_joins[lo:hi], date_values, side="right")
+            ended = np.searchsorted(sorted_ends[lo:hi], date_values, side="right")
+            series[(club, plan)] = joined - ended
+
+    result = pd.DataFrame(series, index=dates, dtype="int64")
+    if result.columns.empty:
+        return result
+    result.columns = pd.MultiIndex.from_tuples(
+        result.columns, names=["Club", "Payment plan type"]
+    )
+    for club in result.columns.get_level_values(0).unique():
+        present_plans = [
+            (club, plan)
+            for plan in TARGET_PAYMENT_PLANS
+            if (club, plan) in result.columns
+        ]
+        result[(club, TOTAL_COLUMN)] = result[present_plans].sum(axis=1)
+    return result.sort_index(axis=1)
@@ -0,0 +1,225 @@
+import contextlib
+import contextvars
+import datetime as dt
+import json
+import os
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+
+import sidecar
+
+# --- Stage Profiling ---
+# A report run is split into named stages (load, parse, filter, aggregate,
+# render) by wrapping each in `with stage(...)`. Stages are recorded only while
+# a StageProfile is active in the current context (see profiled()), so the
+# report functions cost nothing extra when called from batch runs or scripts.
+#
+# Memory is the process resident set size (RSS) and peak RSS when the stage ends,
+# and how far the stage raised that peak (0 when it stayed under an earlier one).
+
+_active_profile: contextvars.ContextVar["StageProfile | None"] = contextvars.ContextVar(
+    "active_profile", default=None
+)
+_log_lock = threading.Lock()
+
+
+@dataclass
+class StageRecord:
+    name: str
+    depth: int  # 0 for top-level stages, 1 for stages nested inside those, ...
+    seconds: float = 0.0
+    rows: int | None = None
+    rss_mb: float | None = None
+    peak_rss_mb: float | None = None
+    peak_rss_growth_mb: float | None = None
+
+
+@dataclass
+class StageProfile:
+    label: str = ""
+    stages: list[StageRecord] = field(default_factory=list)
+    _depth: int = 0
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(record.seconds for record in self.stages if record.depth == 0)
+
+    @property
+    def peak_rss_mb(self) -> float | None:
+        peaks = [r.peak_rss_mb for r in self.stages if r.peak_rss_mb is not None]
+        return max(peaks) if peaks else None
+
+    def to_dict(self) -> dict:
+        return {
+            "label": self.label,
+            "total_seconds": self.total_seconds,
+            "peak_rss_mb": self.peak_rss_mb,
+            "stages": [asdict(record) for record in self.stages],
+        }
+
+
+def _memory_mb() -> tuple[float | None, float | None]:
+    """(current RSS, peak RSS) of this process in MB; None where unavailable."""
+    if sys.platform == "win32":
+        return _windows_memory_mb()
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            fields = dict(line.split(":", 1) for line in f if ":" in line)
+        return (
+            int(fields["VmRSS"].split()[0]) / 1024,
+            int(fields["VmHWM"].split()[0]) / 1024,
+        )
+    except (OSError, KeyError, ValueError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None, None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return None, peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def _windows_memory_mb() -> tuple[float | None, float | None]:
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [
+            ("cb", wintypes.DWORD),
+            ("PageFaultCount", wintypes.DWORD),
+            ("PeakWorkingSetSize", ctypes.c_size_t),
+            ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t),
+            ("PeakPagefileUsage", ctypes.c_size_t),
+        ]
+
+    counters = PROCESS_MEMORY_COUNTERS()
+    counters.cb = ctypes.sizeof(counters)
+    process = ctypes.windll.kernel32.GetCurrentProcess()
+    if not ctypes.windll.psapi.GetProcessMemoryInfo(
+        process, ctypes.byref(counters), counters.cb
+    ):
+        return None, None
+    mb = 1024 * 1024
+    return counters.WorkingSetSize / mb, counters.PeakWorkingSetSize / mb
+
+
+@contextlib.contextmanager
+def profiled(label: str = ""):
+    """Records every stage run in this context (thread) into the yielded profile."""
+    profile = StageProfile(label)
+    token = _active_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _active_profile.reset(token)
+
+
+@contextlib.contextmanager
+def activate(profile: "StageProfile | None"):
+    """Records stages into an existing profile, e.g. one started on another thread."""
+    token = _active_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _active_profile.reset(token)
+
+
+@contextlib.contextmanager
+def stage(name: str, rows: int | None = None):
+    """
+    Times the enclosed block as stage `name` of the active profile. Yields the
+    StageRecord (None when no profile is active), whose rows can be filled in
+    once known.
+    """
+    profile = _active_profile.get()
+    if profile is None:
+        yield None
+        return
+    record = StageRecord(name, profile._depth, rows=rows)
+    profile.stages.append(record)
+    peak_before = _memory_mb()[1]
+    profile._depth += 1
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record.seconds = time.perf_counter() - start
+        profile._depth -= 1
+        record.rss_mb, record.peak_rss_mb = _memory_mb()
+        if peak_before is not None and record.peak_rss_mb is not None:
+            record.peak_rss_growth_mb = max(0.0, record.peak_rss_mb - peak_before)
+
+
+def log_path() -> str:
+    """JSON-lines profile log next to the sidecar cache. Override with REPORTING_PROFILE_LOG."""
+    override = os.environ.get("REPORTING_PROFILE_LOG")
+    if override:
+        return override
+    return os.path.join(os.path.dirname(sidecar.sidecar_dir()), "profile.jsonl")
+
+
+def write_log(profile: StageProfile, path: str | None = None, **context) -> None:
+    """
+    Appends the profile as one JSON line (with a timestamp and any context,
+    e.g. report and file names) to the profile log.
+    """
+    path = path or log_path()
+    entry = {"time": dt.datetime.now().isoformat(timespec="milliseconds")}
+    entry.update(context)
+    entry.update(profile.to_dict())
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with _log_lock, open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry, default=str) + "\n")
+
+
+def _format_mb(value: float | None) -> str:
+    return "" if value is None else f"{value:,.0f} MB"
+
+
+def timing_footer_html(profile: StageProfile, expanded: bool, href: str) -> str:
+    """
+    Footer summarizing the profile for the output display. The summary line is a
+    link to href, which the display uses to toggle between collapsed and expanded.
+    """
+    arrow = "&#9662;" if expanded else "&#9656;"
+    peak = profile.peak_rss_mb
+    peak_text = f", peak memory {_format_mb(peak)}" if peak is not None else ""
+    lines = [
+        "<hr>",
+        f"<p style='font-size: smaller;'><a href='{href}'>{arrow} Timings: "
+        f"{profile.total_seconds:.2f} s{peak_text}</a></p>",
+    ]
+    if not expanded:
+        return "".join(lines)
+
+    lines.append(
+        "<table style='font-family: Monospace; font-size: smaller; border-collapse: collapse;'>"
+        "<tr><td style='padding: 2px 12px 2px 0;'><b>Stage</b></td>"
+        "<td align='right' style='padding: 2px 12px;'><b>Time</b></td>"
+        "<td align='right' style='padding: 2px 12px;'><b>Rows</b></td>"
+        "<td align='right' style='padding: 2px 12px;'><b>RSS</b></td>"
+        "<td align='right' style='padding: 2px 12px;'><b>Peak RSS</b></td>"
+        "<td align='right' style='padding: 2px 0 2px 12px;'><b>Peak +</b></td></tr>"
+    )
+    for record in profile.stages:
+        indent = "&nbsp;" * (4 * record.depth)
+        rows = "" if record.rows is None else f"{record.rows:,}"
+        lines.append(
+            f"<tr><td style='padding: 2px 12px 2px 0;'>{indent}{record.name}</td>"
+            f"<td align='right' style='padding: 2px 12px;'>{record.seconds * 1000:,.1f} ms</td>"
+            f"<td align='right' style='padding: 2px 12px;'>{rows}</td>"
+            f"<td align='right' style='padding: 2px 12px;'>{_format_mb(record.rss_mb)}</td>"
+            f"<td align='right' style='padding: 2px 12px;'>{_format_mb(record.peak_rss_mb)}</td>"
+            f"<td align='right' style='padding: 2px 0 2px 12px;'>{_format_mb(record.peak_rss_growth_mb)}</td></tr>"
+        )
+    lines.append("</table>")
+    return "".join(lines)
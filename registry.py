@@ -0,0 +1,347 @@
+from dataclasses import dataclass
+
+import pandas as pd
+
+import engines
+import functions
+import ingest
+import loaders
+import profiling
+import rendering
+import streaming
+
+# --- Report Registry ---
+# Every report is declared once here: the columns it reads (and how they are
+# typed), where its header row is, the parameters it takes after the DataFrame,
+# and whether it returns a summary (see rendering.py) or a DataFrame. The GUI,
+# the batch runner and anything else that runs reports go through load()/run()
+# below, so a new report only needs a ReportSpec.
+
+CLUB = "club"
+END_DATE = "end_date"
+DAYS = "days"
+
+HTML = "html"  # Returns a rendering.ReportResult, shown as HTML
+DATAFRAME = "dataframe"  # Returns a DataFrame, shown as a table and saved as a file
+
+
+@dataclass(frozen=True)
+class ReportParameter:
+    name: str  # Key in the params dict: CLUB, END_DATE or DAYS
+    label: str  # Form label in the GUI
+    required: bool = True  # Optional parameters are passed as default when not given
+    default: object = None
+
+
+@dataclass(frozen=True)
+class ReportSpec:
+    name: str
+    function: object
+    required_columns: tuple[str, ...]
+    output: str = HTML
+    parameters: tuple[ReportParameter, ...] = ()
+    category_columns: tuple[str, ...] = loaders.CATEGORY_COLUMNS
+    date_columns: tuple[str, ...] = loaders.DATE_COLUMNS
+    # None: locate the sheet and header row holding required_columns
+    header: loaders.HeaderLocation | None = None
+    # Column sets to look for instead when required_columns share no header row
+    fallback_header_columns: tuple[tuple[str, ...], ...] = ()
+    in_batch: bool = True  # Run by the batch runner for every export it applies to
+
+    @property
+    def profile(self) -> loaders.LoadProfile:
+        """Load profile reading only this report's columns."""
+        return loaders.LoadProfile(
+            columns=self.required_columns,
+            category_columns=self.category_columns,
+            date_columns=self.date_columns,
+        )
+
+    @property
+    def parameter_names(self) -> tuple[str, ...]:
+        return tuple(parameter.name for parameter in self.parameters)
+
+    def parameter(self, name: str) -> ReportParameter | None:
+        for parameter in self.parameters:
+            if parameter.name == name:
+                return parameter
+        return None
+
+    @property
+    def can_stream(self) -> bool:
+        return self.function in streaming.AGGREGATORS
+
+
+REPORTS = [
+    ReportSpec(
+        "Current Members",
+        functions.current_members,
+        tuple(functions.CURRENT_MEMBERS_COLUMNS),
+        parameters=(
+            ReportParameter(CLUB, "Target Club:"),
+            ReportParameter(END_DATE, "End Date:"),
+        ),
+    ),
+    ReportSpec(
+        "New Members",
+        functions.new_members,
+        tuple(functions.NEW_MEMBERS_COLUMNS),
+        parameters=(
+            ReportParameter(CLUB, "Target Club:"),
+            # Uses end_date to determine month/year
+            ReportParameter(END_DATE, "Target Month (select any day in month):"),
+        ),
+    ),
+    ReportSpec(
+        "New Members Trend (12 Months)",
+        functions.new_members_trend,
+        tuple(functions.NEW_MEMBERS_COLUMNS),
+        output=DATAFRAME,
+        # The trend covers every club; it only needs the final month
+        parameters=(ReportParameter(END_DATE, "Last Month (counts up to this day):"),),
+        in_batch=False,  # Batch runs it with --trend-months
+    ),
+    ReportSpec(
+        "Technogym Reporting (Consults/PT)",
+        functions.technogym_reporting,
+        tuple(functions.TECHNOGYM_COLUMNS),
+    ),
+    ReportSpec(
+        "Group Fitness Summary",
+        functions.groupFitness,
+        tuple(functions.GROUP_FITNESS_COLUMNS),
+    ),
+    ReportSpec(
+        "Booking Zones Analysis",
+        functions.booking_zones,
+        tuple(functions.BOOKING_ZONES_COLUMNS),
+        output=DATAFRAME,
+    ),
+    ReportSpec(
+        "Ending Members Report",
+        functions.generate_ending_members_report,
+        tuple(functions.ENDING_MEMBERS_COLUMNS),
+        output=DATAFRAME,
+        parameters=(ReportParameter(END_DATE, "Ending On:", required=False),),
+    ),
+    ReportSpec(
+        "Ending Members Lookahead",
+        functions.ending_members_lookahead,
+        tuple(functions.ENDING_MEMBERS_COLUMNS),
+        output=DATAFRAME,
+        parameters=(
+            ReportParameter(CLUB, "Club (optional):", required=False),
+            ReportParameter(END_DATE, "From Date:"),
+            ReportParameter(
+                DAYS,
+                "Days Ahead:",
+                required=False,
+                default=functions.ENDING_LOOKAHEAD_DAYS,
+            ),
+        ),
+    ),
+]
+
+REPORTS_BY_NAME = {spec.name: spec for spec in REPORTS}
+
+
+def get(name: str) -> ReportSpec:
+    try:
+        return REPORTS_BY_NAME[name]
+    except KeyError:
+        raise ValueError(f"Unknown report: '{name}'") from None
+
+
+def batch_reports() -> list[ReportSpec]:
+    return [spec for spec in REPORTS if spec.in_batch]
+
+
+def missing_columns(spec: ReportSpec, columns) -> list[str]:
+    columns = set(columns)
+    return [col for col in spec.required_columns if col not in columns]
+
+
+def report_args(spec: ReportSpec, params: dict) -> tuple:
+    """
+    The arguments after the DataFrame, in the order the report function takes
+    them. Raises ValueError naming any required parameter missing from params.
+    """
+    args = []
+    missing = []
+    for parameter in spec.parameters:
+        value = params.get(parameter.name)
+        if value in (None, ""):
+            value = parameter.default
+            if value is None and parameter.required:
+                missing.append(parameter.label.rstrip(":"))
+        args.append(value)
+    if missing:
+        raise ValueError(f"{spec.name} requires: {', '.join(missing)}")
+    return tuple(args)
+
+
+def runs_per_club(spec: ReportSpec) -> bool:
+    """True when the report needs a club, so runs once for each club."""
+    parameter = spec.parameter(CLUB)
+    return parameter is not None and parameter.required
+
+
+def header_location(spec: ReportSpec, file_path: str) -> loaders.HeaderLocation:
+    """The spec's declared header, or the one found holding its columns."""
+    if spec.header is not None:
+        return spec.header
+    with profiling.stage("locate header"):
+        return loaders.header_location(
+            file_path, [spec.required_columns, *spec.fallback_header_columns]
+        )
+
+
+def is_cached(
+    spec: ReportSpec, file_path: str, location: loaders.HeaderLocation | None = None
+) -> bool:
+    location = location or header_location(spec, file_path)
+    return loaders.is_cached(file_path, location.skiprows, spec.profile, location.sheet)
+
+
+def load(
+    spec: ReportSpec,
+    file_paths: list[str],
+    parallel: bool = True,
+    on_file_loaded=None,
+    location: loaders.HeaderLocation | None = None,
+) -> pd.DataFrame:
+    """
+    Loads the export(s) for spec, reading only its columns from the sheet and
+    header row that hold them (location, when already known for a single file).
+    Several files are combined (see ingest.py).
+    """
+    if len(file_paths) > 1:
+        if spec.header is not None:
+            return ingest.load_exports(
+                file_paths,
+                spec.header.skiprows,
+                spec.profile,
+                parallel=parallel,
+                on_file_loaded=on_file_loaded,
+            )
+        return ingest.load_exports(
+            file_paths,
+            profile=spec.profile,
+            parallel=parallel,
+            on_file_loaded=on_file_loaded,
+            header_columns=spec.required_columns,
+        )
+    location = location or header_location(spec, file_paths[0])
+    return loaders.load_export(
+        file_paths[0], location.skiprows, spec.profile, sheet=location.sheet
+    )
+
+
+def run(
+    spec: ReportSpec,
+    df: pd.DataFrame,
+    params: dict | None = None,
+    engine: str | None = None,
+):
+    """
+    Runs the report on a loaded frame; returns its ReportResult or DataFrame.
+    engine picks pandas or Polars (see engines.py; default: engines.default_engine()).
+    """
+    return engines.run(spec.function, df, *report_args(spec, params or {}), engine=engine)
+
+
+def aggregator(spec: ReportSpec, params: dict | None = None):
+    """A streaming aggregator for spec (see streaming.py), built with its params."""
+    return streaming.AGGREGATORS[spec.function](*report_args(spec, params or {}))
+
+
+def stream(
+    spec: ReportSpec,
+    file_path: str,
+    params: dict | None = None,
+    chunk_rows: int = streaming.DEFAULT_CHUNK_ROWS,
+    on_chunk=None,
+):
+    """Streams one report over file_path and returns the report's usual output."""
+    location = header_location(spec, file_path)
+    report = aggregator(spec, params)
+    streaming.stream_reports(
+        file_path, [report], location.skiprows, chunk_rows, on_chunk, location.sheet
+    )
+    return report.result()
+
+
+# --- Report Packs ---
+# A pack runs several reports (the per-club ones for every club) over one load
+# of an export: the union of their columns is read and typed once, dates are
+# parsed once per frame (see membership.parsed_dates), and every report reads
+# the same frame without copying it. The results are sections of one result.
+
+PACK_NAME = "Report Pack"
+DEFAULT_PACK = ("Current Members", "New Members", "Ending Members Report")
+
+
+def _union(column_lists) -> tuple[str, ...]:
+    return tuple(dict.fromkeys(col for columns in column_lists for col in columns))
+
+
+def _pack_section(spec: ReportSpec, df: pd.DataFrame, params: dict, clubs):
+    missing = missing_columns(spec, df.columns)
+    if missing:
+        return rendering.ReportResult(
+            note=f"Skipped: the export has no {', '.join(missing)} column."
+        )
+    try:
+        if runs_per_club(spec):
+            return rendering.ReportResult(
+                sections=tuple(
+                    (club, rendering.as_result(run(spec, df, {**params, CLUB: club})))
+                    for club in clubs
+                )
+            )
+        return rendering.as_result(run(spec, df, params))
+    except Exception as e:
+        return rendering.ReportResult(note=f"Error: {type(e).__name__}: {e}")
+
+
+def run_pack(
+    specs: list[ReportSpec], df: pd.DataFrame, params: dict, clubs: list[str]
+) -> rendering.ReportResult:
+    """
+    Runs every report in specs over df, one section each. Reports taking a club
+    run once per club in clubs; reports missing columns or failing are noted.
+    """
+    sections = []
+    for spec in specs:
+        with profiling.stage(spec.name, len(df)):
+            sections.append((spec.name, _pack_section(spec, df, params, clubs)))
+    return rendering.ReportResult(sections=tuple(sections))
+
+
+def pack(specs: list[ReportSpec], clubs: list[str]) -> ReportSpec:
+    """
+    A ReportSpec running specs as one pack: it loads their combined columns
+    once and takes the parameters they share other than the club.
+    """
+    specs = list(specs)
+    parameters = {}
+    for spec in specs:
+        for parameter in spec.parameters:
+            if parameter.name != CLUB:
+                parameters.setdefault(parameter.name, parameter)
+    parameter_names = tuple(parameters)
+
+    def run_selected(df: pd.DataFrame, *args) -> rendering.ReportResult:
+        return run_pack(specs, df, dict(zip(parameter_names, args)), clubs)
+
+    run_selected.__name__ = "report_pack"
+    return ReportSpec(
+        PACK_NAME,
+        run_selected,
+        _union(spec.required_columns for spec in specs),
+        parameters=tuple(parameters.values()),
+        category_columns=_union(spec.category_columns for spec in specs),
+        date_columns=_union(spec.date_columns for spec in specs),
+        fallback_header_columns=tuple(spec.required_columns for spec in specs),
+        in_batch=False,
+    )
@@ -0,0 +1,284 @@
+import datetime as dt
+import functools
+import html
+import json
+import math
+import os
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+import profiling
+
+# --- Report Rendering ---
+# Report functions return data, not markup: a ReportResult (labelled counts
+# and/or a table, or sections of other results for packs) or a DataFrame.
+# Everything that shows or saves a report renders it here, to HTML, CSV, XLSX
+# or JSON, so the look of every report is defined once below.
+#
+# The HTML templates are plain format strings built once; table row templates
+# are built per column layout and cached, so a table is one join over its rows.
+
+
+@dataclass
+class ReportResult:
+    # (label, value) rows of a summary, e.g. ("TOTAL MEMBERS", 196)
+    metrics: tuple[tuple[str, object], ...] = ()
+    table: pd.DataFrame | None = None
+    note: str = ""  # Shown under the summary (or alone when there is none)
+    # (title, result) parts of a combined result, e.g. a report pack
+    sections: tuple[tuple[str, "ReportResult"], ...] = ()
+
+    def metric(self, label: str):
+        for metric_label, value in self.metrics:
+            if metric_label == label:
+                return value
+        raise KeyError(label)
+
+
+def as_result(output) -> ReportResult:
+    """A report's output as a ReportResult (DataFrame reports become its table)."""
+    if isinstance(output, ReportResult):
+        return output
+    if isinstance(output, pd.DataFrame):
+        return ReportResult(table=output)
+    raise TypeError(f"Cannot render a {type(output).__name__} report output")
+
+
+def format_value(value) -> str:
+    """Display text for one value: blanks for missing, dates without midnight times."""
+    if value is None or value is pd.NaT or value is pd.NA:
+        return ""
+    if isinstance(value, float):
+        if math.isnan(value):
+            return ""
+        return str(int(value)) if value.is_integer() else f"{value:.2f}"
+    if isinstance(value, (pd.Timestamp, dt.datetime)):
+        if (value.hour, value.minute, value.second) == (0, 0, 0):
+            return value.strftime("%Y-%m-%d")
+        return value.strftime("%Y-%m-%d %H:%M")
+    if isinstance(value, np.generic):
+        return format_value(value.item())
+    return str(value)
+
+
+# --- HTML ---
+
+_SUMMARY_TABLE = """
+        <table width='95%' style='font-family: Monospace; border-collapse: collapse; margin-top: 10px;'>{rows}
+        </table>
+        """
+_SUMMARY_ROW = """
+            <tr>
+                <td style='padding: 5px 10px 5px 0;'><b>{label}:</b></td>
+                <td align='right' style='padding: 5px 0;'>{value}</td>
+            </tr>"""
+_SUMMARY_NOTE = """
+            <tr>
+                <td colspan='2' style='padding-top: 8px; font-size: smaller;'><i>({note})</i></td>
+            </tr>"""
+_NOTE = "<p><i>{note}</i></p>"
+_SECTION_TITLES = ("<h2>{title}</h2>", "<h3>{title}</h3>", "<h4>{title}</h4>")
+
+_TABLE = (
+    "<table width='95%' style='font-family: Monospace; border-collapse: collapse; margin-top: 10px;'>"
+    "<tr>{header}</tr>"
+    "<tr><td colspan='{span}' style='line-height: 0.5em;'><hr></td></tr>"
+    "{rows}</table>"
+)
+_CELL = {
+    False: "<td style='padding: 5px 10px 5px 0;'>{}</td>",
+    True: "<td align='right' style='padding: 5px 0 5px 20px;'>{}</td>",
+}
+
+
+@functools.lru_cache(maxsize=64)
+def _table_templates(
+    columns: tuple[str, ...], right_aligned: tuple[bool, ...]
+) -> tuple[str, str]:
+    """(header cells, row format string) for a table layout."""
+    header = "".join(
+        _CELL[right].format(f"<b>{html.escape(str(column))}</b>")
+        for column, right in zip(columns, right_aligned)
+    )
+    row = "<tr>" + "".join(_CELL[right] for right in right_aligned) + "</tr>"
+    return header, row
+
+
+def _escaped_column(series: pd.Series) -> list[str]:
+    return [html.escape(format_value(value)) for value in series.tolist()]
+
+
+def table_html(table: pd.DataFrame) -> str:
+    """An HTML table of every row of table (numbers right-aligned)."""
+    columns = tuple(str(column) for column in table.columns)
+    right_aligned = tuple(
+        pd.api.types.is_numeric_dtype(table[column]) for column in table.columns
+    )
+    header, row = _table_templates(columns, right_aligned)
+    cells = zip(*(_escaped_column(table[column]) for column in table.columns))
+    return _TABLE.format(
+        header=header,
+        span=len(columns),
+        rows="".join(row.format(*values) for values in cells),
+    )
+
+
+def _html(result: ReportResult, depth: int) -> str:
+    parts = []
+    note = html.escape(result.note)
+    if result.metrics:
+        rows = "".join(
+            _SUMMARY_ROW.format(label=html.escape(label), value=format_value(value))
+            for label, value in result.metrics
+        )
+        if note:
+            rows += _SUMMARY_NOTE.format(note=note)
+        parts.append(_SUMMARY_TABLE.format(rows=rows))
+    elif note:
+        parts.append(_NOTE.format(note=note))
+    if result.table is not None:
+        parts.append(
+            table_html(result.table)
+            if len(result.table)
+            else _NOTE.format(note="No rows.")
+        )
+    title_format = _SECTION_TITLES[min(depth, len(_SECTION_TITLES) - 1)]
+    for title, section in result.sections:
+        parts.append(title_format.format(title=html.escape(title)))
+        parts.append(_html(section, depth + 1))
+    return "".join(parts)
+
+
+def to_html(output) -> str:
+    """The report as an HTML fragment, as shown in the GUI and batch summaries."""
+    with profiling.stage("render"):
+        return _html(as_result(output), 0)
+
+
+# --- CSV, XLSX and JSON ---
+
+
+def _leaves(result: ReportResult, path: tuple[str, ...] = ()):
+    """(section titles, frame) for every part of result holding data."""
+    if result.metrics:
+        labels, values = zip(*result.metrics)
+        yield path, pd.DataFrame({"Metric": labels, "Value": values})
+    if result.table is not None:
+        yield path, result.table
+    for title, section in result.sections:
+        yield from _leaves(section, path + (title,))
+
+
+def to_frame(output) -> pd.DataFrame:
+    """
+    The report as one table: its table, or its summary as Metric/Value rows.
+    Sections are stacked with a "Section" column naming where each row came from.
+    """
+    result = as_result(output)
+    if not result.sections:
+        leaves = list(_leaves(result))
+        if len(leaves) == 1:
+            return leaves[0][1]
+    frames = [
+        frame.assign(Section=" / ".join(path))[["Section", *frame.columns]]
+        for path, frame in _leaves(result)
+    ]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def to_csv(output, path=None):
+    """Writes the report (see to_frame) as CSV to path, or returns the CSV text."""
+    with profiling.stage("render"):
+        return to_frame(output).to_csv(path, index=False)
+
+
+def _sheet_name(title: str, used: set[str]) -> str:
+    # Excel sheet names are at most 31 characters, unique, and without []:*?/\
+    name = "".join(" " if ch in "[]:*?/\\" else ch for ch in title)[:31] or "Report"
+    base, n = name, 2
+    while name in used:
+        name = f"{base[:28]} {n}"
+        n += 1
+    used.add(name)
+    return name
+
+
+def to_xlsx(output, path) -> None:
+    """Writes the report as an Excel workbook, one sheet per top-level section."""
+    result = as_result(output)
+    sheets = result.sections or (("Report", result),)
+    with profiling.stage("render"), pd.ExcelWriter(path) as writer:
+        used = set()
+        for title, section in sheets:
+            to_frame(section).to_excel(
+                writer, sheet_name=_sheet_name(title, used), index=False
+            )
+
+
+def _json_value(value):
+    text = format_value(value)
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, (float, np.floating)) and text:
+        return float(value)
+    return text or None
+
+
+def _json(result: ReportResult) -> dict:
+    data = {}
+    if result.metrics:
+        data["metrics"] = {label: _json_value(v) for label, v in result.metrics}
+    if result.note:
+        data["note"] = result.note
+    if result.table is not None:
+        columns = [str(column) for column in result.table.columns]
+        data["table"] = [
+            dict(zip(columns, map(_json_value, row)))
+            for row in result.table.itertuples(index=False, name=None)
+        ]
+    if result.sections:
+        data["sections"] = {title: _json(section) for title, section in result.sections}
+    return data
+
+
+def to_json(output, path=None):
+    """Writes the report as JSON to path, or returns the JSON text."""
+    with profiling.stage("render"):
+        text = json.dumps(_json(as_result(output)), indent=2)
+    if path is None:
+        return text
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text + "\n")
+
+
+def _write_html(output, path) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(
+            "<html><head><meta charset='utf-8'></head><body>"
+            f"{to_html(output)}</body></html>\n"
+        )
+
+
+# Format name -> (writer(output, path), file extension)
+FORMATS = {
+    "csv": (to_csv, ".csv"),
+    "xlsx": (to_xlsx, ".xlsx"),
+    "json": (to_json, ".json"),
+    "html": (_write_html, ".html"),
+}
+
+
+def write(output, path: str, fmt: str | None = None) -> None:
+    """Saves the report to path as fmt (default: from the file extension, else CSV)."""
+    if fmt is None:
+        extension = os.path.splitext(path)[1].lower()
+        fmt = next(
+            (name for name, (_, ext) in FORMATS.items() if ext == extension), "csv"
+        )
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown report format: '{fmt}'")
+    FORMATS[fmt][0](output, path)
@@ -0,0 +1,493 @@
+"""
+Local HTTP reporting service: staff upload an export once and run any report on
+it from a browser or script, sharing one parsed copy.
+
+    python -m server [--host 127.0.0.1] [--port 8765] [--upload-dir DIR]
+                     [--report-threads N] [--result-cache N]
+
+Endpoints (JSON unless noted):
+
+    GET  /reports                     the reports and the parameters they take
+    POST /exports?name=FILE.xlsx      upload an export (the request body is the
+                                      file); returns its id, parsed in the background
+    GET  /exports                     uploaded exports
+    GET  /reports/<report name>?export=ID[&club=..][&end_date=YYYY-MM-DD][&days=N]
+         [&format=html|json|csv]      run a report (default: html)
+
+The service is a single asyncio process built on asyncio streams (HTTP/1.1 with
+keep-alive, no extra dependencies). Parsing an upload, the CPU-heavy part, runs
+in the shared worker process pool (see ingest.py); the parsed frame is kept in
+the in-memory load cache (see loaders.py) and re-read from its sidecar if it has
+been evicted. Reports run on a small thread pool over that shared frame, so the
+dates parsed for one report are reused by the next (see membership.py), and
+every rendered result is kept in an LRU cache: a repeated query is answered
+without running the report again. Concurrent identical requests share one run.
+Uploads are keyed on their contents, so the same export uploaded twice is
+parsed once. Does not import Qt.
+
+Reports run on threads rather than in the worker processes on purpose: a report
+reads the shared frame and the results memoized on it, and sending the frame to
+another process for every report would cost more than most reports take once
+the frame is loaded. The catch is that report threads share one interpreter, so
+a long report slows the others down while it holds the GIL (numpy and pandas
+release it in parts of their sorting and grouping). Cached results are answered
+on the event loop and uploads are parsed in the worker processes, so neither
+waits for a running report.
+"""
+
+import argparse
+import asyncio
+import datetime as dt
+import hashlib
+import json
+import os
+import sys
+import time
+import urllib.parse
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from http import HTTPStatus
+
+import pandas as pd
+
+import batch
+import ingest
+import loaders
+import registry
+import rendering
+import sidecar
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_REPORT_THREADS = 4
+DEFAULT_RESULT_CACHE_ENTRIES = 256
+MAX_UPLOAD_BYTES = 512 * 1024 * 1024
+
+# format query value -> (Content-Type, renderer(result) -> str)
+RESPONSE_FORMATS = {
+    "html": (
+        "text/html; charset=utf-8",
+        lambda output: "<html><head><meta charset='utf-8'></head><body>"
+        f"{rendering.to_html(output)}</body></html>\n",
+    ),
+    "json": ("application/json", rendering.to_json),
+    "csv": ("text/csv; charset=utf-8", rendering.to_csv),
+}
+
+
+def upload_dir() -> str:
+    """Directory uploaded exports are saved in. Override with REPORTING_UPLOAD_DIR."""
+    override = os.environ.get("REPORTING_UPLOAD_DIR")
+    if override:
+        return override
+    return os.path.join(os.path.dirname(sidecar.sidecar_dir()), "uploads")
+
+
+class HTTPError(Exception):
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass
+class Export:
+    export_id: str
+    name: str
+    path: str
+    uploaded: str
+    location: loaders.HeaderLocation | None = None  # Known once parsed
+    rows: int | None = None
+    error: str | None = None
+
+    @property
+    def cache_key(self) -> tuple:
+        return loaders.file_cache_key(
+            self.path, self.location.skiprows, loaders.FULL_PROFILE, self.location.sheet
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.export_id,
+            "name": self.name,
+            "uploaded": self.uploaded,
+            "rows": self.rows,
+            "error": self.error,
+        }
+
+
+def _ignore_result(future: asyncio.Future) -> None:
+    # Errors reach whoever awaits the future; this only marks them as seen for
+    # background work nobody awaits (e.g. the parse started by an upload)
+    if not future.cancelled():
+        future.exception()
+
+
+def _render(spec: registry.ReportSpec, df: pd.DataFrame, params: dict, fmt: str):
+    """Runs on a report thread: the report's output rendered as fmt, as bytes."""
+    return RESPONSE_FORMATS[fmt][1](registry.run(spec, df, params)).encode("utf-8")
+
+
+class ReportService:
+    """The uploaded exports and cached results behind the HTTP endpoints."""
+
+    def __init__(
+        self,
+        directory: str | None = None,
+        report_threads: int = DEFAULT_REPORT_THREADS,
+        result_cache_entries: int = DEFAULT_RESULT_CACHE_ENTRIES,
+    ):
+        self.directory = directory or upload_dir()
+        self.exports: dict[str, Export] = {}
+        self._loading: dict[str, asyncio.Future] = {}
+        self._threads = ThreadPoolExecutor(
+            max_workers=report_threads, thread_name_prefix="report"
+        )
+        self._results: OrderedDict[tuple, bytes] = OrderedDict()
+        self._result_cache_entries = result_cache_entries
+        self._running: dict[tuple, asyncio.Future] = {}
+
+    def _in_thread(self, function, *args):
+        return asyncio.get_running_loop().run_in_executor(self._threads, function, *args)
+
+    # --- Exports ---
+
+    async def upload(self, name: str, body: bytes) -> Export:
+        name = os.path.basename(name)
+        if os.path.splitext(name)[1].lower() not in (".xlsx", ".xlsm", ".xls", ".csv"):
+            raise HTTPError(
+                HTTPStatus.BAD_REQUEST, "name must be an .xlsx, .xlsm, .xls or .csv file"
+            )
+        digest = await self._in_thread(lambda: hashlib.sha256(body).hexdigest())
+        export_id = digest[:16]
+        export = self.exports.get(export_id)
+        if export is not None and export.error is None:
+            return export  # Same contents as an earlier upload
+        path = os.path.join(self.directory, export_id, name)
+
+        def save() -> None:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(body)
+
+        await self._in_thread(save)
+        export = Export(export_id, name, path, dt.datetime.now().isoformat(timespec="seconds"))
+        self.exports[export_id] = export
+        # Parse now, so the first report on it is already fast
+        asyncio.ensure_future(self.frame(export)).add_done_callback(_ignore_result)
+        return export
+
+    async def frame(self, export: Export) -> pd.DataFrame:
+        """The parsed export: from the load cache, else parsed in a worker process."""
+        if export.location is not None:
+            df = loaders.workbook_cache.get(export.cache_key)
+            if df is not None:
+                return df
+        loading = self._loading.get(export.export_id)
+        if loading is None:
+            loading = asyncio.ensure_future(self._parse(export))
+            self._loading[export.export_id] = loading
+            loading.add_done_callback(
+                lambda _: self._loading.pop(export.export_id, None)
+            )
+            loading.add_done_callback(_ignore_result)
+        return await asyncio.shield(loading)
+
+    async def _parse(self, export: Export) -> pd.DataFrame:
+        try:
+            if export.location is None:
+                export.location = await self._in_thread(
+                    batch.header_location, export.path
+                )
+            location = export.location
+            payload = await asyncio.wrap_future(
+                ingest.submit_load(export.path, location.skiprows, sheet=location.sheet)
+            )
+            df = await self._in_thread(ingest.decode, payload)
+        except Exception as e:
+            export.error = f"{type(e).__name__}: {e}"
+            raise
+        loaders.workbook_cache.put(export.cache_key, df)
+        export.rows, export.error = len(df), None
+        return df
+
+    def get_export(self, export_id: str | None) -> Export:
+        if not export_id:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "export=ID is required")
+        export = self.exports.get(export_id)
+        if export is None:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"Unknown export: '{export_id}'")
+        return export
+
+    # --- Reports ---
+
+    async def report(self, name: str, query: dict) -> tuple[bytes, bool]:
+        """(rendered report, whether it came from the result cache)."""
+        try:
+            spec = registry.get(name)
+        except ValueError as e:
+            raise HTTPError(HTTPStatus.NOT_FOUND, str(e)) from None
+        fmt = query.get("format", "html")
+        if fmt not in RESPONSE_FORMATS:
+            raise HTTPError(
+                HTTPStatus.BAD_REQUEST,
+                f"format must be one of {', '.join(RESPONSE_FORMATS)}",
+            )
+        export = self.get_export(query.get("export"))
+        params = {
+            parameter: query[parameter]
+            for parameter in (registry.CLUB, registry.END_DATE, registry.DAYS)
+            if query.get(parameter)
+        }
+        if params.get(registry.DAYS) is not None:
+            try:
+                params[registry.DAYS] = int(params[registry.DAYS])
+            except ValueError:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "days must be a number") from None
+        # Some reports count from today, so results are only reused within a day
+        key = (
+            export.export_id,
+            spec.name,
+            tuple(sorted(params.items())),
+            fmt,
+            dt.date.today(),
+        )
+        body = self._results.get(key)
+        if body is not None:
+            self._results.move_to_end(key)
+            return body, True
+        running = self._running.get(key)
+        if running is None:
+            running = asyncio.ensure_future(self._run(key, spec, export, params, fmt))
+            self._running[key] = running
+            running.add_done_callback(lambda _: self._running.pop(key, None))
+            running.add_done_callback(_ignore_result)
+        return await asyncio.shield(running), False
+
+    async def _run(self, key, spec, export: Export, params: dict, fmt: str) -> bytes:
+        try:
+            df = await self.frame(export)
+        except Exception:
+            raise HTTPError(
+                HTTPStatus.BAD_REQUEST, f"Could not read the export: {export.error}"
+            ) from None
+        missing = registry.missing_columns(spec, df.columns)
+        if missing:
+            raise HTTPError(
+                HTTPStatus.BAD_REQUEST,
+                f"{spec.name} needs columns the export does not have: "
+                f"{', '.join(missing)}",
+            )
+        try:
+            body = await self._in_thread(_render, spec, df, params, fmt)
+        except ValueError as e:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, str(e)) from None
+        self._results[key] = body
+        while len(self._results) > self._result_cache_entries:
+            self._results.popitem(last=False)
+        return body
+
+    def close(self) -> None:
+        self._threads.shutdown(wait=False, cancel_futures=True)
+
+
+def _report_list() -> list[dict]:
+    return [
+        {
+            "name": spec.name,
+            "output": spec.output,
+            "columns": list(spec.required_columns),
+            "parameters": [
+                {
+                    "name": parameter.name,
+                    "label": parameter.label.rstrip(":"),
+                    "required": parameter.required,
+                    "default": parameter.default,
+                }
+                for parameter in spec.parameters
+            ],
+        }
+        for spec in registry.REPORTS
+    ]
+
+
+def _json_body(data) -> tuple[str, bytes]:
+    return "application/json", json.dumps(data, indent=2).encode("utf-8")
+
+
+class ReportServer:
+    """Serves a ReportService over HTTP/1.1 with asyncio streams."""
+
+    def __init__(self, service: ReportService, log=print):
+        self.service = service
+        self.log = log
+
+    async def dispatch(
+        self, method: str, target: str, body: bytes
+    ) -> tuple[HTTPStatus, str, bytes, dict]:
+        """(status, content type, body, extra headers) for one request."""
+        url = urllib.parse.urlsplit(target)
+        path = urllib.parse.unquote(url.path).rstrip("/") or "/"
+        query = dict(urllib.parse.parse_qsl(url.query))
+        if path == "/reports" and method == "GET":
+            return HTTPStatus.OK, *_json_body(_report_list()), {}
+        if path == "/exports" and method == "GET":
+            exports = [export.to_dict() for export in self.service.exports.values()]
+            return HTTPStatus.OK, *_json_body(exports), {}
+        if path == "/exports" and method == "POST":
+            if not body:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "The request body must be the export")
+            export = await self.service.upload(query.get("name", ""), body)
+            return HTTPStatus.CREATED, *_json_body(export.to_dict()), {}
+        if path.startswith("/reports/") and method == "GET":
+            fmt = query.get("format", "html")
+            report, cached = await self.service.report(path[len("/reports/") :], query)
+            content_type = RESPONSE_FORMATS[fmt][0]
+            return HTTPStatus.OK, content_type, report, {"X-Cache": "hit" if cached else "miss"}
+        if path in ("/reports", "/exports") or path.startswith("/reports/"):
+            raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, f"{method} is not supported here")
+        raise HTTPError(HTTPStatus.NOT_FOUND, f"No such endpoint: {path}")
+
+    async def _respond(self, method: str, target: str, body: bytes):
+        try:
+            return await self.dispatch(method, target, body)
+        except HTTPError as e:
+            return e.status, *_json_body({"error": str(e)}), {}
+        except Exception as e:
+            return (
+                HTTPStatus.INTERNAL_SERVER_ERROR,
+                *_json_body({"error": f"{type(e).__name__}: {e}"}),
+                {},
+            )
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serves the requests of one connection until it is closed."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                start = time.perf_counter()
+                method, target, version = request_line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if not line.strip():
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = version == "HTTP/1.1" and (
+                    headers.get("connection", "").lower() != "close"
+                )
+                length = int(headers.get("content-length", 0))
+                if "transfer-encoding" in headers:
+                    status, content_type, payload, extra = (
+                        HTTPStatus.LENGTH_REQUIRED,
+                        *_json_body({"error": "Send uploads with a Content-Length"}),
+                        {},
+                    )
+                    keep_alive = False
+                elif length > MAX_UPLOAD_BYTES:
+                    status, content_type, payload, extra = (
+                        HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                        *_json_body({"error": "The export is too large"}),
+                        {},
+                    )
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    status, content_type, payload, extra = await self._respond(
+                        method.upper(), target, body
+                    )
+
+                head = [
+                    f"HTTP/1.1 {status.value} {status.phrase}",
+                    f"Content-Type: {content_type}",
+                    f"Content-Length: {len(payload)}",
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}",
+                    *(f"{name}: {value}" for name, value in extra.items()),
+                ]
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1"))
+                writer.write(payload)
+                await writer.drain()
+                self.log(
+                    f"{method} {target} {status.value} "
+                    f"{(time.perf_counter() - start) * 1000:.1f} ms"
+                    + (f" ({extra['X-Cache']})" if "X-Cache" in extra else "")
+                )
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass  # Client went away or sent something that is not HTTP
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        server = await asyncio.start_server(self.handle, host, port)
+        addresses = ", ".join(
+            f"http://{sock.getsockname()[0]}:{sock.getsockname()[1]}"
+            for sock in server.sockets
+        )
+        self.log(f"Serving reports on {addresses} (Ctrl+C to stop)")
+        async with server:
+            await server.serve_forever()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m server",
+        description="Serve the DeakinACTIVE reports over HTTP on this computer.",
+    )
+    parser.add_argument(
+        "--host",
+        default=DEFAULT_HOST,
+        help=f"Address to listen on (default: {DEFAULT_HOST}, this computer only)",
+    )
+    parser.add_argument(
+        "--port", type=int, default=DEFAULT_PORT, help=f"Port (default: {DEFAULT_PORT})"
+    )
+    parser.add_argument(
+        "--upload-dir",
+        help="Directory to keep uploaded exports in (default: next to the sidecar cache)",
+    )
+    parser.add_argument(
+        "--report-threads",
+        type=int,
+        default=DEFAULT_REPORT_THREADS,
+        help=f"Reports run at once (default: {DEFAULT_REPORT_THREADS})",
+    )
+    parser.add_argument(
+        "--result-cache",
+        type=int,
+        default=DEFAULT_RESULT_CACHE_ENTRIES,
+        help="Rendered results kept for repeat queries "
+        f"(default: {DEFAULT_RESULT_CACHE_ENTRIES})",
+    )
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.report_threads < 1 or args.result_cache < 0:
+        print(
+            "Error: --report-threads must be at least 1 and --result-cache not negative",
+            file=sys.stderr,
+        )
+        return 2
+    service = ReportService(args.upload_dir, args.report_threads, args.result_cache)
+    try:
+        asyncio.run(ReportServer(service).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        print(f"Error: could not listen on {args.host}:{args.port}: {e}", file=sys.stderr)
+        return 1
+    finally:
+        service.close()
+        ingest.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,260 @@
+import hashlib
+import logging
+import os
+import sys
+import tempfile
+import threading
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # pyarrow is optional; without it every load parses the Excel file
+    pa = None
+    feather = None
+
+# --- On-disk Columnar Sidecars ---
+# The first load of an export writes a typed Feather (Arrow IPC) copy of the parsed
+# DataFrame, keyed on the SHA-256 of the file contents. Later loads of the same
+# content, in any session, memory-map the sidecar instead of parsing the XML again.
+# The cache is capped in size; the least recently used sidecars are deleted first.
+
+SIDECAR_FORMAT_VERSION = 1
+HASH_CHUNK_BYTES = 1 << 20
+# Every re-export adds a sidecar, so after each write the least recently used ones
+# are deleted down to this total. Override with REPORTING_SIDECAR_MAX_MB.
+DEFAULT_MAX_CACHE_MB = 2048
+
+logger = logging.getLogger(__name__)
+
+_hash_memo: dict[tuple, str] = {}
+_hash_memo_lock = threading.Lock()
+
+
+def sidecars_available() -> bool:
+    return feather is not None
+
+
+def sidecar_dir() -> str:
+    """
+    Directory holding the sidecar files. Override with REPORTING_SIDECAR_DIR.
+    """
+    override = os.environ.get("REPORTING_SIDECAR_DIR")
+    if override:
+        return override
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+        return os.path.join(base, "DeakinACTIVE Reporting", "sidecars")
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(base, "deakinactive-reporting", "sidecars")
+
+
+def max_cache_bytes() -> int:
+    override = os.environ.get("REPORTING_SIDECAR_MAX_MB")
+    return int(float(override or DEFAULT_MAX_CACHE_MB) * 1024 * 1024)
+
+
+def content_hash(file_path: str) -> str:
+    """
+    SHA-256 of the file contents. Memoized per (path, size, mtime) so a file is
+    only hashed once per session.
+    """
+    abs_path = os.path.abspath(file_path)
+    stat = os.stat(abs_path)
+    memo_key = (abs_path, stat.st_size, stat.st_mtime_ns)
+    with _hash_memo_lock:
+        digest = _hash_memo.get(memo_key)
+    if digest is not None:
+        return digest
+
+    hasher = hashlib.sha256()
+    with open(abs_path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+            hasher.update(block)
+    digest = hasher.hexdigest()
+    with _hash_memo_lock:
+        _hash_memo[memo_key] = digest
+    return digest
+
+
+def sidecar_path(digest: str, skiprows: int | None = None, sheet: int = 0) -> str:
+    header_mode = f"h{skiprows or 0}" + (f"-s{sheet}" if sheet else "")
+    return os.path.join(
+        sidecar_dir(), f"{digest}-{header_mode}-v{SIDECAR_FORMAT_VERSION}.feather"
+    )
+
+
+def _is_date_column(column_name) -> bool:
+    return "date" in str(column_name).lower()
+
+
+def parse_clean_dates(series: pd.Series) -> pd.Series | None:
+    """
+    Parses series to datetime64 if every non-empty value is an ISO date or a
+    date cell; returns None (leave the column alone) if any value is not.
+    """
+    parsed = pd.to_datetime(series, errors="coerce", format="ISO8601")
+    if parsed.notna().sum() == series.notna().sum():
+        return parsed
+    return None
+
+
+def normalize_for_storage(
+    df: pd.DataFrame, category_columns: tuple[str, ...] = ()
+) -> pd.DataFrame:
+    """
+    Returns a frame that Arrow can store losslessly:
+    - columns named like "... date" are parsed to datetime64 when every
+      non-empty value parses as a date (otherwise they are left untouched);
+    - category_columns are stored dictionary-encoded (read back as category);
+    - object columns holding mixed Python types are stored as strings.
+    """
+    df_out = df.copy(deep=False)
+    for col in df_out.columns:
+        series = df_out[col]
+        is_text = isinstance(series.dtype, pd.StringDtype)
+        if series.dtype != object and not is_text:
+            continue
+
+        if _is_date_column(col):
+            parsed = parse_clean_dates(series)
+            if parsed is not None:
+                df_out[col] = parsed
+                continue
+
+        if not is_text:
+            try:
+                pa.array(series, from_pandas=True)
+            except (pa.ArrowException, TypeError, ValueError):
+                df_out[col] = series.map(
+                    lambda v: v if pd.isna(v) else str(v)
+                ).astype(object)
+        if col in category_columns:
+            df_out[col] = df_out[col].astype("category")
+    # Arrow requires string column names
+    df_out.columns = [str(col) for col in df_out.columns]
+    return df_out
+
+
+def read_sidecar(
+    path: str, columns: tuple[str, ...] | None = None
+) -> pd.DataFrame | None:
+    """
+    Memory-maps a sidecar and converts it (or just `columns`, where present) to
+    pandas. Unselected columns are never read from disk. Returns None if unusable.
+    """
+    if feather is None or not os.path.exists(path):
+        return None
+    try:
+        table = feather.read_table(path, memory_map=True)
+        _touch(path)
+        if columns is not None:
+            table = table.select([col for col in table.column_names if col in columns])
+        return table.to_pandas(split_blocks=True, self_destruct=True)
+    except (OSError, pa.ArrowException):
+        return None
+
+
+def write_sidecar(df: pd.DataFrame, path: str) -> bool:
+    """
+    Writes df as an uncompressed Feather file (so it can be memory-mapped).
+    The file is written to a temporary name and renamed into place, so a
+    concurrent reader never sees a partial sidecar. The cache is then pruned to
+    its size cap (see prune_sidecars). Returns False, after logging a warning, on
+    failure.
+    """
+    if feather is None:
+        return False
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(path), suffix=".feather.tmp"
+        )
+        os.close(fd)
+        try:
+            feather.write_feather(df, tmp_path, compression="uncompressed", version=2)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    except (OSError, pa.ArrowException, TypeError, ValueError) as e:
+        logger.warning("could not write sidecar %s: %s", path, e)
+        return False
+    prune_sidecars(keep=path)
+    return True
+
+
+def _touch(path: str) -> None:
+    """Marks a sidecar as used now; its modification time orders the pruning."""
+    try:
+        os.utime(path)
+    except OSError:
+        pass  # Read-only cache: pruning falls back to when it was written
+
+
+def prune_sidecars(max_bytes: int | None = None, keep: str | None = None) -> int:
+    """
+    Deletes the least recently used sidecars (by modification time, which reads
+    refresh) until the cache holds at most max_bytes (default: max_cache_bytes()).
+    The sidecar at `keep` is never deleted. Returns the number of files deleted.
+    """
+    if max_bytes is None:
+        max_bytes = max_cache_bytes()
+    try:
+        with os.scandir(sidecar_dir()) as entries:
+            files = []
+            for entry in entries:
+                if entry.name.endswith(".feather") and entry.is_file():
+                    stat = entry.stat()
+                    files.append((stat.st_mtime_ns, stat.st_size, entry.path))
+    except OSError as e:
+        logger.warning("could not list sidecars: %s", e)
+        return 0
+
+    total = sum(size for _, size, _ in files)
+    deleted = 0
+    for _, size, path in sorted(files):
+        if total <= max_bytes:
+            break
+        if keep is not None and os.path.abspath(path) == os.path.abspath(keep):
+            continue
+        try:
+            os.remove(path)
+        except OSError as e:
+            logger.warning("could not delete sidecar %s: %s", path, e)
+            continue
+        total -= size
+        deleted += 1
+    return deleted
+
+
+def load_with_sidecar(
+    file_path: str,
+    skiprows: int | None,
+    reader,
+    columns: tuple[str, ...] | None = None,
+    category_columns: tuple[str, ...] = (),
+    sheet: int = 0,
+) -> pd.DataFrame:
+    """
+    Returns the parsed export for file_path (worksheet `sheet`, restricted to
+    `columns` if given), from its sidecar when one exists. On a miss, reader() must
+    parse every column; the normalized result is written as the sidecar so later
+    loads can project any columns from it. Without pyarrow this is just reader().
+    """
+    if feather is None:
+        return reader()
+
+    path = sidecar_path(content_hash(file_path), skiprows, sheet)
+    df = read_sidecar(path, columns)
+    if df is not None:
+        return df
+
+    df = normalize_for_storage(reader(), category_columns)
+    write_sidecar(df, path)
+    if columns is not None:
+        df = df[[col for col in df.columns if col in columns]]
+    return df
@@ -0,0 +1,335 @@
+import os
+from abc import ABC, abstractmethod
+
+import pandas as pd
+
+import bookings
+import functions
+import loaders
+import membership
+import rendering
+
+# --- Streaming Reports ---
+# Count-based reports only need running totals, so very large exports can be read
+# in fixed-size chunks (CSV via pandas, XLSX row by row via openpyxl's read_only
+# mode) and folded into per-report aggregators. Peak memory is bounded by the
+# chunk size rather than the file size.
+
+DEFAULT_CHUNK_ROWS = 100_000
+STREAMABLE_EXTENSIONS = (".csv", ".xlsx", ".xlsm")
+# Files at least this large are streamed by the GUI; override with
+# REPORTING_STREAM_THRESHOLD_MB.
+DEFAULT_STREAM_THRESHOLD_MB = 100
+
+
+def can_stream(file_path: str) -> bool:
+    return os.path.splitext(file_path)[1].lower() in STREAMABLE_EXTENSIONS
+
+
+def should_stream(file_path: str) -> bool:
+    """True for streamable files at or above the configured size threshold."""
+    if not can_stream(file_path):
+        return False
+    threshold_mb = float(
+        os.environ.get("REPORTING_STREAM_THRESHOLD_MB", DEFAULT_STREAM_THRESHOLD_MB)
+    )
+    return os.path.getsize(file_path) >= threshold_mb * 1024 * 1024
+
+
+def _iter_xlsx_chunks(
+    file_path: str,
+    chunk_rows: int,
+    skiprows: int | None,
+    columns: tuple[str, ...] | None,
+    sheet: int = 0,
+):
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[sheet].iter_rows(values_only=True)
+        for _ in range(skiprows or 0):
+            next(rows, None)
+        header = loaders.header_names(next(rows, ()))
+        keep = [
+            i for i, name in enumerate(header) if columns is None or name in columns
+        ]
+        names = [header[i] for i in keep]
+
+        batch = []
+        yielded = False
+        for row in rows:
+            values = [row[i] if i < len(row) else None for i in keep]
+            if all(value is None for value in values):
+                continue  # Blank rows can't match any report
+            batch.append(values)
+            if len(batch) >= chunk_rows:
+                yield pd.DataFrame(batch, columns=names)
+                yielded = True
+                batch = []
+        if batch or not yielded:
+            yield pd.DataFrame(batch, columns=names)
+    finally:
+        workbook.close()
+
+
+def iter_chunks(
+    file_path: str,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    skiprows: int | None = None,
+    profile: loaders.LoadProfile = loaders.FULL_PROFILE,
+    sheet: int = 0,
+):
+    """
+    Yields the export (worksheet `sheet`) as DataFrames of at most chunk_rows rows,
+    typed by profile. Always yields at least one (possibly empty) chunk carrying
+    the header.
+    """
+    if not can_stream(file_path):
+        raise ValueError(
+            f"Streaming supports {', '.join(STREAMABLE_EXTENSIONS)} files, not '{os.path.basename(file_path)}'"
+        )
+
+    if loaders.is_csv(file_path):
+        kwargs = {"chunksize": chunk_rows}
+        if skiprows is not None:
+            kwargs["skiprows"] = skiprows
+        if profile.columns is not None:
+            kwargs["usecols"] = lambda col: col in profile.columns
+        with pd.read_csv(file_path, **kwargs) as reader:
+            yielded = False
+            for chunk in reader:
+                yielded = True
+                yield loaders.apply_profile(chunk, profile)
+            if not yielded:
+                del kwargs["chunksize"]
+                header = pd.read_csv(file_path, nrows=0, **kwargs)
+                yield loaders.apply_profile(header, profile)
+        return
+
+    for chunk in _iter_xlsx_chunks(
+        file_path, chunk_rows, skiprows, profile.columns, sheet
+    ):
+        yield loaders.apply_profile(chunk, profile)
+
+
+def read_columns(
+    file_path: str, skiprows: int | None = None, sheet: int = 0
+) -> list[str]:
+    """Column names of an export, reading only its header row."""
+    if loaders.is_csv(file_path):
+        kwargs = {"nrows": 0}
+        if skiprows is not None:
+            kwargs["skiprows"] = skiprows
+        return [str(col) for col in pd.read_csv(file_path, **kwargs).columns]
+    return list(next(_iter_xlsx_chunks(file_path, 1, skiprows, None, sheet)).columns)
+
+
+# --- Incremental Aggregators ---
+# Each aggregator mirrors one report function: update() folds in a chunk,
+# result() returns the same output the function gives for the whole file.
+
+
+class ReportAggregator(ABC):
+    report_label = ""
+    required_columns: list[str] = []
+
+    def check_columns(self, chunk: pd.DataFrame) -> None:
+        missing = [col for col in self.required_columns if col not in chunk.columns]
+        if missing:
+            raise ValueError(
+                f"{self.report_label}: Missing required columns: {', '.join(missing)}"
+            )
+
+    @abstractmethod
+    def update(self, chunk: pd.DataFrame) -> None:
+        """Folds one chunk of the export into the running totals."""
+
+    @abstractmethod
+    def result(self):
+        """The report's output for every chunk seen so far."""
+
+
+class _MemberCountsAggregator(ReportAggregator):
+    def __init__(self, target_club: str, end_date: str):
+        self.target_club = target_club
+        self.end_date = end_date
+        self.counts: pd.DataFrame | None = None
+
+    @abstractmethod
+    def _chunk_counts(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """Counts per club and plan type for one chunk (see membership.py)."""
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        counts = self._chunk_counts(chunk)
+        if self.counts is None:
+            self.counts = counts
+        else:
+            # A (club, plan) cell in neither table is NaN after add(), not 0
+            self.counts = (
+                self.counts.add(counts, fill_value=0).fillna(0).astype("int64")
+            )
+
+    def _club_counts(self) -> tuple[int, int]:
+        counts = self.counts if self.counts is not None else pd.DataFrame()
+        return (
+            membership.club_count(
+                counts, self.target_club, membership.TARGET_PAYMENT_PLANS[0]
+            ),
+            membership.club_count(counts, self.target_club, membership.TOTAL_COLUMN),
+        )
+
+
+class CurrentMembersAggregator(_MemberCountsAggregator):
+    report_label = "Current Members"
+    required_columns = functions.CURRENT_MEMBERS_COLUMNS
+
+    def _chunk_counts(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        return membership.active_member_counts(chunk, self.end_date)
+
+    def result(self) -> rendering.ReportResult:
+        return functions.current_members_result(*self._club_counts())
+
+
+class NewMembersAggregator(_MemberCountsAggregator):
+    report_label = "New Members"
+    required_columns = functions.NEW_MEMBERS_COLUMNS
+
+    def _chunk_counts(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        return membership.new_member_counts(chunk, self.end_date)
+
+    def result(self) -> rendering.ReportResult:
+        start_date_month, end_date_dt = membership.month_window(self.end_date)
+        return functions.new_members_result(
+            *self._club_counts(), start_date_month, end_date_dt
+        )
+
+
+class TechnogymAggregator(ReportAggregator):
+    report_label = "Technogym"
+    required_columns = functions.TECHNOGYM_COLUMNS
+
+    def __init__(self):
+        self.consults_no = 0
+        self.pts_no = 0
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        consults_no, pts_no = functions.technogym_counts(chunk)
+        self.consults_no += consults_no
+        self.pts_no += pts_no
+
+    def result(self) -> rendering.ReportResult:
+        return functions.technogym_result(self.consults_no, self.pts_no)
+
+
+class GroupFitnessAggregator(ReportAggregator):
+    report_label = "Group Fitness"
+    required_columns = functions.GROUP_FITNESS_COLUMNS
+
+    def __init__(self):
+        self.totals: pd.DataFrame | None = None
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        totals = functions.group_fitness_totals(chunk)
+        self.totals = totals if self.totals is None else self.totals + totals
+
+    def result(self) -> rendering.ReportResult:
+        totals = self.totals
+        if totals is None:
+            totals = functions.group_fitness_totals(
+                pd.DataFrame(columns=self.required_columns)
+            )
+        return functions.group_fitness_result(totals)
+
+
+class BookingZonesAggregator(ReportAggregator):
+    report_label = "Booking Zones"
+    required_columns = functions.BOOKING_ZONES_COLUMNS
+
+    def __init__(self, weights: pd.DataFrame | None = None):
+        self.weights = weights if weights is not None else bookings.load_zone_weights()
+        self.totals: pd.DataFrame | None = None
+        self.unparsed_rows = 0
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        df_sum, unparsed_rows = functions.booking_zone_totals(chunk)
+        self.unparsed_rows += unparsed_rows
+        if self.totals is not None:
+            df_sum = pd.concat([self.totals, df_sum], ignore_index=True)
+        # Re-group so the running totals stay one row per zone
+        self.totals = df_sum.groupby(
+            ["Club", "Club Zone Type Name"], as_index=False, observed=True
+        )["Length of Booking"].sum()
+
+    def result(self) -> pd.DataFrame:
+        totals = self.totals
+        if totals is None:
+            totals = pd.DataFrame(
+                {
+                    "Club": pd.Series(dtype=object),
+                    "Club Zone Type Name": pd.Series(dtype=object),
+                    "Length of Booking": pd.Series(dtype="timedelta64[ns]"),
+                }
+            )
+        return functions.weighted_booking_summary(
+            totals, self.weights, self.unparsed_rows
+        )
+
+
+# Report function -> aggregator class for every report that can be streamed
+AGGREGATORS = {
+    functions.current_members: CurrentMembersAggregator,
+    functions.new_members: NewMembersAggregator,
+    functions.technogym_reporting: TechnogymAggregator,
+    functions.groupFitness: GroupFitnessAggregator,
+    functions.booking_zones: BookingZonesAggregator,
+}
+
+
+def stream_reports(
+    file_path: str,
+    aggregators: list[ReportAggregator],
+    skiprows: int | None = None,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    on_chunk=None,
+    sheet: int = 0,
+) -> list[ReportAggregator]:
+    """
+    Reads file_path once, feeding every chunk to every aggregator. Aggregators
+    whose columns are missing raise ValueError on the first chunk. on_chunk, if
+    given, is called with the running row count after each chunk (and may raise
+    to stop early, e.g. on cancel). Returns the aggregators.
+    """
+    columns = set()
+    for aggregator in aggregators:
+        columns.update(aggregator.required_columns)
+    profile = loaders.profile_for_columns(sorted(columns))
+
+    rows_read = 0
+    first = True
+    for chunk in iter_chunks(file_path, chunk_rows, skiprows, profile, sheet):
+        if first:
+            for aggregator in aggregators:
+                aggregator.check_columns(chunk)
+            first = False
+        for aggregator in aggregators:
+            aggregator.update(chunk)
+        rows_read += len(chunk)
+        if on_chunk is not None:
+            on_chunk(rows_read)
+    return aggregators
+
+
+def run_streaming_report(
+    report_function,
+    file_path: str,
+    report_args: tuple = (),
+    skiprows: int | None = None,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    on_chunk=None,
+    sheet: int = 0,
+):
+    """Streams one report over file_path and returns the report's usual output."""
+    aggregator = AGGREGATORS[report_function](*report_args)
+    stream_reports(file_path, [aggregator], skiprows, chunk_rows, on_chunk, sheet)
+    return aggregator.result()
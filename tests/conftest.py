@@ -0,0 +1,18 @@
+import os
+import sys
+
+import pytest
+
+# The report modules live at the top of the repository, not in a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(autouse=True, scope="session")
+def sidecar_dir(tmp_path_factory):
+    """Keeps sidecars written by loads (here or in worker processes) out of the
+    user's cache."""
+    os.environ["REPORTING_SIDECAR_DIR"] = str(tmp_path_factory.mktemp("sidecars"))
+    yield
+    import ingest
+
+    ingest.shutdown()
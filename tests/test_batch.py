@@ -0,0 +1,63 @@
+import os
+
+import pytest
+
+import batch
+import benchmark
+import functions
+
+END_DATE = benchmark.BENCHMARK_DATE
+
+
+@pytest.fixture
+def export_path(tmp_path):
+    path = str(tmp_path / "members.csv")
+    benchmark.write_export(benchmark.make_member_export(300), path)
+    return path
+
+
+def test_every_report_runs_for_every_club(export_path, tmp_path, capsys):
+    output_dir = tmp_path / "out"
+    assert batch.main([export_path, "-o", str(output_dir), "--date", END_DATE]) == 0
+
+    with open(output_dir / "members" / "summary.html", encoding="utf-8") as f:
+        summary = f.read()
+    for club in functions.CLUB_LIST:
+        assert summary.count(f"<h3>{club}</h3>") == 2  # Current and New Members
+    written = os.listdir(output_dir / "members")
+    assert any(name.startswith("Ending_Members_Report_") for name in written)
+    assert any(name.startswith("Ending_Members_Lookahead_") for name in written)
+    out = capsys.readouterr().out
+    assert "Booking Zones Analysis: skipped (missing" in out
+
+
+def test_unreadable_export_exits_1_after_the_others(export_path, tmp_path, capsys):
+    output_dir = tmp_path / "out"
+    missing = str(tmp_path / "missing.csv")
+    assert batch.main([missing, export_path, "-o", str(output_dir)]) == 1
+    assert "could not load" in capsys.readouterr().err
+    assert (output_dir / "members" / "summary.html").exists()
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        ["--date", "30/06/2024"],
+        ["--series-start", "2024-01-01"],
+        ["--stream", "--snapshot", "members.snapshot"],
+        ["--stream", "--warehouse", "reports.db"],
+        ["--ending-days", "-1"],
+        ["--chunk-rows", "0"],
+    ],
+)
+def test_invalid_options_exit_2(export_path, tmp_path, options, capsys):
+    assert batch.main([export_path, "-o", str(tmp_path / "out"), *options]) == 2
+    assert capsys.readouterr().err.startswith("Error:")
+    assert not (tmp_path / "out").exists()
+
+
+def test_nothing_to_run_exits_2(tmp_path, capsys):
+    assert batch.main(["-o", str(tmp_path / "out")]) == 2
+    with pytest.raises(SystemExit) as exit_info:
+        batch.main([])  # -o is required
+    assert exit_info.value.code == 2
@@ -0,0 +1,101 @@
+import json
+
+import pandas as pd
+import pandas.testing as tm
+import pytest
+
+import benchmark
+import registry
+
+
+@pytest.mark.parametrize("dataset", list(benchmark.DATASETS))
+def test_generated_exports_are_reproducible_and_load(dataset, tmp_path):
+    generator, skiprows = benchmark.DATASETS[dataset]
+    tm.assert_frame_equal(generator(500, seed=3), generator(500, seed=3))
+    assert not generator(500, seed=3).equals(generator(500, seed=4))
+
+    path = benchmark.synthetic_export(dataset, 500, str(tmp_path), seed=3)
+    assert benchmark.synthetic_export(dataset, 500, str(tmp_path), seed=3) == path
+    df = benchmark.load_dataset(dataset, path)
+    assert len(df) == 500
+    # Every benchmarked report finds its columns in the export
+    report_names = {name for name, _, _ in benchmark.REPORTS[dataset]}
+    for spec in registry.REPORTS:
+        if spec.name in report_names:
+            assert not registry.missing_columns(spec, df.columns)
+
+
+@pytest.mark.parametrize(
+    "text, rows",
+    [("5000", 5000), ("10k", 10_000), ("1.5M", 1_500_000), ("2_000", 2000)],
+)
+def test_row_counts(text, rows):
+    assert benchmark.parse_rows(text) == rows
+
+
+@pytest.mark.parametrize("text", ["0", "-3", "ten"])
+def test_bad_row_counts(text):
+    with pytest.raises(ValueError):
+        benchmark.parse_rows(text)
+
+
+def _case(seconds: float, peak_mb: float, digest: str) -> dict:
+    return {
+        "phase": "compute",
+        "dataset": "members",
+        "rows": 10_000,
+        "report": "Current Members",
+        "engine": "pandas",
+        "seconds": seconds,
+        "peak_mb": peak_mb,
+        "digest": digest,
+    }
+
+
+def test_compare_flags_slower_heavier_and_changed_cases():
+    slow = benchmark.MIN_COMPARED_SECONDS * 10
+    baseline = {"cases": [_case(slow, 10.0, "a")]}
+    assert benchmark.compare({"cases": [_case(slow * 1.2, 12.0, "a")]}, baseline) == []
+    regressions = benchmark.compare({"cases": [_case(slow * 2, 20.0, "b")]}, baseline)
+    assert len(regressions) == 3
+    assert regressions[2].endswith("output changed")
+    # Cases too quick to time reliably are not compared on time
+    quick = benchmark.MIN_COMPARED_SECONDS / 10
+    assert (
+        benchmark.compare(
+            {"cases": [_case(quick * 5, 10.0, "a")]},
+            {"cases": [_case(quick, 10.0, "a")]},
+        )
+        == []
+    )
+
+
+def test_run_is_saved_and_checked_against_its_baseline(tmp_path, capsys):
+    options = [
+        "--rows",
+        "2k",
+        "--dataset",
+        "members",
+        "--repeat",
+        "1",
+        "--no-memory",
+        "--data-dir",
+        str(tmp_path / "data"),
+    ]
+    saved = str(tmp_path / "baseline.json")
+    assert benchmark.main([*options, "--save-baseline", saved]) == 0
+    with open(saved, encoding="utf-8") as f:
+        results = json.load(f)
+    reports = [
+        case["report"] for case in results["cases"] if case["phase"] == "compute"
+    ]
+    assert reports == [name for name, _, _ in benchmark.REPORTS["members"]]
+
+    for case in results["cases"]:
+        if case["digest"] is not None:
+            case["digest"] = "changed"
+    with open(saved, "w", encoding="utf-8") as f:
+        json.dump(results, f)
+    assert benchmark.main([*options, "--baseline", saved]) == 1
+    assert "output changed" in capsys.readouterr().out
+    assert benchmark.main([*options, "--rows", "0"]) == 2
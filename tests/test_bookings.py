@@ -0,0 +1,112 @@
+import datetime as dt
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import bookings
+import functions
+
+
+def test_club_overrides_win_over_default_weights():
+    weights = bookings.weights_table(
+        {"Court": "1/2", "Lane": 0.25}, {"Burwood": {"Court": "1/3"}}
+    )
+    clubs = pd.Series(["Burwood", "Waterfront", "Burwood", "Burwood"])
+    zones = pd.Series(["Court", "Court", "Lane", "Pool"])
+    np.testing.assert_allclose(
+        bookings.zone_weights_for(clubs, zones, weights), [1 / 3, 1 / 2, 0.25, 1.0]
+    )
+
+
+def test_weights_are_loaded_from_the_file_until_it_changes(tmp_path):
+    path = tmp_path / "zone_weights.json"
+    path.write_text(json.dumps({"default": {"Court": "1/2"}}))
+    first = bookings.load_zone_weights(str(path))
+    assert bookings.load_zone_weights(str(path)) is first
+    assert first["Weight"].tolist() == [0.5]
+
+    path.write_text(json.dumps({"default": {"Court": "1/4"}, "clubs": {"A": {"Hall": 2}}}))
+    changed = bookings.load_zone_weights(str(path))
+    weights = bookings.zone_weights_for(
+        pd.Series(["A", "A", "B"]), pd.Series(["Court", "Hall", "Hall"]), changed
+    )
+    assert weights.tolist() == [0.25, 2.0, 1.0]
+
+    path.write_text(json.dumps({"default": {"Court": "1/0"}}))
+    with pytest.raises(ValueError, match="Invalid weight"):
+        bookings.load_zone_weights(str(path))
+
+
+def test_booking_zones_weights_each_zone_total():
+    df = pd.DataFrame(
+        {
+            "Facility Booking Definition": [
+                "Court hire",
+                "Court hire",
+                "Unavailable - maintenance",
+                "University Class",
+                "Lane swim",
+            ],
+            "Club": ["A", "A", "A", "A", "B"],
+            "Club Zone Type Name": ["Court", "Court", "Court", "Court", "Lane"],
+            "Length of Booking": ["01:00:00", "00:30:00", "05:00:00", "05:00:00", "02:00"],
+        }
+    )
+    weights = bookings.weights_table({"Court": "1/2"}, {"B": {"Lane": "1/4"}})
+    result = functions.booking_zones(df, weights)
+    assert result.to_dict("records") == [
+        {
+            "Club": "A",
+            "Club Zone Type Name": "Court",
+            "Length of Booking (Hours)": 1.5,
+            "Adjusted Time (Hours)": 0.75,
+        },
+        {
+            "Club": "B",
+            "Club Zone Type Name": "Lane",
+            "Length of Booking (Hours)": 2.0,
+            "Adjusted Time (Hours)": 0.5,
+        },
+    ]
+
+
+def test_each_kind_of_booking_length_is_parsed():
+    values = pd.Series(
+        [
+            "01:30:00",
+            "1:30",
+            " 90 ",
+            "1 days 02:00:00",
+            90,
+            1 / 24,
+            dt.time(0, 45),
+            dt.timedelta(minutes=20),
+            dt.datetime(1899, 12, 31, 2, 0),  # Excel duration of a day or more
+            "",
+            None,
+            "soon",
+            -5,
+        ],
+        dtype=object,
+    )
+    parsed, unparsed = bookings.parse_durations(values)
+    minutes = (parsed / pd.Timedelta(minutes=1)).tolist()
+    assert minutes[:9] == [90, 90, 90, 26 * 60, 90, 60, 45, 20, 120]
+    assert parsed[9:].isna().all()
+    assert unparsed == 2  # "soon" and -5; blanks are not counted
+
+
+@pytest.mark.parametrize(
+    "values, expected",
+    [
+        (pd.Series([30, 90.5, np.nan]), [30, 90.5, None]),
+        (pd.Series(pd.to_timedelta(["00:10:00", None])), [10, None]),
+        (pd.Series(["00:15:00"] * 3, dtype="category"), [15, 15, 15]),
+    ],
+)
+def test_typed_booking_length_columns(values, expected):
+    parsed, unparsed = bookings.parse_durations(values)
+    minutes = [None if pd.isna(v) else v / pd.Timedelta(minutes=1) for v in parsed]
+    assert (minutes, unparsed) == (expected, 0)
@@ -0,0 +1,69 @@
+import functools
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import benchmark
+import engines
+import functions
+import registry
+
+ROWS = 50_000
+# Unused float columns added to each frame, and the share of their size a report's
+# peak memory may grow by before it counts as copying the whole frame
+PADDING_COLUMNS = 8
+TOLERANCE = 0.25
+PARAMS = {
+    registry.CLUB: functions.CLUB_LIST[0],
+    registry.END_DATE: benchmark.BENCHMARK_DATE,
+}
+
+
+@functools.cache
+def _frames() -> list[pd.DataFrame]:
+    return [
+        generator(ROWS, benchmark.DEFAULT_SEED)
+        for generator, _ in benchmark.DATASETS.values()
+    ]
+
+
+def _frame_for(spec: registry.ReportSpec, frames: list[pd.DataFrame]) -> pd.DataFrame:
+    return next(df for df in frames if not registry.missing_columns(spec, df.columns))
+
+
+def _padded(df: pd.DataFrame) -> tuple[pd.DataFrame, int]:
+    padding = pd.DataFrame(
+        np.zeros((len(df), PADDING_COLUMNS)),
+        index=df.index,
+        columns=[f"Padding {i + 1}" for i in range(PADDING_COLUMNS)],
+    )
+    return pd.concat([df, padding], axis=1), padding.to_numpy().nbytes
+
+
+def _peak_bytes(spec: registry.ReportSpec, df: pd.DataFrame, engine: str) -> int:
+    # A new frame object each run, so nothing memoized for an earlier run is reused
+    df = df.copy(deep=False)
+    tracemalloc.start()
+    try:
+        registry.run(spec, df, PARAMS, engine=engine)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.mark.parametrize(
+    "engine", [engine for engine in engines.ENGINES if engines.available(engine)]
+)
+@pytest.mark.parametrize("spec", registry.REPORTS, ids=lambda spec: spec.name)
+def test_report_does_not_copy_the_frame(spec, engine):
+    """
+    A report reading views of the columns it needs costs the same with unused
+    columns added; one that copies or filters the whole frame pays for them too.
+    """
+    df = _frame_for(spec, _frames())
+    padded, padding_bytes = _padded(df)
+    _peak_bytes(spec, df, engine)  # Imports and caches outside the frame
+    growth = _peak_bytes(spec, padded, engine) - _peak_bytes(spec, df, engine)
+    assert growth <= padding_bytes * TOLERANCE
@@ -0,0 +1,50 @@
+import datetime as dt
+
+import pandas as pd
+import pandas.testing as tm
+import pytest
+
+import delta
+import functions
+
+
+@pytest.fixture
+def export():
+    today = dt.date.today().isoformat()
+    return pd.DataFrame(
+        {
+            "Name": pd.Series(["Ann", None, "Cy"], dtype="str"),
+            "Last name": pd.Series(["A", "B", None], dtype="str"),
+            "Email": pd.Series([None, "b@example.com", "c@example.com"], dtype="str"),
+            "Club": pd.Categorical(["X", "Y", "X"]),
+            "Payment plan type": pd.Categorical(["Upfront"] * 3),
+            "Payment Plan Name": pd.Categorical(["Plan"] * 3),
+            "Join date": ["2024-01-01"] * 3,
+            "End date": [today, today, "2030-01-01"],
+            "Mobile number": [1, 2, 3],
+        }
+    )
+
+
+def _check_ending_members(snapshot: delta.MemberSnapshot, export: pd.DataFrame):
+    expected = functions.generate_ending_members_report(export)
+    result = snapshot.ending_members()
+    # Identity columns come back as nullable strings; the values must match
+    tm.assert_frame_equal(
+        result.reset_index(drop=True),
+        expected.reset_index(drop=True),
+        check_dtype=False,
+    )
+    for col in delta.IDENTITY_COLUMNS:
+        assert result[col].isna().tolist() == expected[col].isna().tolist()
+        assert not result[col].isin(["", "<NA>", "nan", "None"]).any()
+
+
+def test_snapshot_ending_members_match_the_export(export):
+    _check_ending_members(delta.build_snapshot(export, dt.date.today().isoformat()), export)
+
+
+def test_saved_snapshot_ending_members_match_the_export(export, tmp_path):
+    path = str(tmp_path / "members.snapshot")
+    delta.save_snapshot(delta.build_snapshot(export, dt.date.today().isoformat()), path)
+    _check_ending_members(delta.load_snapshot(path), export)
@@ -0,0 +1,122 @@
+import datetime as dt
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("polars")
+
+import benchmark
+import bookings
+import engines
+import functions
+import loaders
+import rendering
+
+END_DATE = benchmark.BENCHMARK_DATE
+ROWS = 3000
+WEIGHTS = bookings.weights_table(bookings.BUILTIN_ZONE_WEIGHTS)
+
+MEMBER_CASES = [
+    *[(functions.current_members, (club, END_DATE)) for club in functions.CLUB_LIST],
+    *[(functions.new_members, (club, END_DATE)) for club in functions.CLUB_LIST],
+    (functions.new_members_trend, (END_DATE, 6)),
+    (functions.generate_ending_members_report, (END_DATE,)),
+    (functions.ending_members_between, (END_DATE, "2024-07-31")),
+    (functions.ending_members_lookahead, (None, END_DATE, 7)),
+    (functions.ending_members_lookahead, (functions.CLUB_LIST[0], END_DATE, 30)),
+]
+CASES = {
+    "members": MEMBER_CASES,
+    "technogym": [(functions.technogym_reporting, ())],
+    "group_fitness": [(functions.groupFitness, ())],
+    "bookings": [(functions.booking_zones, (WEIGHTS,))],
+}
+
+
+def _messy_frames() -> dict[str, pd.DataFrame]:
+    """Text dates in several forms, missing values and mixed types."""
+    burwood, waterfront = "DeakinACTIVE Burwood", "DeakinACTIVE Waterfront"
+    return {
+        "members": pd.DataFrame(
+            {
+                "Name": list("abcde"),
+                "Last name": list("vwxyz"),
+                "Club": [burwood, None, burwood, waterfront, burwood],
+                "Payment plan type": [
+                    "Upfront",
+                    "Upfront",
+                    None,
+                    "Fortnightly-Fixed",
+                    "Fortnightly-Fixed",
+                ],
+                "Payment Plan Name": list("ppppp"),
+                "End date": ["2024-06-05", "bad", "2024-06-03 10:00", None, "2024-06-03"],
+                "Join date": ["01/06/2024", "2024-06-02", None, "2024-05-31", "junk"],
+                "Email": list("eeeee"),
+                "Mobile number": [1, "x", None, 2.5, 3],
+            }
+        ),
+        "technogym": pd.DataFrame(
+            {"Activity": pd.Series(["Body Scan", None, "Group Training", 3], dtype=object)}
+        ),
+        "group_fitness": pd.DataFrame(
+            {"Club": [burwood] * 3 + [None], "UserActive": ["3", " 4", "x", 5]}
+        ),
+        "bookings": pd.DataFrame(
+            {
+                "Facility Booking Definition": ["x", None, "UNAVAILABLE y", "ok", "ok"],
+                "Club": ["A", "A", "A", "B", None],
+                "Club Zone Type Name": ["z", "z", "z", "WP - Court", "z"],
+                "Length of Booking": ["1:00:00", dt.time(0, 30), "TBC", 45, "  "],
+            }
+        ),
+    }
+
+
+@pytest.fixture(scope="module", params=["generated", "loaded", "messy"])
+def frames(request, tmp_path_factory) -> dict[str, pd.DataFrame]:
+    if request.param == "messy":
+        return _messy_frames()
+    generated = {}
+    for dataset, (generator, skiprows) in benchmark.DATASETS.items():
+        df = generator(ROWS, benchmark.DEFAULT_SEED)
+        if request.param == "loaded":
+            # Through the loader, so columns have the loaded dtypes (categories, dates)
+            path = str(tmp_path_factory.mktemp(dataset) / f"{dataset}.csv")
+            benchmark.write_export(df, path, skiprows)
+            df = benchmark.load_dataset(dataset, path)
+        generated[dataset] = df
+    return generated
+
+
+def _rendered(output) -> list[str]:
+    """Each item as CSV or HTML and as JSON, so values, types and order all count."""
+    items = output if isinstance(output, list) else [output]
+    rendered = []
+    for item in items:
+        if isinstance(item, pd.DataFrame):
+            rendered.append(item.to_csv(index=False) + str(dict(item.dtypes)))
+        else:
+            rendered.append(rendering.to_html(item))
+        rendered.append(rendering.to_json(item))
+    return rendered
+
+
+def _run(function, df, args, engine):
+    try:
+        return _rendered(engines.run(function, df.copy(deep=False), *args, engine=engine))
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"
+
+
+@pytest.mark.parametrize("dataset", list(CASES))
+def test_polars_matches_pandas(frames, dataset):
+    df = frames[dataset]
+    for function, args in CASES[dataset]:
+        expected = _run(function, df, args, engines.PANDAS)
+        assert _run(function, df, args, engines.POLARS) == expected, function.__name__
+
+
+def test_every_polars_report_is_checked():
+    checked = {function for cases in CASES.values() for function, _ in cases}
+    assert set(engines.POLARS_REPORTS) <= checked
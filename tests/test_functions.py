@@ -0,0 +1,121 @@
+import pandas as pd
+import pytest
+
+import benchmark
+import functions
+import membership
+
+END_DATE = "2024-06-20"
+
+
+@pytest.fixture(scope="module")
+def members():
+    return benchmark.make_member_export(20_000)
+
+
+def test_trend_months_match_new_members_at_each_cutoff(members):
+    trend = functions.new_members_trend(members, END_DATE, 6).set_index("Month")
+    assert list(trend.index) == [f"2024-{month:02d}" for month in range(1, 7)]
+    for month in trend.index:
+        cutoff = min(pd.Period(month).end_time.normalize(), pd.Timestamp(END_DATE))
+        counts = membership.new_member_counts(members, cutoff.strftime("%Y-%m-%d"))
+        for club in functions.CLUB_LIST:
+            for plan in [*membership.TARGET_PAYMENT_PLANS, membership.TOTAL_COLUMN]:
+                assert trend.at[month, f"{club} - {plan}"] == membership.club_count(
+                    counts, club, plan
+                )
+
+
+def test_trend_months_without_joins_are_zero():
+    df = benchmark.make_member_export(100)
+    df["Join date"] = "2024-03-10"
+    trend = functions.new_members_trend(df, END_DATE, 4).set_index("Month")
+    assert list(trend.index) == ["2024-03", "2024-04", "2024-05", "2024-06"]
+    totals = trend[[col for col in trend.columns if col.endswith(" - Total")]]
+    assert totals.loc["2024-03"].sum() > 0
+    assert (totals.loc[["2024-04", "2024-05", "2024-06"]] == 0).all().all()
+
+
+def test_trend_rejects_bad_arguments(members):
+    with pytest.raises(ValueError):
+        functions.new_members_trend(members, END_DATE, 0)
+    with pytest.raises(ValueError, match="Missing required columns"):
+        functions.new_members_trend(members.drop(columns="Join date"), END_DATE)
+
+
+def _ending_export():
+    return pd.DataFrame(
+        {
+            "Name": ["Ann", "Bo", "Cy", "Di", "Ed", "Flo"],
+            "Last name": list("ABCDEF"),
+            "Club": ["X", "Y", "X", "X", "Y", "X"],
+            "Payment Plan Name": ["Plan"] * 6,
+            "End date": [
+                "2024-06-08 23:59",
+                "2024-06-01",
+                "2024-06-01 09:00",
+                "2024-05-31 23:59",
+                "2024-06-09",
+                "",
+            ],
+            "Email": [f"{c}@example.com" for c in "abcdef"],
+            "Mobile number": range(6),
+        }
+    )
+
+
+def test_lookahead_includes_the_first_and_last_day():
+    df = _ending_export()
+    ending = functions.ending_members_lookahead(df, None, "2024-06-01")
+    assert ending["Name"].tolist() == ["Bo", "Cy", "Ann"]  # In order of end date
+    assert ending["End date"].tolist() == list(
+        pd.to_datetime(
+            ["2024-06-01", "2024-06-01 09:00", "2024-06-08 23:59"], format="ISO8601"
+        )
+    )
+    assert functions.ending_members_lookahead(df, None, "2024-06-01", 8)[
+        "Name"
+    ].tolist() == ["Bo", "Cy", "Ann", "Ed"]
+
+
+def test_lookahead_of_zero_days_is_the_ending_members_report():
+    df = _ending_export()
+    ending = functions.ending_members_lookahead(df, None, "2024-06-01", 0)
+    pd.testing.assert_frame_equal(
+        ending, functions.generate_ending_members_report(df, "2024-06-01")
+    )
+    assert ending["Name"].tolist() == ["Bo", "Cy"]
+    assert functions.ending_members_lookahead(df, None, "2024-06-02", 0).empty
+
+
+def test_lookahead_for_one_club():
+    df = _ending_export()
+    ending = functions.ending_members_lookahead(df, "X", "2024-05-31", 30)
+    assert ending["Name"].tolist() == ["Di", "Cy", "Ann"]
+    assert functions.ending_members_lookahead(df, "Z", "2024-05-31", 30).empty
+    assert (
+        functions.ending_members_between(df, "2024-06-01", "2024-06-30", [])[
+            "Name"
+        ].tolist()
+        == []
+    )
+
+
+def test_ending_between_matches_a_row_filter(members):
+    end_dates = pd.to_datetime(members["End date"], errors="coerce").dt.normalize()
+    for start, end in [("2024-06-01", "2024-06-01"), ("2024-05-01", "2024-07-31")]:
+        ending = functions.ending_members_between(members, start, end)
+        expected = members.index[end_dates.between(start, end)]
+        assert sorted(ending.index) == sorted(expected)
+        assert ending["End date"].is_monotonic_increasing
+    assert functions.ending_members_between(members, "2024-06-02", "2024-06-01").empty
+
+
+def test_lookahead_rejects_bad_arguments():
+    df = _ending_export()
+    with pytest.raises(ValueError):
+        functions.ending_members_lookahead(df, None, "2024-06-01", -1)
+    with pytest.raises(ValueError):
+        functions.ending_members_lookahead(df, None, "01/06/2024")
+    with pytest.raises(ValueError, match="Missing required columns: Email"):
+        functions.ending_members_lookahead(df.drop(columns="Email"), None, "2024-06-01")
@@ -0,0 +1,75 @@
+import pandas as pd
+import pandas.testing as tm
+import pytest
+
+pytest.importorskip("pyarrow")
+
+import benchmark
+import ingest
+import loaders
+
+
+def test_ipc_round_trip_keeps_values_and_types():
+    df = pd.DataFrame(
+        {
+            "Club": pd.Categorical(["A", "B", None]),
+            "End date": pd.to_datetime(["2024-06-30", None, "2024-07-01"]),
+            "Name": pd.Series(["Ann", None, "Cy"], dtype="str"),
+            "Mobile number": pd.Series([1, "two", None], dtype=object),
+            "Count": [1, 2, 3],
+        }
+    )
+    restored = ingest.frame_from_ipc(ingest.frame_to_ipc(df, ("Club",)))
+    assert isinstance(restored["Club"].dtype, pd.CategoricalDtype)
+    tm.assert_series_equal(restored["Club"], df["Club"], check_categorical=False)
+    tm.assert_series_equal(restored["End date"], df["End date"], check_dtype=False)
+    tm.assert_series_equal(restored["Name"], df["Name"])
+    assert restored["Mobile number"].tolist()[:2] == ["1", "two"]
+    assert pd.isna(restored["Mobile number"][2])
+    assert restored["Count"].tolist() == [1, 2, 3]
+
+
+@pytest.fixture
+def export_paths(tmp_path):
+    paths = []
+    for seed in range(3):
+        path = str(tmp_path / f"members_{seed}.csv")
+        benchmark.write_export(benchmark.make_member_export(200, seed), path)
+        paths.append(path)
+    return paths
+
+
+def test_parallel_load_matches_loading_one_by_one(export_paths):
+    parallel = ingest.load_exports(export_paths, parallel=True, cache=None)
+    serial = ingest.load_exports(export_paths, parallel=False, cache=None)
+    tm.assert_frame_equal(parallel, serial)
+    assert len(parallel) == 600
+    assert parallel[ingest.SOURCE_FILE_COLUMN].unique().tolist() == [
+        "members_0.csv",
+        "members_1.csv",
+        "members_2.csv",
+    ]
+    assert isinstance(parallel["Club"].dtype, pd.CategoricalDtype)
+
+
+def test_loaded_files_are_cached_and_progress_is_reported(export_paths):
+    cache = loaders.WorkbookCache()
+    progress = []
+    ingest.load_exports(
+        export_paths,
+        cache=cache,
+        on_file_loaded=lambda done, total, path: progress.append((done, total)),
+    )
+    assert sorted(progress) == [(1, 3), (2, 3), (3, 3)]
+    assert len(cache) == 3
+    for path in export_paths:
+        assert loaders.load_export(path, cache=cache) is cache.get(
+            loaders.file_cache_key(path)
+        )
+
+
+def test_submitted_load_is_decoded_in_the_caller(export_paths):
+    payload = ingest.submit_load(export_paths[0]).result(timeout=60)
+    tm.assert_frame_equal(
+        ingest.decode(payload), loaders.load_export(export_paths[0], cache=None)
+    )
@@ -0,0 +1,161 @@
+import os
+import threading
+import time
+
+import pandas as pd
+
+import benchmark
+import functions
+import loaders
+import registry
+import rendering
+
+
+def _frame(rows: int) -> pd.DataFrame:
+    return pd.DataFrame({"Club": ["X"] * rows, "Count": range(rows)})
+
+
+def test_cache_evicts_least_recently_used_past_its_budget():
+    size = loaders.frame_nbytes(_frame(100))
+    cache = loaders.WorkbookCache(max_bytes=int(size * 2.5))
+    frames = {key: _frame(100) for key in ("a", "b", "c")}
+    cache.put(("a",), frames["a"])
+    cache.put(("b",), frames["b"])
+    assert cache.get(("a",)) is frames["a"]  # "b" is now least recently used
+    cache.put(("c",), frames["c"])
+    assert ("b",) not in cache
+    assert cache.get(("a",)) is frames["a"] and cache.get(("c",)) is frames["c"]
+    assert cache.total_bytes == 2 * size
+
+
+def test_cache_skips_frames_larger_than_its_budget():
+    cache = loaders.WorkbookCache(max_bytes=loaders.frame_nbytes(_frame(10)))
+    cache.put(("small",), _frame(10))
+    cache.put(("large",), _frame(1000))
+    assert ("small",) in cache and ("large",) not in cache
+
+
+def test_invalidate_drops_every_load_of_a_file(tmp_path):
+    cache = loaders.WorkbookCache()
+    path, other = str(tmp_path / "a.csv"), str(tmp_path / "b.csv")
+    for file_path in (path, other):
+        _frame(3).to_csv(file_path, index=False)
+    for skiprows in (None, 1):
+        cache.put(loaders.file_cache_key(path, skiprows), _frame(3))
+    cache.put(loaders.file_cache_key(other), _frame(3))
+    assert cache.invalidate(path) == 2
+    assert len(cache) == 1
+    assert cache.invalidate() == 1
+    assert len(cache) == 0 and cache.total_bytes == 0
+
+
+def test_changed_file_is_loaded_again(tmp_path):
+    path = str(tmp_path / "members.csv")
+    _frame(3).to_csv(path, index=False)
+    cache = loaders.WorkbookCache()
+    first = loaders.load_export(path, cache=cache, use_sidecar=False)
+    assert loaders.load_export(path, cache=cache, use_sidecar=False) is first
+
+    _frame(5).to_csv(path, index=False)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert len(loaders.load_export(path, cache=cache, use_sidecar=False)) == 5
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_concurrent_loads_of_one_key_parse_once():
+    cache = loaders.WorkbookCache()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.05)
+        return _frame(3)
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_load(("k",), loader)))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+
+
+def test_profile_types_and_projects_columns():
+    df = pd.DataFrame(
+        {
+            "Club": ["A", "B", "A"],
+            "End date": ["2024-06-30", None, "2024-07-01"],
+            "Join date": ["2024-01-01", "someday", "2024-02-01"],
+            "Name": ["Ann", "Bo", "Cy"],
+        }
+    )
+    profiled = loaders.apply_profile(
+        df, loaders.profile_for_columns(["Club", "End date", "Join date"])
+    )
+    assert list(profiled.columns) == ["Club", "End date", "Join date"]
+    assert isinstance(profiled["Club"].dtype, pd.CategoricalDtype)
+    assert pd.api.types.is_datetime64_any_dtype(profiled["End date"])
+    # Not every value is a date, so the column is left for the report to judge
+    assert profiled["Join date"].tolist() == df["Join date"].tolist()
+    assert df["Club"].dtype != "category"  # The input frame is not changed
+
+
+def test_reports_match_on_profiled_and_plain_loads(tmp_path):
+    path = str(tmp_path / "members.csv")
+    benchmark.write_export(benchmark.make_member_export(2000), path)
+    plain = pd.read_csv(path)
+    for spec in registry.REPORTS:
+        if registry.missing_columns(spec, plain.columns):
+            continue
+        profiled = loaders.load_export(path, profile=spec.profile, cache=None)
+        assert set(profiled.columns) == set(spec.required_columns)
+        params = {
+            registry.CLUB: functions.CLUB_LIST[0],
+            registry.END_DATE: benchmark.BENCHMARK_DATE,
+        }
+        expected = registry.run(spec, plain, params)
+        result = registry.run(spec, profiled, params)
+        assert rendering.to_json(result) == rendering.to_json(expected), spec.name
+
+
+def test_header_is_found_below_title_rows_on_a_later_sheet(tmp_path):
+    path = str(tmp_path / "members.xlsx")
+    members = benchmark.make_member_export(20)
+    with pd.ExcelWriter(path) as writer:
+        pd.DataFrame({"Notes": ["Exported for finance"]}).to_excel(
+            writer, sheet_name="Notes", index=False
+        )
+        members.to_excel(writer, sheet_name="Members", index=False, startrow=2)
+
+    spec = registry.get("Current Members")
+    location = registry.header_location(spec, path)
+    assert location == loaders.HeaderLocation(sheet=1, skiprows=2)
+    df = registry.load(spec, [path])
+    assert list(df.columns) == list(spec.required_columns)
+    assert df["Club"].astype(str).tolist() == members["Club"].tolist()
+
+
+def test_header_falls_back_to_the_first_row(tmp_path):
+    path = str(tmp_path / "group_fitness.csv")
+    benchmark.write_export(benchmark.make_group_fitness_export(10), path, skiprows=1)
+    gf_columns = registry.get("Group Fitness Summary").required_columns
+    assert loaders.header_location(path, [gf_columns]) == loaders.HeaderLocation(0, 1)
+    # No scanned row holds these columns
+    assert loaders.header_location(path, [["Club", "End date"]]) == (
+        loaders.HeaderLocation()
+    )
+
+
+def test_header_names_match_pandas():
+    assert loaders.header_names(["Club", None, "Club", "", "Club"]) == [
+        "Club",
+        "Unnamed: 1",
+        "Club.1",
+        "Unnamed: 3",
+        "Club.2",
+    ]
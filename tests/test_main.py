@@ -0,0 +1,80 @@
+import threading
+
+import pytest
+
+pytest.importorskip("PySide6.QtWidgets")
+
+import benchmark
+import functions
+import main
+import registry
+import rendering
+
+CLUB = functions.CLUB_LIST[0]
+END_DATE = benchmark.BENCHMARK_DATE
+PARAMS = {registry.CLUB: CLUB, registry.END_DATE: END_DATE}
+
+
+@pytest.fixture
+def export_path(tmp_path):
+    path = str(tmp_path / "members.csv")
+    benchmark.write_export(benchmark.make_member_export(300), path)
+    return path
+
+
+def run_worker(worker: main.ReportWorker, on_pool: bool = False) -> dict:
+    """Signal name -> [arguments of each emit] for one run of worker."""
+    emitted = {}
+    for name in ("progress", "loaded", "finished", "failed", "profiled", "cancelled"):
+        # Direct, so each emit is recorded on the thread that made it
+        getattr(worker.signals, name).connect(
+            lambda *args, name=name: emitted.setdefault(name, []).append(
+                (threading.get_ident(), *args)
+            ),
+            main.Qt.ConnectionType.DirectConnection,
+        )
+    if on_pool:
+        pool = main.QThreadPool()
+        pool.start(worker)
+        assert pool.waitForDone(30_000)
+    else:
+        worker.run()
+    return emitted
+
+
+def test_worker_runs_report_off_the_calling_thread(export_path):
+    spec = registry.get("Current Members")
+    worker = main.ReportWorker(7, [export_path], spec, PARAMS)
+    worker.setAutoDelete(False)
+    emitted = run_worker(worker, on_pool=True)
+
+    [(thread, job_id, result)] = emitted["finished"]
+    assert job_id == 7
+    assert thread != threading.get_ident()
+    expected = registry.run(spec, registry.load(spec, [export_path]), PARAMS)
+    assert rendering.to_json(result) == rendering.to_json(expected)
+    assert len(emitted["loaded"][0][2]) == 300
+    assert emitted["progress"][-1][1:] == (7, 100, "Done.")
+    assert "failed" not in emitted
+
+
+def test_cancelled_worker_reports_no_result(export_path):
+    worker = main.ReportWorker(1, [export_path], registry.get("Current Members"), PARAMS)
+    worker.cancel()
+    emitted = run_worker(worker)
+    assert [args[1:] for args in emitted["cancelled"]] == [(1,)]
+    assert "finished" not in emitted
+
+
+@pytest.mark.parametrize(
+    "report, stage",
+    [("Booking Zones Analysis", "report"), ("Current Members", "load")],
+)
+def test_failures_name_their_stage(export_path, tmp_path, report, stage):
+    path = export_path if stage == "report" else str(tmp_path / "missing.csv")
+    worker = main.ReportWorker(2, [path], registry.get(report), PARAMS)
+    emitted = run_worker(worker)
+    [(_, job_id, failed_stage, error)] = emitted["failed"]
+    assert (job_id, failed_stage) == (2, stage)
+    assert isinstance(error, Exception)
+    assert "finished" not in emitted
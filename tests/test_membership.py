@@ -0,0 +1,133 @@
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+import benchmark
+import functions
+import membership
+
+
+def _member_export():
+    return pd.DataFrame(
+        {
+            "Name": ["Ann", "Bo", "Cy"],
+            "Last name": ["A", "B", "C"],
+            "Email": ["a@example.com", "b@example.com", "c@example.com"],
+            "Mobile number": [1, 2, 3],
+            "Club": ["X", "X", "Y"],
+            "Payment plan type": ["Upfront", "Fortnightly-Fixed", "Upfront"],
+            "Payment Plan Name": ["Plan"] * 3,
+            "Join date": ["2024-01-05", "2024-06-10", "2024-06-20"],
+            "End date": ["2024-06-30", "", "2025-01-01"],
+        }
+    )
+
+
+def test_each_date_column_is_parsed_once_per_frame():
+    df = _member_export()
+    functions.current_members(df, "X", "2024-06-15")
+    functions.new_members(df, "X", "2024-06-30")
+    functions.generate_ending_members_report(df, "2024-06-30")
+    parsed = [key for key in membership.frame_memo(df) if key[0] == "parsed_dates"]
+    assert sorted(parsed) == [("parsed_dates", "End date"), ("parsed_dates", "Join date")]
+
+
+def test_counts_memoized_for_a_bounded_number_of_dates():
+    df = _member_export()
+    for day in range(1, 29):
+        functions.current_members(df, "X", f"2024-06-{day:02d}")
+    recent = membership.frame_memo(df)[("active_member_counts", "recent")]
+    assert len(recent) == membership.RECENT_RESULTS_PER_FRAME
+    assert ("active_member_counts", pd.Timestamp("2024-06-28")) in recent
+
+
+def test_non_iso_and_date_time_end_dates_are_parsed():
+    df = _member_export()
+    df["End date"] = ["30/06/2024", "2024-06-30 00:00:00", "not a date"]
+    ending = functions.generate_ending_members_report(df, "2024-06-30")
+    assert list(ending["Name"]) == ["Ann", "Bo"]
+    # Both have ended by July; the unparseable end date counts as no end date
+    active = membership.active_member_counts(df, "2024-07-01")
+    assert membership.club_count(active, "X", membership.TOTAL_COLUMN) == 0
+    assert membership.club_count(active, "Y", membership.TOTAL_COLUMN) == 1
+    joined = membership.new_member_counts(df, "2024-06-15")
+    assert membership.club_count(joined, "X", membership.TOTAL_COLUMN) == 1
+
+
+def test_threads_share_one_memoized_result():
+    df = _member_export()
+    barrier = threading.Barrier(8)
+
+    def compute():
+        barrier.wait(5)  # Every thread misses the memo before any stores
+        return object()
+
+    with ThreadPoolExecutor(8) as pool:
+        results = list(
+            pool.map(lambda _: membership.memoized(df, ("shared",), compute), range(8))
+        )
+    assert all(result is results[0] for result in results)
+    assert membership.frame_memo(df)[("shared",)] is results[0]
+
+
+def _row_filter_counts(df, club, end_date, joined_from=None):
+    """Fortnightly-Fixed and total target-plan members, filtered row by row."""
+    end_date = pd.Timestamp(end_date)
+    end_dates = pd.to_datetime(df["End date"], errors="coerce")
+    rows = (df["Club"] == club) & (end_dates.isna() | (end_dates > end_date))
+    if joined_from is not None:
+        join_dates = pd.to_datetime(df["Join date"], errors="coerce")
+        rows &= (join_dates >= joined_from) & (join_dates <= end_date)
+    plans = df["Payment plan type"][rows]
+    return (
+        int((plans == membership.TARGET_PAYMENT_PLANS[0]).sum()),
+        int(plans.isin(membership.TARGET_PAYMENT_PLANS).sum()),
+    )
+
+
+def test_grouped_counts_match_row_filters_for_every_club():
+    df = benchmark.make_member_export(20_000)
+    end_dates = ["2024-05-31", benchmark.BENCHMARK_DATE]
+    for end_date, club in itertools.product(
+        end_dates, [*functions.CLUB_LIST, "No Such Club"]
+    ):
+        current = dict(functions.current_members(df, club, end_date).metrics)
+        assert (
+            current["FORTNIGHTLY-FIXED MEMBERS"],
+            current["TOTAL MEMBERS"],
+        ) == _row_filter_counts(df, club, end_date)
+        new = dict(functions.new_members(df, club, end_date).metrics)
+        month_start = pd.Timestamp(end_date).replace(day=1)
+        assert (
+            new["NEW FORTNIGHTLY-FIXED MEMBERS"],
+            new["TOTAL NEW MEMBERS"],
+        ) == _row_filter_counts(df, club, end_date, month_start)
+    # One grouped pass per report and date, shared by every club
+    recent = membership.frame_memo(df)[("new_member_counts", "recent")]
+    assert len(recent) == len(end_dates)
+
+
+def test_active_member_series_matches_counting_each_date():
+    df = benchmark.make_member_export(3000)
+    df.loc[::50, "Join date"] = None  # Joined before the export began
+    series = membership.active_member_series(df, "2023-01-01", "2024-06-30", freq="W")
+
+    join_dates = pd.to_datetime(df["Join date"])
+    end_dates = pd.to_datetime(df["End date"])
+    valid = end_dates.isna() | join_dates.isna() | (end_dates > join_dates)
+    for date in series.index[::7]:
+        active = (
+            valid
+            & (join_dates.isna() | (join_dates <= date))
+            & (end_dates.isna() | (end_dates > date))
+        )
+        expected = active.groupby([df["Club"], df["Payment plan type"]]).sum()
+        for (club, plan), count in expected.items():
+            assert series.at[date, (club, plan)] == count
+        for club in functions.CLUB_LIST:
+            plans = membership.TARGET_PAYMENT_PLANS
+            assert series.at[date, (club, membership.TOTAL_COLUMN)] == sum(
+                expected.get((club, plan), 0) for plan in plans
+            )
@@ -0,0 +1,75 @@
+import json
+import threading
+
+import benchmark
+import functions
+import profiling
+
+
+def test_stages_nest_and_total_the_top_level():
+    with profiling.profiled("run") as profile:
+        with profiling.stage("load", 10) as load:
+            with profiling.stage("parse"):
+                pass
+            load.rows = 12
+        with profiling.stage("report"):
+            pass
+    assert [(r.name, r.depth) for r in profile.stages] == [
+        ("load", 0),
+        ("parse", 1),
+        ("report", 0),
+    ]
+    assert profile.stages[0].rows == 12
+    assert (
+        profile.total_seconds == profile.stages[0].seconds + profile.stages[2].seconds
+    )
+    assert all(record.seconds >= 0 for record in profile.stages)
+
+
+def test_nothing_is_recorded_without_an_active_profile():
+    with profiling.stage("load") as record:
+        assert record is None
+    with profiling.profiled() as profile:
+        thread = threading.Thread(
+            target=lambda: functions.new_members_trend(
+                benchmark.make_member_export(100), benchmark.BENCHMARK_DATE
+            )
+        )
+        thread.start()
+        thread.join()
+    assert profile.stages == []  # Other threads record into their own profile
+
+
+def test_report_stages_are_profiled():
+    df = benchmark.make_member_export(500)
+    with profiling.profiled("Current Members") as profile:
+        functions.current_members(df, functions.CLUB_LIST[0], benchmark.BENCHMARK_DATE)
+    assert {"parse", "filter", "aggregate"} <= {r.name for r in profile.stages}
+    assert any(r.rows == 500 for r in profile.stages)
+
+
+def test_profiles_are_appended_to_the_log(tmp_path, monkeypatch):
+    monkeypatch.setenv(
+        "REPORTING_PROFILE_LOG", str(tmp_path / "logs" / "profile.jsonl")
+    )
+    for report in ("Current Members", "New Members"):
+        with profiling.profiled(report) as profile:
+            with profiling.stage("report", 5):
+                pass
+        profiling.write_log(profile, report=report, files=["members.xlsx"])
+    with open(tmp_path / "logs" / "profile.jsonl", encoding="utf-8") as f:
+        entries = [json.loads(line) for line in f]
+    assert [entry["report"] for entry in entries] == ["Current Members", "New Members"]
+    assert entries[0]["files"] == ["members.xlsx"]
+    assert entries[0]["stages"][0]["name"] == "report"
+    assert entries[0]["stages"][0]["rows"] == 5
+
+
+def test_timing_footer_expands_to_a_stage_table():
+    with profiling.profiled() as profile:
+        with profiling.stage("load", 1234):
+            pass
+    collapsed = profiling.timing_footer_html(profile, False, "#timings")
+    expanded = profiling.timing_footer_html(profile, True, "#timings")
+    assert "href='#timings'" in collapsed and "<table" not in collapsed
+    assert "<table" in expanded and "1,234" in expanded
@@ -0,0 +1,120 @@
+import pandas as pd
+import pytest
+
+import benchmark
+import functions
+import registry
+import rendering
+
+END_DATE = benchmark.BENCHMARK_DATE
+# Dataset each report is run on
+DATASETS = {
+    "Current Members": "members",
+    "New Members": "members",
+    "New Members Trend (12 Months)": "members",
+    "Technogym Reporting (Consults/PT)": "technogym",
+    "Group Fitness Summary": "group_fitness",
+    "Booking Zones Analysis": "bookings",
+    "Ending Members Report": "members",
+    "Ending Members Lookahead": "members",
+}
+
+
+@pytest.fixture(scope="module")
+def exports(tmp_path_factory):
+    """Dataset -> path of a small synthetic export."""
+    directory = str(tmp_path_factory.mktemp("exports"))
+    return {
+        dataset: benchmark.synthetic_export(dataset, 300, directory)
+        for dataset in benchmark.DATASETS
+    }
+
+
+def test_every_report_is_registered_once():
+    assert set(DATASETS) == {spec.name for spec in registry.REPORTS}
+    assert len(registry.REPORTS_BY_NAME) == len(registry.REPORTS)
+    with pytest.raises(ValueError, match="Unknown report"):
+        registry.get("Members Report")
+
+
+@pytest.mark.parametrize("name", list(DATASETS))
+def test_registry_run_matches_calling_the_function(name, exports):
+    spec = registry.get(name)
+    df = registry.load(spec, [exports[DATASETS[name]]])
+    assert set(df.columns) == set(spec.required_columns)
+    params = {registry.CLUB: functions.CLUB_LIST[0], registry.END_DATE: END_DATE}
+    args = registry.report_args(spec, params)
+    expected = spec.function(df, *args)
+    result = registry.run(spec, df, params, engine="pandas")
+    assert rendering.to_json(result) == rendering.to_json(expected)
+    assert spec.output == (
+        registry.DATAFRAME if isinstance(result, pd.DataFrame) else registry.HTML
+    )
+
+
+def test_report_args_fill_defaults_and_name_missing_parameters():
+    lookahead = registry.get("Ending Members Lookahead")
+    assert registry.report_args(lookahead, {registry.END_DATE: END_DATE}) == (
+        None,
+        END_DATE,
+        functions.ENDING_LOOKAHEAD_DAYS,
+    )
+    assert registry.report_args(
+        lookahead, {registry.END_DATE: END_DATE, registry.DAYS: 3, "extra": 1}
+    ) == (None, END_DATE, 3)
+    with pytest.raises(ValueError, match="requires: Target Club, End Date"):
+        registry.report_args(registry.get("Current Members"), {registry.CLUB: ""})
+    assert (
+        registry.report_args(registry.get("Technogym Reporting (Consults/PT)"), {})
+        == ()
+    )
+
+
+def test_only_reports_needing_a_club_run_per_club():
+    per_club = {spec.name for spec in registry.REPORTS if registry.runs_per_club(spec)}
+    assert per_club == {"Current Members", "New Members"}
+
+
+def test_pack_runs_every_report_from_one_load(exports):
+    specs = [registry.get(name) for name in registry.DEFAULT_PACK]
+    specs.append(registry.get("Booking Zones Analysis"))
+    clubs = functions.CLUB_LIST[:2]
+    pack = registry.pack(specs, clubs)
+    assert pack.parameter_names == (registry.END_DATE,)
+
+    df = registry.load(pack, [exports["members"]])
+    assert set(df.columns) == set(pack.required_columns) - {
+        *registry.get("Booking Zones Analysis").required_columns
+    } | {"Club"}
+    result = registry.run(pack, df, {registry.END_DATE: END_DATE})
+    sections = dict(result.sections)
+    assert list(sections) == [spec.name for spec in specs]
+
+    for name in ("Current Members", "New Members"):
+        assert [club for club, _ in sections[name].sections] == clubs
+        for club, section in sections[name].sections:
+            expected = registry.run(
+                registry.get(name),
+                df,
+                {registry.CLUB: club, registry.END_DATE: END_DATE},
+            )
+            assert rendering.to_json(section) == rendering.to_json(expected)
+    ending = registry.run(registry.get("Ending Members Report"), df, {})
+    assert rendering.to_json(sections["Ending Members Report"]) == rendering.to_json(
+        rendering.as_result(ending)
+    )
+    assert sections["Booking Zones Analysis"].note.startswith("Skipped")
+
+
+def test_pack_notes_a_failing_report_and_runs_the_rest(exports):
+    pack = registry.pack(
+        [registry.get("Current Members"), registry.get("Ending Members Report")],
+        functions.CLUB_LIST[:1],
+    )
+    df = registry.load(pack, [exports["members"]])
+    sections = dict(registry.run(pack, df, {registry.END_DATE: "30/06/2024"}).sections)
+    assert sections["Current Members"].note.startswith("Error: ValueError")
+    assert sections["Ending Members Report"].note.startswith("Error: ValueError")
+
+    with pytest.raises(ValueError, match="End Date"):
+        registry.run(pack, df, {})
@@ -0,0 +1,109 @@
+import io
+import json
+
+import pandas as pd
+import pytest
+
+import rendering
+from rendering import ReportResult
+
+
+@pytest.fixture
+def result():
+    table = pd.DataFrame(
+        {
+            "Name": ["Ann <A>", None],
+            "End date": pd.to_datetime(
+                ["2024-06-01", "2024-06-02 09:30"], format="ISO8601"
+            ),
+            "Hours": [1.5, 2.0],
+        }
+    )
+    return ReportResult(
+        sections=(
+            ("Summary", ReportResult(metrics=(("TOTAL", 3),), note="as of today")),
+            ("Ending", ReportResult(table=table)),
+        )
+    )
+
+
+def test_format_value():
+    assert rendering.format_value(None) == ""
+    assert rendering.format_value(float("nan")) == ""
+    assert rendering.format_value(pd.NaT) == ""
+    assert rendering.format_value(2.0) == "2"
+    assert rendering.format_value(2.345) == "2.35"
+    assert rendering.format_value(pd.Timestamp("2024-06-01")) == "2024-06-01"
+    assert (
+        rendering.format_value(pd.Timestamp("2024-06-01 09:30")) == "2024-06-01 09:30"
+    )
+
+
+def test_as_result():
+    table = pd.DataFrame({"a": [1]})
+    assert rendering.as_result(table).table is table
+    result = ReportResult(metrics=(("A", 1),))
+    assert rendering.as_result(result) is result
+    assert result.metric("A") == 1
+    with pytest.raises(KeyError):
+        result.metric("B")
+    with pytest.raises(TypeError):
+        rendering.as_result("<p>text</p>")
+
+
+def test_html_escapes_text_and_aligns_numbers(result):
+    text = rendering.to_html(result)
+    assert "<h2>Summary</h2>" in text and "<h2>Ending</h2>" in text
+    assert "<b>TOTAL:</b>" in text and "<i>(as of today)</i>" in text
+    assert "Ann &lt;A&gt;" in text and "<A>" not in text
+    assert "<td align='right' style='padding: 5px 0 5px 20px;'>1.50</td>" in text
+    assert "2024-06-02 09:30" in text
+    assert "No rows." in rendering.to_html(pd.DataFrame({"a": []}))
+
+
+def test_csv_stacks_sections(result):
+    frame = pd.read_csv(io.StringIO(rendering.to_csv(result)))
+    assert list(frame.columns[:3]) == ["Section", "Metric", "Value"]
+    assert frame["Section"].tolist() == ["Summary", "Ending", "Ending"]
+
+    table = pd.DataFrame({"a": [1, 2]})
+    assert rendering.to_csv(table) == "a\n1\n2\n"
+
+
+def test_json(result):
+    data = json.loads(rendering.to_json(result))
+    assert data["sections"]["Summary"] == {
+        "metrics": {"TOTAL": 3},
+        "note": "as of today",
+    }
+    assert data["sections"]["Ending"]["table"] == [
+        {"Name": "Ann <A>", "End date": "2024-06-01", "Hours": 1.5},
+        {"Name": None, "End date": "2024-06-02 09:30", "Hours": 2.0},
+    ]
+
+
+def test_write_picks_the_format_from_the_extension(result, tmp_path):
+    for name in ("r.csv", "r.json", "r.html", "r.xlsx", "r.txt"):
+        rendering.write(result, str(tmp_path / name))
+    assert (tmp_path / "r.csv").read_text().startswith("Section,")
+    assert (tmp_path / "r.txt").read_text() == (tmp_path / "r.csv").read_text()
+    assert json.loads((tmp_path / "r.json").read_text())["sections"]
+    assert "<h2>Ending</h2>" in (tmp_path / "r.html").read_text()
+    sheets = pd.read_excel(tmp_path / "r.xlsx", sheet_name=None)
+    assert list(sheets) == ["Summary", "Ending"]
+    assert sheets["Ending"]["Hours"].tolist() == [1.5, 2.0]
+
+    rendering.write(result, str(tmp_path / "out"), "json")
+    assert json.loads((tmp_path / "out").read_text())["sections"]
+    with pytest.raises(ValueError):
+        rendering.write(result, str(tmp_path / "r.pdf"), "pdf")
+
+
+def test_sheet_names_are_valid_and_unique():
+    used = set()
+    assert rendering._sheet_name("Ending Members Report [Waurn Ponds]", used) == (
+        "Ending Members Report  Waurn Po"
+    )
+    assert rendering._sheet_name("Ending Members Report [Waurn Ponds]", used) == (
+        "Ending Members Report  Waurn 2"
+    )
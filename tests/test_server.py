@@ -0,0 +1,135 @@
+import asyncio
+import http.client
+import json
+import queue
+import threading
+import urllib.parse
+
+import pytest
+
+import batch
+import benchmark
+import functions
+import registry
+import rendering
+import server
+
+CLUB = functions.CLUB_LIST[0]
+END_DATE = benchmark.BENCHMARK_DATE
+
+
+@pytest.fixture
+def address(tmp_path):
+    """(host, port) of a server running on an ephemeral port."""
+    service = server.ReportService(str(tmp_path / "uploads"))
+    messages = queue.Queue()
+    loop = asyncio.new_event_loop()
+    serving = loop.create_task(server.ReportServer(service, messages.put).serve(port=0))
+
+    def run() -> None:
+        try:
+            loop.run_until_complete(serving)
+        except asyncio.CancelledError:
+            pass
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    try:
+        url = messages.get(timeout=10).split()[3]  # "Serving reports on http://..."
+        netloc = urllib.parse.urlsplit(url)
+        yield netloc.hostname, netloc.port
+    finally:
+        loop.call_soon_threadsafe(serving.cancel)
+        thread.join(10)
+        loop.close()
+        service.close()
+
+
+def request(address, method, target, body=None, headers=None):
+    """(status, headers, body) of one request on a new connection."""
+    connection = http.client.HTTPConnection(*address, timeout=60)
+    try:
+        connection.request(method, urllib.parse.quote(target, safe="/?=&"), body, headers or {})
+        response = connection.getresponse()
+        return response.status, dict(response.getheaders()), response.read()
+    finally:
+        connection.close()
+
+
+@pytest.fixture
+def export_path(tmp_path):
+    path = str(tmp_path / "members.csv")
+    benchmark.write_export(benchmark.make_member_export(200), path)
+    return path
+
+
+def test_uploaded_export_is_reported_on(address, export_path):
+    with open(export_path, "rb") as f:
+        status, _, body = request(address, "POST", "/exports?name=members.csv", f.read())
+    assert status == 201
+    export_id = json.loads(body)["id"]
+
+    target = (
+        f"/reports/Current Members?export={export_id}"
+        f"&club={CLUB}&end_date={END_DATE}&format=json"
+    )
+    status, headers, body = request(address, "GET", target)
+    assert status == 200
+    assert headers["Content-Type"] == "application/json"
+    assert headers["X-Cache"] == "miss"
+    spec = registry.get("Current Members")
+    expected = registry.run(
+        spec,
+        batch.load_export(export_path),
+        {registry.CLUB: CLUB, registry.END_DATE: END_DATE},
+    )
+    assert json.loads(body) == json.loads(rendering.to_json(expected))
+
+    status, headers, repeat = request(address, "GET", target)
+    assert (status, headers["X-Cache"], repeat) == (200, "hit", body)
+
+    status, _, body = request(address, "GET", "/exports")
+    assert status == 200
+    assert json.loads(body)[0]["rows"] == 200
+
+
+def test_error_statuses(address, export_path):
+    with open(export_path, "rb") as f:
+        contents = f.read()
+    _, _, body = request(address, "POST", "/exports?name=members.csv", contents)
+    export_id = json.loads(body)["id"]
+
+    cases = [
+        ("GET", "/nowhere", None, 404),
+        ("GET", "/reports/No Such Report?export=" + export_id, None, 404),
+        ("GET", "/reports/Current Members", None, 400),
+        ("GET", "/reports/Current Members?export=unknown", None, 404),
+        ("GET", f"/reports/Current Members?export={export_id}&format=pdf", None, 400),
+        # end_date is required
+        ("GET", f"/reports/Current Members?export={export_id}&club={CLUB}", None, 400),
+        (
+            "GET",
+            f"/reports/Ending Members Lookahead?export={export_id}"
+            f"&end_date={END_DATE}&days=soon",
+            None,
+            400,
+        ),
+        ("GET", f"/reports/Booking Zones Analysis?export={export_id}", None, 400),
+        ("POST", "/exports?name=members.pdf", contents, 400),
+        ("POST", "/exports?name=members.csv", b"", 400),
+        ("DELETE", "/exports", None, 405),
+    ]
+    for method, target, body, expected in cases:
+        status, headers, payload = request(address, method, target, body)
+        assert (method, target, status) == (method, target, expected)
+        assert headers["Content-Type"] == "application/json"
+        assert json.loads(payload)["error"]
+
+    status, _, _ = request(
+        address,
+        "POST",
+        "/exports?name=members.csv",
+        iter([contents]),
+        {"Transfer-Encoding": "chunked"},
+    )
+    assert status == 411
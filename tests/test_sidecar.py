@@ -0,0 +1,81 @@
+import os
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+import sidecar
+
+
+def test_category_columns_are_stored_as_categories():
+    df = pd.DataFrame(
+        {
+            "Club": pd.Series(["A", "B", "A"], dtype="str"),
+            "Plan": pd.Series(["x", 1, None], dtype=object),
+            "Name": pd.Series(["a", "b", "c"], dtype="str"),
+        }
+    )
+    stored = sidecar.normalize_for_storage(df, ("Club", "Plan"))
+    assert isinstance(stored["Club"].dtype, pd.CategoricalDtype)
+    assert isinstance(stored["Plan"].dtype, pd.CategoricalDtype)
+    assert not isinstance(stored["Name"].dtype, pd.CategoricalDtype)
+    assert stored["Club"].tolist() == ["A", "B", "A"]
+
+
+def test_prune_deletes_least_recently_used_sidecars(tmp_path, monkeypatch):
+    monkeypatch.setenv("REPORTING_SIDECAR_DIR", str(tmp_path))
+    paths = []
+    for age in range(4):
+        path = tmp_path / f"{age}-h0-v{sidecar.SIDECAR_FORMAT_VERSION}.feather"
+        path.write_bytes(b"x" * 100)
+        mtime = 1_000_000 - age * 100
+        os.utime(path, (mtime, mtime))
+        paths.append(path)
+
+    assert sidecar.prune_sidecars(max_bytes=250, keep=str(paths[3])) == 2
+    assert [path.exists() for path in paths] == [True, False, False, True]
+
+
+def test_written_sidecar_is_read_back_and_cache_stays_capped(tmp_path, monkeypatch):
+    monkeypatch.setenv("REPORTING_SIDECAR_DIR", str(tmp_path))
+    df = sidecar.normalize_for_storage(pd.DataFrame({"Club": ["A", "B"]}), ("Club",))
+    first = sidecar.sidecar_path("a" * 64)
+    second = sidecar.sidecar_path("b" * 64)
+    assert sidecar.write_sidecar(df, first)
+    os.utime(first, (1_000_000, 1_000_000))
+    monkeypatch.setenv("REPORTING_SIDECAR_MAX_MB", str(os.path.getsize(first) / 2**20))
+    assert sidecar.write_sidecar(df, second)
+    assert not os.path.exists(first)
+    pd.testing.assert_frame_equal(sidecar.read_sidecar(second), df)
+
+
+def test_failed_write_is_logged(tmp_path, caplog):
+    blocker = tmp_path / "not-a-directory"
+    blocker.write_text("")
+    df = pd.DataFrame({"Club": ["A"]})
+    assert not sidecar.write_sidecar(df, str(blocker / "x.feather"))
+    assert "could not write sidecar" in caplog.text
+
+
+def test_export_is_parsed_once_then_read_from_its_sidecar(tmp_path, monkeypatch):
+    monkeypatch.setenv("REPORTING_SIDECAR_DIR", str(tmp_path / "sidecars"))
+    path = tmp_path / "members.csv"
+    path.write_text("Club,End date,Name\nA,2024-06-30,Ann\nB,,Bo\n")
+    parses = []
+
+    def reader():
+        parses.append(1)
+        return pd.read_csv(path)
+
+    first = sidecar.load_with_sidecar(str(path), None, reader, None, ("Club",))
+    second = sidecar.load_with_sidecar(str(path), None, reader, ("Club", "End date"))
+    assert len(parses) == 1
+    assert pd.api.types.is_datetime64_any_dtype(first["End date"])
+    assert isinstance(second["Club"].dtype, pd.CategoricalDtype)
+    pd.testing.assert_frame_equal(second, first[["Club", "End date"]])
+
+    # Different contents are a different sidecar
+    path.write_text("Club,End date,Name\nC,,Cy\n")
+    assert sidecar.load_with_sidecar(str(path), None, reader)["Club"].tolist() == ["C"]
+    assert len(parses) == 2
@@ -0,0 +1,46 @@
+import pandas as pd
+import pytest
+
+import functions
+import streaming
+
+END_DATE = "2024-06-30"
+
+
+@pytest.fixture
+def disjoint_chunks_csv(tmp_path):
+    """Member export whose two 2-row chunks share no (club, plan) combination."""
+    path = tmp_path / "members.csv"
+    pd.DataFrame(
+        {
+            "Club": ["A", "A", "B", "B"],
+            "Payment plan type": ["Upfront", "Upfront"]
+            + ["Fortnightly-Fixed", "Fortnightly-Fixed"],
+            "Join date": ["2024-06-03", "2023-01-01", "2024-06-10", "2024-06-20"],
+            "End date": ["", "2025-01-01", "", "2024-01-01"],
+        }
+    ).to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.mark.parametrize(
+    "report_function", [functions.current_members, functions.new_members]
+)
+@pytest.mark.parametrize("club", ["A", "B", "C"])
+def test_streamed_counts_match_whole_export(disjoint_chunks_csv, report_function, club):
+    df = pd.read_csv(disjoint_chunks_csv, dtype=str, keep_default_na=False)
+    streamed = streaming.run_streaming_report(
+        report_function, disjoint_chunks_csv, (club, END_DATE), chunk_rows=2
+    )
+    assert streamed == report_function(df, club, END_DATE)
+
+
+def test_aggregator_missing_a_method_cannot_be_created():
+    class UpdateOnly(streaming.ReportAggregator):
+        def update(self, chunk):
+            pass
+
+    with pytest.raises(TypeError):
+        UpdateOnly()
+    for aggregator in set(streaming.AGGREGATORS.values()):
+        assert not aggregator.__abstractmethods__
@@ -0,0 +1,127 @@
+import datetime as dt
+import os
+
+import pandas as pd
+import pandas.testing as tm
+import pytest
+
+import batch
+import benchmark
+import bookings
+import functions
+import rendering
+import warehouse
+
+END_DATE = benchmark.BENCHMARK_DATE
+WEIGHTS = bookings.weights_table(bookings.BUILTIN_ZONE_WEIGHTS)
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = warehouse.connect(str(tmp_path / "reports.db"))
+    yield conn
+    conn.close()
+
+
+def ingest(conn, tmp_path, dataset: str, rows: int = 2000, date: str = END_DATE):
+    """Writes a synthetic export, loads it and stores it; returns (frame, import id)."""
+    generator, skiprows = benchmark.DATASETS[dataset]
+    path = str(tmp_path / f"{dataset}.csv")
+    benchmark.write_export(generator(rows), path, skiprows)
+    df = batch.load_export(path)
+    import_id, kinds = warehouse.ingest_export(conn, df, path, date)
+    assert kinds == [dataset]
+    return df, import_id
+
+
+def test_member_reports_match_the_export(conn, tmp_path):
+    df, import_id = ingest(conn, tmp_path, "members")
+    for club in functions.CLUB_LIST:
+        for sql_report, report in (
+            (warehouse.current_members, functions.current_members),
+            (warehouse.new_members, functions.new_members),
+        ):
+            assert rendering.to_json(
+                sql_report(conn, import_id, club, END_DATE)
+            ) == rendering.to_json(report(df, club, END_DATE))
+
+    ending_day = dt.date.fromisoformat("2024-07-03")
+    for days in (0, 7):
+        last_day = ending_day + dt.timedelta(days=days)
+        expected = functions.ending_members_between(
+            df, ending_day.isoformat(), last_day.isoformat()
+        )
+        stored = warehouse.ending_members(conn, import_id, ending_day, days)
+        assert len(stored) > 0
+        assert stored["Name"].tolist() == expected["Name"].tolist()
+        assert stored["Email"].tolist() == expected["Email"].astype(str).tolist()
+        assert (stored["End date"].to_numpy() == expected["End date"].to_numpy()).all()
+
+
+def test_activity_reports_match_the_export(conn, tmp_path):
+    df, import_id = ingest(conn, tmp_path, "technogym")
+    assert rendering.to_json(warehouse.technogym_reporting(conn, import_id)) == (
+        rendering.to_json(functions.technogym_reporting(df))
+    )
+    df, import_id = ingest(conn, tmp_path, "group_fitness")
+    assert rendering.to_json(warehouse.group_fitness(conn, import_id)) == (
+        rendering.to_json(functions.groupFitness(df))
+    )
+    df, import_id = ingest(conn, tmp_path, "bookings")
+    stored = warehouse.booking_zones(conn, import_id, WEIGHTS)
+    expected = functions.booking_zones(df, WEIGHTS)
+    tm.assert_frame_equal(
+        stored.astype({"Club": str, "Club Zone Type Name": str}),
+        expected.astype({"Club": str, "Club Zone Type Name": str}).reset_index(
+            drop=True
+        ),
+    )
+    assert stored.attrs["unparsed_rows"] == expected.attrs["unparsed_rows"]
+
+
+def test_imports_are_replaced_and_found_by_date(conn, tmp_path):
+    ingest(conn, tmp_path, "members", 100)
+    _, again = ingest(conn, tmp_path, "members", 100)  # Same contents and date
+    assert warehouse.list_imports(conn)["import_id"].tolist() == [again]
+    assert conn.execute("SELECT COUNT(*) FROM members").fetchone()[0] == 100
+    _, earlier = ingest(conn, tmp_path, "members", 100, "2023-06-30")
+    assert warehouse.latest_import(conn, "members") == again
+    assert warehouse.latest_import(conn, "members", "2024-01-01") == earlier
+    assert warehouse.latest_import(conn, "members", "2020-01-01") is None
+    assert warehouse.latest_import(conn, "bookings") is None
+
+
+def test_imports_persist_across_connections(tmp_path):
+    path = str(tmp_path / "reports.db")
+    conn = warehouse.connect(path)
+    _, import_id = ingest(conn, tmp_path, "members", 100)
+    conn.close()
+    conn = warehouse.connect(path)
+    try:
+        assert warehouse.list_imports(conn)["row_count"].tolist() == [100]
+        assert warehouse.latest_import(conn, "members") == import_id
+    finally:
+        conn.close()
+
+
+def test_batch_reruns_reports_from_the_warehouse(tmp_path):
+    path = str(tmp_path / "members.csv")
+    benchmark.write_export(benchmark.make_member_export(2000), path)
+    db = str(tmp_path / "reports.db")
+    date = "2024-07-03"
+    output_dir = tmp_path / "out"
+    options = ["-o", str(output_dir), "--date", date]
+    assert batch.main([path, *options, "--warehouse", db]) == 0
+    assert batch.main(["--from-warehouse", db, *options]) == 0
+
+    for report in ("Ending_Members_Report", "Ending_Members_Lookahead"):
+        [name] = [
+            name
+            for name in os.listdir(output_dir / "members")
+            if name.startswith(report)
+        ]
+        exported = pd.read_csv(output_dir / "members" / name)
+        stored = pd.read_csv(output_dir / "warehouse" / name)
+        assert len(exported) > 0
+        tm.assert_frame_equal(stored, exported)
+    assert (output_dir / "warehouse" / "Member_History.csv").exists()
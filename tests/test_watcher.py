@@ -0,0 +1,140 @@
+import json
+import os
+import threading
+
+import benchmark
+import watcher
+
+END_DATE = benchmark.BENCHMARK_DATE
+
+
+def test_queued_export_is_replaced_by_its_newer_version(tmp_path, monkeypatch):
+    for name in ("a.csv", "b.csv"):
+        (tmp_path / name).write_text("Club\nX\n")
+    release = threading.Event()
+    processed = []
+
+    def run_export(path, *args, **kwargs):
+        processed.append((os.path.basename(path), os.path.getsize(path)))
+        release.wait(10)
+        return []
+
+    monkeypatch.setattr(watcher.batch, "run_export", run_export)
+    export_watcher = watcher.ExportWatcher(
+        str(tmp_path),
+        str(tmp_path / "out"),
+        workers=1,
+        settle_seconds=0,
+        process_existing=True,
+        log=lambda message: None,
+    )
+    try:
+        export_watcher.poll()  # Both seen
+        export_watcher.poll()  # Both settled: one runs, one is queued
+        [(queued, _, _)] = export_watcher._ready
+        with open(queued, "a") as f:
+            f.write("Y\n")
+        export_watcher.poll()  # The queued version is superseded
+        export_watcher.poll()  # ... and the newer one settles
+        release.set()
+        while not export_watcher.idle:
+            export_watcher.wait(1)
+        export_watcher.poll()  # The version processed is the current one...
+        export_watcher.poll()
+        assert export_watcher.idle  # ... so it is not picked up again
+    finally:
+        release.set()
+        export_watcher.close()
+
+    name = os.path.basename(queued)
+    assert [entry for entry in processed if entry[0] == name] == [
+        (name, os.path.getsize(queued))
+    ]
+    assert export_watcher.processed == 2
+
+
+def _watcher(folder, **kwargs):
+    kwargs.setdefault("settle_seconds", 0)
+    return watcher.ExportWatcher(str(folder), log=lambda message: None, **kwargs)
+
+
+def _wait_until_idle(export_watcher):
+    while not export_watcher.idle:
+        export_watcher.poll()
+        export_watcher.wait(1)
+
+
+def test_once_writes_the_reports_for_each_export(tmp_path, monkeypatch, capsys):
+    monkeypatch.setenv("REPORTING_PROFILE_LOG", str(tmp_path / "profile.jsonl"))
+    folder = tmp_path / "exports"
+    folder.mkdir()
+    export = benchmark.make_member_export(300)
+    benchmark.write_export(export, str(folder / "members.csv"))
+    (folder / "~$members.xlsx").write_text("lock")
+    (folder / "notes.txt").write_text("not an export")
+
+    argv = [str(folder), "-o", str(tmp_path / "out"), "--once", "--settle", "0"]
+    assert watcher.main(argv + ["--date", END_DATE, "--interval", "0.01"]) == 0
+    assert os.listdir(tmp_path / "out") == ["members"]
+    assert (tmp_path / "out" / "members" / "summary.html").exists()
+    assert "members.csv: done in" in capsys.readouterr().out
+    [entry] = (tmp_path / "profile.jsonl").read_text().splitlines()
+    assert json.loads(entry)["report"] == "watch folder"
+
+    (folder / "broken.csv").write_bytes(b"\xff\xfe\x00not,a\nmember export")
+    assert watcher.main(argv + ["--interval", "0.01"]) == 1
+
+
+def test_existing_exports_are_skipped_until_they_change(tmp_path, monkeypatch):
+    processed = []
+    monkeypatch.setattr(
+        watcher.batch,
+        "run_export",
+        lambda path, *args, **kwargs: processed.append(os.path.basename(path)) or [],
+    )
+    (tmp_path / "old.csv").write_text("Club\nX\n")
+    export_watcher = _watcher(tmp_path)
+    try:
+        _wait_until_idle(export_watcher)
+        assert processed == []
+
+        (tmp_path / "new.csv").write_text("Club\nX\n")
+        with open(tmp_path / "old.csv", "a") as f:
+            f.write("Y\n")
+        export_watcher.poll()  # Seen...
+        assert processed == [] and not export_watcher.idle
+        _wait_until_idle(export_watcher)  # ... settled and processed once
+        export_watcher.poll()
+        assert sorted(processed) == ["new.csv", "old.csv"]
+        assert export_watcher.processed == 2 and export_watcher.idle
+    finally:
+        export_watcher.close()
+
+
+def test_export_is_only_processed_after_it_settles(tmp_path, monkeypatch):
+    processed = []
+    monkeypatch.setattr(
+        watcher.batch,
+        "run_export",
+        lambda path, *args, **kwargs: processed.append(path) or [],
+    )
+    export_watcher = _watcher(tmp_path, settle_seconds=3600)
+    try:
+        (tmp_path / "members.csv").write_text("Club\n")
+        (tmp_path / "empty.csv").write_text("")
+        export_watcher.poll()
+        export_watcher.poll()
+        assert set(export_watcher._pending) == {
+            str(tmp_path / "members.csv"),
+            str(tmp_path / "empty.csv"),
+        }
+
+        (tmp_path / "members.csv").unlink()  # Removed before it settled
+        export_watcher.settle_seconds = 0
+        export_watcher.poll()
+        export_watcher.poll()
+        # An empty file is still being written, so it stays pending
+        assert list(export_watcher._pending) == [str(tmp_path / "empty.csv")]
+        assert processed == [] and not export_watcher._ready
+    finally:
+        export_watcher.close()
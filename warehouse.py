@@ -0,0 +1,506 @@
+import datetime as dt
+import os
+import sqlite3
+
+import pandas as pd
+
+import bookings
+import functions
+import membership
+import rendering
+import sidecar
+
+# --- Local Reporting Warehouse ---
+# Each export can be ingested into a SQLite file with the date it was taken, so
+# reports can be rerun (and compared across years) without the original Excel
+# files or a pandas load. Columns are stored already parsed: dates as
+# "YYYY-MM-DD HH:MM:SS" text (which sorts and compares correctly) or NULL where
+# the report functions would see NaT, and booking lengths in nanoseconds. The
+# SQL reports below return the same output as their functions.py counterparts.
+
+SCHEMA_VERSION = 1
+_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS imports (
+    import_id INTEGER PRIMARY KEY,
+    import_date TEXT NOT NULL,
+    file_name TEXT NOT NULL,
+    file_hash TEXT NOT NULL,
+    kinds TEXT NOT NULL,
+    row_count INTEGER NOT NULL,
+    imported_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS imports_by_date ON imports (import_date);
+
+CREATE TABLE IF NOT EXISTS members (
+    import_id INTEGER NOT NULL REFERENCES imports (import_id) ON DELETE CASCADE,
+    row_number INTEGER NOT NULL,
+    name TEXT,
+    last_name TEXT,
+    email TEXT,
+    mobile_number TEXT,
+    club TEXT,
+    plan_type TEXT,
+    plan_name TEXT,
+    join_date TEXT,
+    end_date TEXT
+);
+-- Covers the active-member counts (club, plan type, end date) without table reads
+CREATE INDEX IF NOT EXISTS members_by_club_plan
+    ON members (import_id, club, plan_type, end_date);
+CREATE INDEX IF NOT EXISTS members_by_join_date ON members (import_id, join_date);
+CREATE INDEX IF NOT EXISTS members_by_end_date ON members (import_id, end_date);
+
+CREATE TABLE IF NOT EXISTS bookings (
+    import_id INTEGER NOT NULL REFERENCES imports (import_id) ON DELETE CASCADE,
+    club TEXT,
+    zone TEXT,
+    facility TEXT,
+    length_ns INTEGER,
+    length_unparsed INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS bookings_by_club_zone ON bookings (import_id, club, zone);
+
+CREATE TABLE IF NOT EXISTS group_fitness (
+    import_id INTEGER NOT NULL REFERENCES imports (import_id) ON DELETE CASCADE,
+    club TEXT,
+    attendees REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS group_fitness_by_club ON group_fitness (import_id, club);
+
+CREATE TABLE IF NOT EXISTS technogym (
+    import_id INTEGER NOT NULL REFERENCES imports (import_id) ON DELETE CASCADE,
+    activity TEXT
+);
+CREATE INDEX IF NOT EXISTS technogym_by_activity ON technogym (import_id, activity);
+"""
+
+# Kind -> (table, columns the export must have)
+KINDS = {
+    "members": ("members", functions.CURRENT_MEMBERS_COLUMNS),
+    "bookings": ("bookings", functions.BOOKING_ZONES_COLUMNS),
+    "group_fitness": ("group_fitness", functions.GROUP_FITNESS_COLUMNS),
+    "technogym": ("technogym", functions.TECHNOGYM_COLUMNS),
+}
+
+
+def default_path() -> str:
+    """Warehouse file next to the sidecar cache. Override with REPORTING_WAREHOUSE."""
+    override = os.environ.get("REPORTING_WAREHOUSE")
+    if override:
+        return override
+    return os.path.join(os.path.dirname(sidecar.sidecar_dir()), "warehouse.sqlite3")
+
+
+def connect(path: str | None = None) -> sqlite3.Connection:
+    """Opens (creating if needed) the warehouse at path (default: default_path())."""
+    path = path or default_path()
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")  # Safe with WAL; much faster ingests
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version not in (0, SCHEMA_VERSION):
+        conn.close()
+        raise RuntimeError(
+            f"Warehouse {path} has schema version {version}, expected {SCHEMA_VERSION}"
+        )
+    conn.executescript(_SCHEMA)
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    return conn
+
+
+# --- Ingestion ---
+
+
+def export_kinds(df: pd.DataFrame) -> list[str]:
+    """Warehouse tables an export has the columns for."""
+    return [
+        kind
+        for kind, (_, required) in KINDS.items()
+        if all(col in df.columns for col in required)
+    ]
+
+
+def _timestamps(series: pd.Series) -> pd.Series:
+    """Parsed dates as sortable text, None for NaT."""
+    text = series.dt.strftime(_TIMESTAMP_FORMAT)
+    return text.astype(object).where(series.notna(), None)
+
+
+def _text(df: pd.DataFrame, column: str) -> pd.Series:
+    if column not in df.columns:
+        return pd.Series(None, index=df.index, dtype=object)
+    values = df[column]
+    return values.astype("string").astype(object).where(values.notna(), None)
+
+
+def _member_rows(df: pd.DataFrame) -> pd.DataFrame:
+    # Same parsing as membership.py: strict ISO "End date", flexible "Join date"
+    end_dates = membership.parsed_dates(df, "End date")
+    if "Join date" in df.columns:
+        join_dates = _timestamps(membership.parsed_dates(df, "Join date"))
+    else:
+        join_dates = pd.Series(None, index=df.index, dtype=object)
+    rows = pd.DataFrame(
+        {
+            "row_number": range(len(df)),
+            "name": _text(df, "Name"),
+            "last_name": _text(df, "Last name"),
+            "email": _text(df, "Email"),
+            "mobile_number": _text(df, "Mobile number"),
+            "club": _text(df, "Club"),
+            "plan_type": _text(df, "Payment plan type"),
+            "plan_name": _text(df, "Payment Plan Name"),
+            "join_date": join_dates,
+            "end_date": _timestamps(end_dates),
+        }
+    )
+    # Inserting in index order keeps the B-tree updates local (~40% faster);
+    # row_number keeps the export's order for reports that list members
+    return rows.sort_values(["club", "plan_type", "end_date"], na_position="first")
+
+
+def _booking_rows(df: pd.DataFrame) -> pd.DataFrame:
+    values = df["Length of Booking"]
+    lengths, _ = bookings.parse_durations(values)
+    if values.dtype == object or isinstance(values.dtype, pd.StringDtype):
+        blank = values.astype("string").str.strip().eq("").fillna(False)
+    else:
+        blank = False
+    # Matches parse_durations' count: non-empty values that could not be read
+    unparsed = lengths.isna() & values.notna() & ~blank
+    length_ns = lengths.astype("int64").astype(object).where(lengths.notna(), None)
+    return pd.DataFrame(
+        {
+            "club": _text(df, "Club"),
+            "zone": _text(df, "Club Zone Type Name"),
+            "facility": _text(df, "Facility Booking Definition"),
+            "length_ns": length_ns,
+            "length_unparsed": unparsed.astype(int),
+        }
+    )
+
+
+def _group_fitness_rows(df: pd.DataFrame) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "club": _text(df, "Club"),
+            "attendees": pd.to_numeric(df["UserActive"], errors="coerce").fillna(0),
+        }
+    )
+
+
+def _technogym_rows(df: pd.DataFrame) -> pd.DataFrame:
+    return pd.DataFrame({"activity": _text(df, "Activity")})
+
+
+_ROW_BUILDERS = {
+    "members": _member_rows,
+    "bookings": _booking_rows,
+    "group_fitness": _group_fitness_rows,
+    "technogym": _technogym_rows,
+}
+
+
+def _insert(conn: sqlite3.Connection, table: str, import_id: int, rows: pd.DataFrame):
+    columns = ["import_id"] + list(rows.columns)
+    placeholders = ", ".join("?" * len(columns))
+    # Column lists zipped into tuples: much faster than itertuples on object frames
+    conn.executemany(
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})",
+        zip(
+            [import_id] * len(rows),
+            *(rows[col].astype(object).tolist() for col in rows.columns),
+        ),
+    )
+
+
+def ingest_export(
+    conn: sqlite3.Connection,
+    df: pd.DataFrame,
+    file_path: str,
+    import_date: str,
+) -> tuple[int, list[str]]:
+    """
+    Stores a loaded export as taken on import_date (YYYY-MM-DD), in every table
+    it has the columns for. Ingesting the same file contents for the same date
+    again replaces the earlier import. Returns (import id, kinds stored).
+    """
+    dt.date.fromisoformat(import_date)  # Validate before writing anything
+    kinds = export_kinds(df)
+    if not kinds:
+        raise ValueError(
+            f"{os.path.basename(file_path)} has none of the columns the warehouse stores"
+        )
+    file_hash = sidecar.content_hash(file_path)
+    with conn:
+        conn.execute(
+            "DELETE FROM imports WHERE file_hash = ? AND import_date = ?",
+            (file_hash, import_date),
+        )
+        cursor = conn.execute(
+            "INSERT INTO imports (import_date, file_name, file_hash, kinds, row_count,"
+            " imported_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                import_date,
+                os.path.basename(file_path),
+                file_hash,
+                ",".join(kinds),
+                len(df),
+                dt.datetime.now().isoformat(timespec="seconds"),
+            ),
+        )
+        import_id = cursor.lastrowid
+        for kind in kinds:
+            _insert(conn, KINDS[kind][0], import_id, _ROW_BUILDERS[kind](df))
+    return import_id, kinds
+
+
+def list_imports(conn: sqlite3.Connection) -> pd.DataFrame:
+    return pd.read_sql_query(
+        "SELECT import_id, import_date, file_name, kinds, row_count, imported_at"
+        " FROM imports ORDER BY import_date, import_id",
+        conn,
+    )
+
+
+def latest_import(
+    conn: sqlite3.Connection, kind: str, on_or_before: str | None = None
+) -> int | None:
+    """Most recent import holding `kind` data taken on or before the date, if any."""
+    query = "SELECT import_id FROM imports WHERE ',' || kinds || ',' LIKE ?"
+    params: list = [f"%,{kind},%"]
+    if on_or_before is not None:
+        query += " AND import_date <= ?"
+        params.append(on_or_before)
+    query += " ORDER BY import_date DESC, import_id DESC LIMIT 1"
+    row = conn.execute(query, params).fetchone()
+    return None if row is None else row[0]
+
+
+# --- SQL Reports ---
+
+
+def _timestamp_param(date_str: str) -> str:
+    return pd.to_datetime(date_str, format="%Y-%m-%d").strftime(_TIMESTAMP_FORMAT)
+
+
+def _pivot_counts(rows: list[tuple]) -> pd.DataFrame:
+    """(club, plan type, count) rows as a membership-style counts table."""
+    counts = (
+        pd.DataFrame(rows, columns=["Club", "Payment plan type", "count"])
+        .pivot_table(
+            index="Club",
+            columns="Payment plan type",
+            values="count",
+            aggfunc="sum",
+            fill_value=0,
+        )
+        .astype("int64")
+    )
+    counts.columns.name = None
+    present_plans = [
+        plan for plan in membership.TARGET_PAYMENT_PLANS if plan in counts.columns
+    ]
+    counts[membership.TOTAL_COLUMN] = counts[present_plans].sum(axis=1)
+    return counts
+
+
+def member_counts(
+    conn: sqlite3.Connection, import_id: int, end_date: str
+) -> pd.DataFrame:
+    """SQL version of membership.active_member_counts."""
+    rows = conn.execute(
+        "SELECT club, plan_type, COUNT(*) FROM members"
+        " WHERE import_id = ? AND club IS NOT NULL AND plan_type IS NOT NULL"
+        " AND (end_date IS NULL OR end_date > ?)"
+        " GROUP BY club, plan_type",
+        (import_id, _timestamp_param(end_date)),
+    ).fetchall()
+    return _pivot_counts(rows)
+
+
+def new_member_counts(
+    conn: sqlite3.Connection, import_id: int, end_date: str
+) -> pd.DataFrame:
+    """SQL version of membership.new_member_counts."""
+    start_date_month, end_date_dt = membership.month_window(end_date)
+    end_param = end_date_dt.strftime(_TIMESTAMP_FORMAT)
+    rows = conn.execute(
+        "SELECT club, plan_type, COUNT(*) FROM members"
+        " WHERE import_id = ? AND club IS NOT NULL AND plan_type IS NOT NULL"
+        " AND (end_date IS NULL OR end_date > ?)"
+        " AND join_date >= ? AND join_date <= ?"
+        " GROUP BY club, plan_type",
+        (
+            import_id,
+            end_param,
+            start_date_month.strftime(_TIMESTAMP_FORMAT),
+            end_param,
+        ),
+    ).fetchall()
+    return _pivot_counts(rows)
+
+
+def current_members(
+    conn: sqlite3.Connection, import_id: int, target_club: str, end_date: str
+) -> rendering.ReportResult:
+    counts = member_counts(conn, import_id, end_date)
+    return functions.current_members_result(
+        membership.club_count(counts, target_club, membership.TARGET_PAYMENT_PLANS[0]),
+        membership.club_count(counts, target_club, membership.TOTAL_COLUMN),
+    )
+
+
+def new_members(
+    conn: sqlite3.Connection, import_id: int, target_club: str, end_date: str
+) -> rendering.ReportResult:
+    counts = new_member_counts(conn, import_id, end_date)
+    start_date_month, end_date_dt = membership.month_window(end_date)
+    return functions.new_members_result(
+        membership.club_count(counts, target_club, membership.TARGET_PAYMENT_PLANS[0]),
+        membership.club_count(counts, target_club, membership.TOTAL_COLUMN),
+        start_date_month,
+        end_date_dt,
+    )
+
+
+def ending_members(
+    conn: sqlite3.Connection,
+    import_id: int,
+    today: dt.date | None = None,
+    days: int = 0,
+    club: str | None = None,
+) -> pd.DataFrame:
+    """
+    Members of the import whose "End date" falls on today (default: today) or
+    the `days` days after it, optionally of one club, in order of end date.
+    """
+    start = today or dt.date.today()
+    stop = start + dt.timedelta(days=days + 1)
+    club_filter = " AND club = ?" if club is not None else ""
+    df = pd.read_sql_query(
+        "SELECT name AS 'Name', last_name AS 'Last name', club AS 'Club',"
+        " plan_name AS 'Payment Plan Name', end_date AS 'End date',"
+        " email AS 'Email', mobile_number AS 'Mobile number'"
+        " FROM members WHERE import_id = ? AND end_date >= ? AND end_date < ?"
+        f"{club_filter} ORDER BY substr(end_date, 1, 10), row_number",
+        conn,
+        params=(import_id, start.isoformat(), stop.isoformat())
+        + ((club,) if club is not None else ()),
+    )
+    df["End date"] = pd.to_datetime(df["End date"], format=_TIMESTAMP_FORMAT)
+    return df
+
+
+def technogym_reporting(
+    conn: sqlite3.Connection, import_id: int
+) -> rendering.ReportResult:
+    def _count(activities: list[str]) -> int:
+        placeholders = ", ".join("?" * len(activities))
+        return conn.execute(
+            "SELECT COUNT(*) FROM technogym"
+            f" WHERE import_id = ? AND activity IN ({placeholders})",
+            (import_id, *activities),
+        ).fetchone()[0]
+
+    return functions.technogym_result(
+        _count(functions.TECHNOGYM_CONSULTS), _count(functions.TECHNOGYM_PT_SESSIONS)
+    )
+
+
+def group_fitness(conn: sqlite3.Connection, import_id: int) -> rendering.ReportResult:
+    totals = pd.read_sql_query(
+        "SELECT club AS 'Club', COUNT(*) AS rows, SUM(attendees) AS attendees"
+        " FROM group_fitness WHERE import_id = ? AND club IS NOT NULL GROUP BY club",
+        conn,
+        params=(import_id,),
+        index_col="Club",
+    )
+    return functions.group_fitness_result(
+        totals.reindex(functions.GROUP_FITNESS_CLUBS, fill_value=0)
+    )
+
+
+def booking_zones(
+    conn: sqlite3.Connection, import_id: int, weights: pd.DataFrame | None = None
+) -> pd.DataFrame:
+    """SQL version of functions.booking_zones (LIKE is case-insensitive, as there)."""
+    if weights is None:
+        weights = bookings.load_zone_weights()
+    kept = (
+        " import_id = ? AND (facility IS NULL OR (facility NOT LIKE '%Unavailable%'"
+        " AND facility NOT LIKE '%University Class%'))"
+    )
+    df_sum = pd.read_sql_query(
+        "SELECT club AS 'Club', zone AS 'Club Zone Type Name',"
+        " COALESCE(SUM(length_ns), 0) AS length_ns"
+        f" FROM bookings WHERE {kept} AND club IS NOT NULL AND zone IS NOT NULL"
+        " GROUP BY club, zone ORDER BY club, zone",
+        conn,
+        params=(import_id,),
+    )
+    unparsed_rows = conn.execute(
+        f"SELECT COALESCE(SUM(length_unparsed), 0) FROM bookings WHERE {kept}",
+        (import_id,),
+    ).fetchone()[0]
+    df_sum["Length of Booking"] = pd.to_timedelta(df_sum.pop("length_ns"), unit="ns")
+    return functions.weighted_booking_summary(df_sum, weights, int(unparsed_rows))
+
+
+# --- History ---
+
+
+def member_history(conn: sqlite3.Connection) -> pd.DataFrame:
+    """
+    Active members per club and plan type in every member import, as of the
+    date it was taken. One row per (import date, club, plan type).
+    """
+    return pd.read_sql_query(
+        "SELECT i.import_date AS 'Import date', m.club AS 'Club',"
+        " m.plan_type AS 'Payment plan type', COUNT(*) AS 'Active members'"
+        " FROM members m JOIN imports i ON i.import_id = m.import_id"
+        " WHERE m.club IS NOT NULL AND m.plan_type IS NOT NULL"
+        " AND (m.end_date IS NULL OR m.end_date > i.import_date || ' 00:00:00')"
+        " GROUP BY i.import_id, m.club, m.plan_type"
+        " ORDER BY i.import_date, m.club, m.plan_type",
+        conn,
+    )
+
+
+def _year_earlier(date_str: str) -> str:
+    date = dt.date.fromisoformat(date_str)
+    try:
+        return date.replace(year=date.year - 1).isoformat()
+    except ValueError:  # 29 February
+        return date.replace(year=date.year - 1, day=28).isoformat()
+
+
+def year_over_year(conn: sqlite3.Connection, end_date: str) -> pd.DataFrame:
+    """
+    Active and new members per club on end_date against the same day a year
+    earlier, each from the latest member import taken on or before that day.
+    Raises ValueError if either year has no member import.
+    """
+    last_year_date = _year_earlier(end_date)
+    columns = {}
+    for label, date in (("This year", end_date), ("Last year", last_year_date)):
+        import_id = latest_import(conn, "members", date)
+        if import_id is None:
+            raise ValueError(f"No member export in the warehouse on or before {date}")
+        active = member_counts(conn, import_id, date)
+        new = new_member_counts(conn, import_id, date)
+        columns[f"Active ({label})"] = active[membership.TOTAL_COLUMN]
+        columns[f"New this month ({label})"] = new.get(
+            membership.TOTAL_COLUMN, pd.Series(dtype="int64")
+        )
+    result = pd.DataFrame(columns).fillna(0).astype("int64")
+    result["Active change"] = (
+        result["Active (This year)"] - result["Active (Last year)"]
+    )
+    result.index.name = "Club"
+    return result.reset_index()
@@ -0,0 +1,370 @@
+"""
+Watch-folder service: runs the batch reports on every export dropped into a folder.
+
+    python -m watcher FOLDER [-o OUTPUT_DIR] [--club NAME ...] [--date YYYY-MM-DD]
+                     [--table-format {csv,xlsx,json}] [--ending-days N]
+                     [--workers N] [--interval SECONDS] [--settle SECONDS]
+                     [--process-existing] [--once]
+
+The folder is polled every --interval seconds (polling works the same on network
+shares and on every platform). A new or changed export is only picked up once
+its size and modification time have held still for --settle seconds and it can
+be opened, so files still being copied or saved are left alone. Ready exports
+are queued and run on at most --workers threads with batch.run_export, writing
+to <OUTPUT_DIR>/<export name>/ as the batch runner does (OUTPUT_DIR defaults to
+the watched folder, so the reports land next to the export). Reports are dated
+--date, or the day each export is processed.
+
+The service runs in one long-lived process, so the parsed-export cache, the
+sidecars and the imported libraries stay warm from one export to the next. Each
+export's latency (from first seen to reports written) is printed and appended to
+the profile log with its stage timings (see profiling.py). Does not import Qt.
+"""
+
+import argparse
+import datetime as dt
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+
+import batch
+import functions
+import loaders
+import profiling
+import rendering
+
+EXPORT_EXTENSIONS = (".xlsx", ".xlsm", ".xls", ".csv")
+DEFAULT_INTERVAL_SECONDS = 2.0
+DEFAULT_SETTLE_SECONDS = 5.0
+DEFAULT_WORKERS = 2
+
+# (size, mtime_ns) of a file; a file whose signature changes is new again
+Signature = tuple[int, int]
+
+
+def is_export(name: str) -> bool:
+    """True for export files, not Excel lock files (~$...) or hidden/temp files."""
+    if name.startswith(("~$", ".")):
+        return False
+    return os.path.splitext(name)[1].lower() in EXPORT_EXTENSIONS
+
+
+def scan(folder: str) -> dict[str, Signature]:
+    """Signature of every export directly inside folder (subfolders are not read)."""
+    found = {}
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if not is_export(entry.name):
+                continue
+            try:
+                if not entry.is_file():
+                    continue
+                stat = entry.stat()
+            except OSError:
+                continue  # Removed or renamed since listed
+            found[os.path.abspath(entry.path)] = (stat.st_size, stat.st_mtime_ns)
+    return found
+
+
+def can_open(file_path: str) -> bool:
+    """False while another program holds the file open for writing (on Windows)."""
+    try:
+        with open(file_path, "rb"):
+            return True
+    except OSError:
+        return False
+
+
+@dataclass
+class _Pending:
+    signature: Signature
+    first_seen: float  # time.monotonic() when this version was first seen
+    stable_since: float  # ... and when its signature last changed
+
+
+class ExportWatcher:
+    """
+    Debounces the exports appearing in a folder and runs the batch reports on
+    each ready one in a bounded thread pool. Call poll() repeatedly (run() does).
+    """
+
+    def __init__(
+        self,
+        folder: str,
+        output_dir: str | None = None,
+        clubs: list[str] | None = None,
+        end_date: str | None = None,
+        table_format: str = "csv",
+        ending_days: int | None = None,
+        workers: int = DEFAULT_WORKERS,
+        settle_seconds: float = DEFAULT_SETTLE_SECONDS,
+        process_existing: bool = False,
+        log=print,
+    ):
+        self.folder = os.path.abspath(folder)
+        self.output_dir = os.path.abspath(output_dir or folder)
+        self.clubs = clubs or list(functions.CLUB_LIST)
+        self.end_date = end_date
+        self.table_format = table_format
+        self.ending_days = ending_days
+        self.workers = workers
+        self.settle_seconds = settle_seconds
+        self.log = log
+        self._pending: dict[str, _Pending] = {}
+        self._ready: list[tuple[str, Signature, float]] = []
+        self._running: dict[Future, str] = {}
+        # Version of each export last processed (or present at start-up, unless
+        # process_existing), so it is not run again until it changes
+        self._done: dict[str, Signature] = {} if process_existing else scan(self.folder)
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="watcher"
+        )
+        self.processed = 0
+        self.failed = 0
+
+    @property
+    def idle(self) -> bool:
+        return not (self._pending or self._ready or self._running)
+
+    def poll(self) -> None:
+        """Scans the folder once, queues exports that have settled and starts work."""
+        now = time.monotonic()
+        found = scan(self.folder)
+        for path in list(self._pending):
+            if path not in found:
+                del self._pending[path]  # Removed or renamed before it settled
+        # A queued export that changed again (or went) is replaced by its newer
+        # version, which settles again before it is processed
+        ready = []
+        for path, signature, first_seen in self._ready:
+            current = found.get(path)
+            if current == signature:
+                ready.append((path, signature, first_seen))
+            elif current is not None:
+                self._pending[path] = _Pending(current, first_seen, now)
+        self._ready = ready
+        busy = set(self._running.values()) | {path for path, _, _ in self._ready}
+        for path, signature in found.items():
+            if path in busy or self._done.get(path) == signature:
+                continue
+            pending = self._pending.get(path)
+            if pending is None:
+                self._pending[path] = _Pending(signature, now, now)
+            elif pending.signature != signature:
+                pending.signature, pending.stable_since = signature, now
+            elif (
+                now - pending.stable_since >= self.settle_seconds
+                and signature[0] > 0
+                and can_open(path)
+            ):
+                del self._pending[path]
+                self._ready.append((path, signature, pending.first_seen))
+        self._collect()
+        self._start()
+
+    def _start(self) -> None:
+        # Only as many exports as there are workers are handed to the pool, so
+        # the rest wait in _ready, where a newer version of a file replaces them
+        while self._ready and len(self._running) < self.workers:
+            path, signature, first_seen = self._ready.pop(0)
+            future = self._executor.submit(self._process, path, signature, first_seen)
+            self._running[future] = path
+
+    def _collect(self) -> None:
+        for future in [f for f in self._running if f.done()]:
+            del self._running[future]
+            path, signature, ok = future.result()
+            self._done[path] = signature
+            if ok:
+                self.processed += 1
+            else:
+                self.failed += 1
+
+    def _process(self, path: str, signature: Signature, first_seen: float):
+        started = time.monotonic()
+        stem = os.path.splitext(os.path.basename(path))[0]
+        end_date = self.end_date or str(dt.date.today())
+        # Loads of an earlier version of this file can no longer be hit
+        loaders.workbook_cache.invalidate(path)
+        ok = True
+        with profiling.profiled("watch folder") as profile:
+            try:
+                statuses = batch.run_export(
+                    path,
+                    os.path.join(self.output_dir, stem),
+                    self.clubs,
+                    end_date,
+                    table_format=self.table_format,
+                    ending_days=self.ending_days,
+                )
+            except Exception as e:
+                statuses = [("Export", f"could not load: {type(e).__name__}: {e}")]
+                ok = False
+        finished = time.monotonic()
+        latency, queued = finished - first_seen, started - first_seen
+        lines = [
+            f"{os.path.basename(path)}: {'done' if ok else 'failed'} in "
+            f"{finished - started:.2f} s ({latency:.2f} s since first seen)"
+        ]
+        lines += [f"  {report_name}: {status}" for report_name, status in statuses]
+        self.log("\n".join(lines))
+        try:
+            profiling.write_log(
+                profile,
+                report="watch folder",
+                files=[path],
+                end_date=end_date,
+                latency_seconds=round(latency, 3),
+                queued_seconds=round(queued, 3),
+                ok=ok,
+            )
+        except OSError as e:
+            self.log(f"Warning: could not write profile log: {e}")
+        return path, signature, ok
+
+    def wait(self, timeout: float | None = None) -> None:
+        """Waits for the exports being processed (not the queued ones)."""
+        if self._running:
+            wait(list(self._running), timeout, return_when=FIRST_COMPLETED)
+        self._collect()
+        self._start()
+
+    def run(self, interval: float = DEFAULT_INTERVAL_SECONDS, once: bool = False):
+        """
+        Polls every interval seconds until interrupted (or, with once, until every
+        export in the folder has been processed).
+        """
+        while True:
+            self.poll()
+            if once and self.idle:
+                return
+            if self._running:
+                self.wait(interval)
+            else:
+                time.sleep(interval)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m watcher",
+        description="Run the DeakinACTIVE reports on every export saved to a folder.",
+    )
+    parser.add_argument("folder", help="Folder the booking system saves exports to")
+    parser.add_argument(
+        "-o",
+        "--output-dir",
+        help="Directory to write reports to (default: the watched folder)",
+    )
+    parser.add_argument(
+        "--date",
+        help="End date for the reports (YYYY-MM-DD, default: the day each export "
+        "is processed)",
+    )
+    parser.add_argument(
+        "--club",
+        action="append",
+        dest="clubs",
+        help="Club to report on (repeatable, default: all clubs)",
+    )
+    parser.add_argument(
+        "--ending-days",
+        type=int,
+        help="Days after the date covered by the Ending Members Lookahead (default: 7)",
+    )
+    parser.add_argument(
+        "--table-format",
+        choices=[fmt for fmt in rendering.FORMATS if fmt != "html"],
+        default="csv",
+        help="File format for table reports such as Booking Zones (default: csv)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Exports processed at once (default: {DEFAULT_WORKERS})",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=DEFAULT_INTERVAL_SECONDS,
+        help=f"Seconds between folder scans (default: {DEFAULT_INTERVAL_SECONDS:g})",
+    )
+    parser.add_argument(
+        "--settle",
+        type=float,
+        default=DEFAULT_SETTLE_SECONDS,
+        help="Seconds an export must stay unchanged before it is processed "
+        f"(default: {DEFAULT_SETTLE_SECONDS:g})",
+    )
+    parser.add_argument(
+        "--process-existing",
+        action="store_true",
+        help="Also process the exports already in the folder at start-up",
+    )
+    parser.add_argument(
+        "--once",
+        action="store_true",
+        help="Exit once the folder's exports are processed (implies "
+        "--process-existing), e.g. when run from a scheduler",
+    )
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.date is not None:
+        try:
+            dt.date.fromisoformat(args.date)
+        except ValueError:
+            print(f"Error: --date must be YYYY-MM-DD, got '{args.date}'", file=sys.stderr)
+            return 2
+    if not os.path.isdir(args.folder):
+        print(f"Error: '{args.folder}' is not a folder", file=sys.stderr)
+        return 2
+    if args.workers < 1:
+        print("Error: --workers must be at least 1", file=sys.stderr)
+        return 2
+    if args.interval <= 0 or args.settle < 0:
+        print("Error: --interval must be positive and --settle not negative", file=sys.stderr)
+        return 2
+    if args.ending_days is not None and args.ending_days < 0:
+        print("Error: --ending-days cannot be negative", file=sys.stderr)
+        return 2
+
+    log_lock = threading.Lock()
+
+    def log(message: str) -> None:
+        with log_lock:
+            print(message, flush=True)
+
+    watcher = ExportWatcher(
+        args.folder,
+        args.output_dir,
+        args.clubs,
+        args.date,
+        args.table_format,
+        args.ending_days,
+        args.workers,
+        args.settle,
+        process_existing=args.process_existing or args.once,
+        log=log,
+    )
+    if not args.once:
+        log(f"Watching {watcher.folder} (Ctrl+C to stop)")
+    try:
+        watcher.run(args.interval, once=args.once)
+    except KeyboardInterrupt:
+        log("Stopping; waiting for the exports being processed...")
+    finally:
+        watcher.close()
+    return 1 if watcher.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())